@@ -88,9 +88,12 @@ export default function Backtest() {
     setSelectedStrategy(e.target.value)
   }
 
-  const fetchBacktestReport = async () =>{
+  // Results of one run; without a run id the service falls back to its newest run
+  const runQuery = (runId) => (runId ? `?run=${encodeURIComponent(runId)}` : "")
+
+  const fetchBacktestReport = async (runId) =>{
     try {
-      const response = await httpClient.get(`${import.meta.env.VITE_API_BACKTEST_SUM}`)
+      const response = await httpClient.get(`${import.meta.env.VITE_API_BACKTEST_SUM}${runQuery(runId)}`)
       if (response.ok) {
         const summary = await response.json()
         setBacktestSummary(summary) // ✅ save to state
@@ -107,9 +110,9 @@ export default function Backtest() {
   }
 
   // Fetch backtest result with GET
-  const fetchBacktestResult = async () => {
+  const fetchBacktestResult = async (runId) => {
     try {
-      const response = await httpClient.get(`${import.meta.env.VITE_API_BACKTEST_RUN}`)
+      const response = await httpClient.get(`${import.meta.env.VITE_API_BACKTEST_RUN}${runQuery(runId)}`)
       if (response.ok) {
         const resultText = await response.text() // might be HTML/SVG
         setBacktestResult(resultText) 
@@ -136,12 +139,13 @@ export default function Backtest() {
       setBacktestSummary(null)    
 
       const jsonData = { symbol, interval, strategy }
-      await httpClient.post(`${import.meta.env.VITE_API_BACKTEST_GET}`, jsonData)
+      const runResponse = await httpClient.post(`${import.meta.env.VITE_API_BACKTEST_GET}`, jsonData)
+      const runId = runResponse.ok ? (await runResponse.json()).runId : null
 
       // Start polling every 3s until result is ready
       const pollInterval = setInterval(async () => {
-        const gotSummary = await fetchBacktestReport()
-        const gotResult = await fetchBacktestResult()
+        const gotSummary = await fetchBacktestReport(runId)
+        const gotResult = await fetchBacktestResult(runId)
 
         if (gotSummary && gotResult) {
           clearInterval(pollInterval)
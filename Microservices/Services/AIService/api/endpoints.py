@@ -1,24 +1,119 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
+import json
 import logging
-from models.schemas import PredictionRequest, PredictionResponse, CandleData
-from models.predictor import StockPredictor
+from core.config import settings
+from core.executor import ExecutorSaturated, ExecutorTimeout, PredictionExecutor
+from core.feeds import make_feed
+from core.metrics import metrics, stage
+from api.streams import StreamHub
+from api.timing import TimedRoute
+from models.prediction_cache import PredictionCache, fingerprint_arrays, fingerprint_candles
+from models.schemas import (PredictionRequest, PredictionResponse, CandleData,
+                            BatchPredictionRequest, BatchPredictionResponse, BatchPredictionItem,
+                            ColumnarPredictionRequest)
+from api.tasks import (registry, registry_stats, run_prediction, run_prediction_arrays,
+                       predict_features, predict_frame, prepare_batch)
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
-predictor = StockPredictor()
+router = APIRouter(route_class=TimedRoute)
+executor = PredictionExecutor(
+    kind=settings.executor_kind,
+    max_workers=settings.executor_max_workers,
+    max_queue=settings.executor_max_queue,
+    timeout_seconds=settings.executor_timeout_seconds,
+    profile_sample_rate=settings.profile_sample_rate,
+    profile_interval=settings.profile_interval_seconds,
+    profile_dir=settings.profile_dir,
+    worker_report=registry_stats,
+)
+prediction_cache = PredictionCache(
+    max_entries=settings.prediction_cache_max_entries,
+    default_ttl_seconds=settings.prediction_cache_ttl_seconds,
+)
+
+
+async def stream_prediction(symbol: str, interval: str, df) -> dict:
+    predicted_close, confidence, features_used = await executor.run(
+        predict_frame, symbol, interval, df)
+    return PredictionResponse(
+        predicted_close=predicted_close,
+        confidence_score=round(confidence, 4),
+        model_version="1.0.0",
+        features_used=features_used[:10],
+        symbol=symbol
+    ).model_dump()
+
+
+streams = StreamHub(
+    feed_factory=make_feed,
+    predict=stream_prediction,
+    history=settings.stream_history_candles,
+    queue_size=settings.stream_queue_size,
+    retry_seconds=settings.stream_retry_seconds,
+)
+
+
+async def cached_run(fingerprint, fn, *args):
+    """executor.run, answered from the prediction cache when the window was seen.
+
+    Requests without a symbol are not cached; the fingerprint cannot tell
+    their windows apart.
+    """
+    if fingerprint.symbol == "UNKNOWN":
+        return await executor.run(fn, *args)
+    result = prediction_cache.get(fingerprint)
+    if result is None:
+        result = await executor.run(fn, *args)
+        prediction_cache.put(fingerprint, result)
+    return result
 
 
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_next_close(request: PredictionRequest):
     try:
-        if len(request.candles) < 100:
+        n = len(request.candles)
+        if not settings.min_candles <= n <= settings.max_candles:
             raise HTTPException(
-                status_code=400, detail="Minimum 100 candles required")
+                status_code=400,
+                detail=f"Between {settings.min_candles} and {settings.max_candles} candles required, got {n}")
 
-        sorted_candles = sorted(request.candles, key=lambda x: x.timestamp)
+        with stage("sort"):
+            sorted_candles = sorted(request.candles, key=lambda x: x.timestamp)
 
-        predicted_close, confidence, features_used = predictor.predict(
-            sorted_candles, request.sentiment)
+        predicted_close, confidence, features_used = await cached_run(
+            fingerprint_candles(request, sorted_candles), run_prediction, request, sorted_candles)
+
+        return PredictionResponse(
+            predicted_close=predicted_close,
+            confidence_score=round(confidence, 4),
+            model_version="1.0.0",
+            features_used=features_used[:10],
+            symbol=request.symbol
+        )
+
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": "1"})
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error during prediction")
+
+
+@router.post("/predict/columnar", response_model=PredictionResponse)
+async def predict_next_close_columnar(request: ColumnarPredictionRequest):
+    try:
+        predicted_close, confidence, features_used = await cached_run(
+            fingerprint_arrays(request, request.arrays), run_prediction_arrays,
+            request, request.arrays)
 
         return PredictionResponse(
             predicted_close=predicted_close,
@@ -28,6 +123,11 @@ async def predict_next_close(request: PredictionRequest):
             symbol=request.symbol
         )
 
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": "1"})
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -36,10 +136,191 @@ async def predict_next_close(request: PredictionRequest):
             status_code=500, detail="Internal server error during prediction")
 
 
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    if len(request.requests) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.batch_max_items} symbols per batch")
+
+    with stage("sort"):
+        batch = [(sorted(item.candles, key=lambda x: x.timestamp), item.sentiment)
+                 for item in request.requests]
+
+    fingerprints = [fingerprint_candles(item, candles)
+                    for item, (candles, _) in zip(request.requests, batch)]
+    cached = [None if fingerprint.symbol == "UNKNOWN" else prediction_cache.get(fingerprint)
+              for fingerprint in fingerprints]
+    pending = [i for i, result in enumerate(cached) if result is None]
+
+    # Keep one batch from taking more than the pool's worth of queue slots
+    slots = asyncio.Semaphore(executor.max_workers)
+
+    async def prepare_item(i):
+        async with slots:
+            return (await executor.run(prepare_batch, [batch[i]]))[0]
+
+    # Indicators for every uncached symbol in one pass, then fit/score concurrently
+    frames = []
+    if pending:
+        try:
+            frames = await executor.run(prepare_batch, [batch[i] for i in pending])
+        except ExecutorSaturated as e:
+            raise HTTPException(status_code=429, detail=str(e),
+                                headers={"Retry-After": "1"})
+        except ExecutorTimeout as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            # One bad item fails the whole pass; prepare them one at a time
+            # so only that item gets an error
+            logger.warning(f"Batch preparation failed, preparing items one by one: {str(e)}")
+            frames = await asyncio.gather(*(prepare_item(i) for i in pending),
+                                          return_exceptions=True)
+
+    async def predict_item(i, df):
+        if isinstance(df, Exception):
+            raise df
+        async with slots:
+            result = await executor.run(predict_features, request.requests[i], df)
+        if fingerprints[i].symbol != "UNKNOWN":
+            prediction_cache.put(fingerprints[i], result)
+        return result
+
+    computed = await asyncio.gather(
+        *(predict_item(i, df) for i, df in zip(pending, frames)),
+        return_exceptions=True)
+    outcomes = list(cached)
+    for i, outcome in zip(pending, computed):
+        outcomes[i] = outcome
+
+    results = []
+    for item, outcome in zip(request.requests, outcomes):
+        if isinstance(outcome, (ValueError, ExecutorSaturated, ExecutorTimeout)):
+            results.append(BatchPredictionItem(
+                symbol=item.symbol, error=str(outcome)))
+        elif isinstance(outcome, Exception):
+            logger.error(f"Prediction error for {item.symbol}: {str(outcome)}")
+            results.append(BatchPredictionItem(
+                symbol=item.symbol, error="Internal server error during prediction"))
+        else:
+            predicted_close, confidence, features_used = outcome
+            results.append(BatchPredictionItem(
+                symbol=item.symbol,
+                result=PredictionResponse(
+                    predicted_close=predicted_close,
+                    confidence_score=round(confidence, 4),
+                    model_version="1.0.0",
+                    features_used=features_used[:10],
+                    symbol=item.symbol
+                )))
+
+    return BatchPredictionResponse(results=results)
+
+
+@router.websocket("/ws/predict/{symbol}/{interval}")
+async def predict_websocket(websocket: WebSocket, symbol: str, interval: str):
+    """Push a prediction for every closed candle of (symbol, interval)"""
+    await websocket.accept()
+    async with streams.subscribe(symbol.upper(), interval) as queue:
+        # Anything the client sends, including a close, ends the subscription
+        closed = asyncio.ensure_future(websocket.receive())
+        try:
+            while True:
+                message = asyncio.ensure_future(queue.get())
+                await asyncio.wait({closed, message}, return_when=asyncio.FIRST_COMPLETED)
+                if closed.done():
+                    message.cancel()
+                    break
+                await websocket.send_json(message.result())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            closed.cancel()
+
+
+@router.get("/stream/predict/{symbol}/{interval}")
+async def predict_event_stream(request: Request, symbol: str, interval: str):
+    """Server-sent events version of /ws/predict"""
+    async def events():
+        async with streams.subscribe(symbol.upper(), interval) as queue:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line, keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+REGISTRY_COUNTERS = ("entries", "hits", "misses", "fits", "updates", "evictions")
+SNAPSHOT_COUNTERS = ("loads", "saves", "failures", "rejected")
+
+
+def model_stats() -> dict:
+    """Registry stats of the process that serves predictions.
+
+    In process mode every worker has its own registry, so this is the sum of
+    the latest report of each worker that has run a task, with the reports
+    themselves under "workers" (by pid).
+    """
+    if executor.kind != "process":
+        return {**registry.stats(), "per_process": False}
+    workers = executor.worker_reports()
+    models = {key: sum(report[key] for report in workers.values()) for key in REGISTRY_COUNTERS}
+    snapshots = None
+    if registry.snapshots is not None:
+        snapshots = {"directory": str(registry.snapshots.directory),
+                     "variant": "__".join(registry.snapshots.variant),
+                     **{key: sum((report["snapshots"] or {}).get(key, 0) for report in workers.values())
+                        for key in SNAPSHOT_COUNTERS}}
+    return {**models, "max_entries": registry.max_entries, "snapshots": snapshots,
+            "per_process": True, "workers": workers}
+
+
 @router.get("/health")
 async def health_check():
+    models = model_stats()
     return {
         "status": "healthy",
-        "model_trained": predictor.is_trained,
+        "model_trained": registry.has_models or models["entries"] > 0,
+        "models": models,
+        "prediction_cache": prediction_cache.stats(),
+        "streams": streams.stats(),
+        "executor": executor.stats(),
         "version": "1.0.0"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage and request latency histograms plus pool and registry state, for Prometheus"""
+    pool = executor.stats()
+    models = model_stats()
+    responses = prediction_cache.stats()
+    live = streams.stats()
+    gauges = {
+        "executor_in_flight": pool["in_flight"],
+        "executor_queue_depth": pool["queue_depth"],
+        "registry_entries": models["entries"],
+        "prediction_cache_entries": responses["entries"],
+        "streams": len(live),
+        "stream_subscribers": sum(stream["subscribers"] for stream in live.values()),
+    }
+    counters = {
+        "executor_rejected_total": pool["rejected"],
+        "executor_timeouts_total": pool["timeouts"],
+        "executor_failed_total": pool["failed"],
+        "registry_hits_total": models["hits"],
+        "registry_misses_total": models["misses"],
+        "registry_fits_total": models["fits"],
+        "registry_updates_total": models["updates"],
+        "registry_evictions_total": models["evictions"],
+        "prediction_cache_hits_total": responses["hits"],
+        "prediction_cache_misses_total": responses["misses"],
+        "prediction_cache_expirations_total": responses["expirations"],
+        "prediction_cache_evictions_total": responses["evictions"],
+    }
+    return PlainTextResponse(metrics.render(gauges, counters), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import pandas as pd
+
+from core.feeds import CandleFeed, kline_to_candle
+from models.indicator_engine import IndicatorEngine
+
+logger = logging.getLogger(__name__)
+
+# (symbol, interval, indicator frame) -> message for subscribers
+Predict = Callable[[str, str, pd.DataFrame], Awaitable[dict]]
+
+
+class SymbolStream:
+    """Predictions for one (symbol, interval), shared by all its subscribers.
+
+    Primes an IndicatorEngine with the feed's history, then appends each
+    closed candle and predicts once per bar. Every message goes to every
+    subscriber's queue; a subscriber that falls ``queue_size`` messages
+    behind loses its oldest ones rather than holding up the rest. New
+    subscribers get the latest message straight away.
+    """
+
+    def __init__(self, symbol: str, interval: str, feed: CandleFeed, predict: Predict,
+                 history: int = 1000, queue_size: int = 16, retry_seconds: float = 10.0):
+        self.symbol = symbol
+        self.interval = interval
+        self.feed = feed
+        self.predict = predict
+        self.history = history
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.candles = 0
+        self.predictions = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name=f"stream-{self.symbol}-{self.interval}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def publish(self, message: dict):
+        self.latest = message
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+
+    async def _run(self):
+        while True:
+            try:
+                await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Stream {self.symbol} {self.interval} failed: {str(e)}")
+                self.publish(self._error(str(e)))
+            await asyncio.sleep(self.retry_seconds)
+
+    async def _follow(self):
+        rows = await asyncio.to_thread(self.feed.history, self.symbol, self.interval, self.history)
+        if not rows:
+            raise ValueError(f"No candles for {self.symbol} {self.interval}")
+        engine = IndicatorEngine(history=self.history)
+        for row in rows:
+            engine.append(*kline_to_candle(row))
+        self.candles += len(rows)
+        await self._predict(engine)
+
+        async for row in self.feed.follow(self.symbol, self.interval, engine.last_timestamp):
+            engine.append(*kline_to_candle(row))
+            self.candles += 1
+            await self._predict(engine)
+
+    async def _predict(self, engine: IndicatorEngine):
+        try:
+            message = await self.predict(self.symbol, self.interval, engine.frame())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Stream prediction for {self.symbol} {self.interval} failed: {str(e)}")
+            message = self._error(str(e))
+        else:
+            self.predictions += 1
+            message = {"type": "prediction", "symbol": self.symbol, "interval": self.interval,
+                       "openTime": engine.last_timestamp, **message}
+        self.publish(message)
+
+    def _error(self, detail: str) -> dict:
+        return {"type": "error", "symbol": self.symbol, "interval": self.interval, "detail": detail}
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "candles": self.candles,
+            "predictions": self.predictions,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+
+
+class StreamHub:
+    """One SymbolStream per (symbol, interval), running while anyone subscribes"""
+
+    def __init__(self, feed_factory: Callable[[], CandleFeed], predict: Predict,
+                 history: int = 1000, queue_size: int = 16, retry_seconds: float = 10.0):
+        self.feed_factory = feed_factory
+        self.predict = predict
+        self.history = history
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+
+        self._feed: Optional[CandleFeed] = None
+        self._streams: Dict[Tuple[str, str], SymbolStream] = {}
+
+    @property
+    def feed(self) -> CandleFeed:
+        # Built on first use, so the service starts without touching the feed
+        if self._feed is None:
+            self._feed = self.feed_factory()
+        return self._feed
+
+    @asynccontextmanager
+    async def subscribe(self, symbol: str, interval: str):
+        """Queue of messages for (symbol, interval), starting its stream if needed"""
+        key = (symbol, interval)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = SymbolStream(
+                symbol, interval, self.feed, self.predict,
+                self.history, self.queue_size, self.retry_seconds)
+            stream.start()
+        queue = stream.subscribe()
+        try:
+            yield queue
+        finally:
+            stream.unsubscribe(queue)
+            if not stream.subscribers and self._streams.get(key) is stream:
+                del self._streams[key]
+                await stream.stop()
+
+    async def close(self):
+        streams, self._streams = list(self._streams.values()), {}
+        for stream in streams:
+            await stream.stop()
+        if self._feed is not None:
+            self._feed.close()
+            self._feed = None
+
+    def stats(self) -> dict:
+        return {f"{symbol}/{interval}": stream.stats()
+                for (symbol, interval), stream in self._streams.items()}
@@ -0,0 +1,71 @@
+"""Prediction work run by the executor pool.
+
+Kept free of FastAPI objects so worker processes can import it cheaply. In
+process mode every worker holds its own model registry.
+"""
+from core.config import settings
+from models.predictor import StockPredictor
+from models.registry import ModelKey, ModelRegistry
+from models.snapshots import SnapshotStore
+from models.schemas import PredictionRequest
+
+
+def make_predictor() -> StockPredictor:
+    return StockPredictor(
+        backend=settings.predictor_backend,
+        trees_per_update=settings.incremental_trees_per_update,
+        max_trees=settings.incremental_max_trees,
+        update_window=settings.incremental_update_window,
+        sentiment_tolerance_ms=settings.sentiment_tolerance_seconds * 1000 or None,
+        sentiment_half_life_ms=settings.sentiment_half_life_seconds * 1000 or None,
+        compact=settings.compact_mode,
+    )
+
+
+registry = ModelRegistry(
+    max_entries=settings.registry_max_entries,
+    ttl_seconds=settings.registry_ttl_seconds,
+    retrain_after_candles=settings.registry_retrain_after_candles,
+    factory=make_predictor,
+    snapshots=(SnapshotStore(settings.snapshot_dir, backend=settings.predictor_backend,
+                             compact=settings.compact_mode)
+               if settings.snapshot_dir else None),
+)
+
+
+def registry_stats() -> dict:
+    """This process's registry stats, reported back to the server after each task"""
+    return registry.stats()
+
+
+def run_prediction(request: PredictionRequest, candles):
+    """Predict with a cached model for known symbols, a fresh fit otherwise"""
+    df = make_predictor().prepare_features(candles, request.sentiment)
+    return predict_features(request, df)
+
+
+def run_prediction_arrays(request, arrays):
+    """run_prediction for a ColumnarPredictionRequest"""
+    df = make_predictor().prepare_features_from_arrays(arrays, request.sentiment)
+    return predict_features(request, df)
+
+
+def predict_features(request, df):
+    if request.symbol == "UNKNOWN":
+        # Nothing to key a cached model on
+        predictor = make_predictor()
+        predictor.train_model(df)
+        return predictor.predict_from_features(df)
+
+    key = ModelKey(request.symbol, request.interval)
+    return registry.predict(key, df)
+
+
+def predict_frame(symbol: str, interval: str, df):
+    """Predict from an IndicatorEngine frame, which carries no sentiment"""
+    df = make_predictor().add_sentiment(df)
+    return registry.predict(ModelKey(symbol, interval), df)
+
+
+def prepare_batch(batch):
+    return make_predictor().prepare_features_batch(batch)
@@ -0,0 +1,65 @@
+import asyncio
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from core.metrics import metrics, record_stage
+
+_request_started: ContextVar[Optional[float]] = ContextVar("request_started", default=None)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # Routes without parameters have nothing to validate; include_router
+    # builds routes again from already wrapped endpoints
+    if (not asyncio.iscoroutinefunction(endpoint) or getattr(endpoint, "_timed", False)
+            or not inspect.signature(endpoint).parameters):
+        return endpoint
+
+    # FastAPI reads the parameters through __wrapped__, so validation is unchanged
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        started = _request_started.get()
+        if started is not None:
+            # Body read, JSON parsing and Pydantic validation happen before the endpoint runs
+            record_stage("validate", time.perf_counter() - started)
+        return await endpoint(*args, **kwargs)
+    wrapper._timed = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """Route that records request latency, status counts and the validate stage"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path
+
+        async def timed_handler(request: Request) -> Response:
+            started = time.perf_counter()
+            token = _request_started.set(started)
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                _request_started.reset(token)
+                metrics.observe("request_seconds", time.perf_counter() - started, route=route)
+                metrics.inc("requests_total", route=route, status=str(status))
+
+        return timed_handler
@@ -0,0 +1,56 @@
+"""Compare N sequential /predict calls with one /predict/batch call.
+
+Each run uses fresh symbols, so both sides pay for model fits. Run from the
+AIService directory:
+
+    python -m benchmarks.bench_batch [--symbols 50] [--candles 500]
+"""
+import argparse
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import make_ohlcv
+from main import app
+
+
+def payload(symbol, n_candles, seed):
+    df = make_ohlcv(n_candles, seed)
+    candles = [{"openTime": int(row.timestamp), "open": row.open, "high": row.high,
+                "low": row.low, "close": row.close, "volume": row.volume}
+               for row in df.itertuples(index=False)]
+    return {"symbol": symbol, "interval": "1m", "candles": candles}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--candles', type=int, default=500)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    run = uuid.uuid4().hex[:6]
+
+    requests = [payload(f"SEQ{run}{i}", args.candles, i)
+                for i in range(args.symbols)]
+    start = time.perf_counter()
+    for body in requests:
+        client.post("/predict", json=body).raise_for_status()
+    sequential = time.perf_counter() - start
+
+    requests = [payload(f"BATCH{run}{i}", args.candles, i)
+                for i in range(args.symbols)]
+    start = time.perf_counter()
+    response = client.post("/predict/batch", json={"requests": requests})
+    response.raise_for_status()
+    batch = time.perf_counter() - start
+    errors = [r for r in response.json()["results"] if r["error"]]
+
+    print(f"{args.symbols} symbols x {args.candles} candles")
+    print(f"  sequential /predict: {sequential:8.2f} s")
+    print(f"  /predict/batch:      {batch:8.2f} s  ({sequential / batch:.1f}x, {len(errors)} errors)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Memory per cached symbol and accuracy of compact mode against the default.
+
+For each mode a fresh process fits a random_forest predictor for each of
+--symbols synthetic symbols of --candles candles and keeps them all, as the
+model registry does; the growth of its resident memory divided by the
+symbol count is the memory per symbol. Snapshot (pickle), model, feature
+frame and scaled sequence matrix sizes are reported alongside. Accuracy is the
+one-step-ahead MAE of both modes over a walk forward of --steps refits on a
+--window-candle history, with the mean gap between their predictions, and
+the largest gap between a forest and its CompactForest on the same inputs.
+Run from the AIService directory:
+
+    python -m benchmarks.bench_compact [--symbols 20] [--candles 1000] [--steps 10]
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import pickle
+import resource
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.synthetic import make_candles, make_ohlcv
+from models.predictor import CompactForest, StockPredictor
+
+MODES = {"default": False, "compact": True}
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current, where /proc is not available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def forest_bytes(model) -> int:
+    if isinstance(model, CompactForest):
+        return model.nbytes
+    return sum(estimator.tree_.__getstate__()["nodes"].nbytes + estimator.tree_.value.nbytes
+               for estimator in model.estimators_)
+
+
+def resident_per_symbol(compact: bool, symbols: int, candles: int) -> float:
+    """Resident memory added per fitted symbol kept alive; run in a fresh process"""
+    data = [make_candles(candles, seed=seed) for seed in range(symbols)]
+    # One fit first, so allocator arenas and thread pools exist before the baseline
+    StockPredictor(compact=compact).train_model(StockPredictor(compact=compact).prepare_features(data[0]))
+    gc.collect()
+    before = rss_bytes()
+    kept = []
+    for symbol_candles in data:
+        predictor = StockPredictor(compact=compact)
+        predictor.train_model(predictor.prepare_features(symbol_candles))
+        kept.append(predictor)
+    gc.collect()
+    return (rss_bytes() - before) / symbols
+
+
+def sizes(compact: bool, candles: int) -> dict:
+    predictor = StockPredictor(compact=compact)
+    df = predictor.prepare_features(make_candles(candles))
+    predictor.train_model(df)
+    X, _, _ = predictor.create_sequences(df)
+    return {
+        "frame": df.memory_usage(deep=True).sum(),
+        # The scaled lag matrix the model is fitted on
+        "sequences": predictor.scaler.transform(X).nbytes,
+        "model": forest_bytes(predictor.model),
+        "pickle": len(pickle.dumps(predictor)),
+    }
+
+
+def walk_forward(window: int, steps: int, seed: int = 7):
+    raw = make_ohlcv(window + steps + 1, seed=seed)
+    close = raw['close'].to_numpy()
+    predictions = {mode: [] for mode in MODES}
+    same_forest_gap = 0.0
+    for end in range(window, window + steps):
+        history = raw.iloc[end - window:end].reset_index(drop=True)
+        for mode, compact in MODES.items():
+            predictor = StockPredictor(compact=compact)
+            df = predictor.add_sentiment(predictor.create_technical_indicators(history.copy()))
+            predictor.train_model(df)
+            predictions[mode].append(predictor.predict_from_features(df)[0])
+            if not compact:
+                X, _, _ = predictor.create_sequences(df)
+                X_scaled = predictor.scaler.transform(X)
+                compacted = CompactForest(predictor.model).predict(X_scaled)
+                gap = np.abs(compacted - predictor.model.predict(X_scaled)).max()
+                same_forest_gap = max(same_forest_gap, gap)
+    actual = close[window:window + steps]
+    errors = {mode: np.mean(np.abs(np.array(values) - actual)) for mode, values in predictions.items()}
+    gap = np.mean(np.abs(np.array(predictions["compact"]) - np.array(predictions["default"])))
+    return errors, gap, same_forest_gap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--candles', type=int, default=1000)
+    parser.add_argument('--window', type=int, default=500)
+    parser.add_argument('--steps', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.symbols} symbols x {args.candles} candles, random_forest")
+    print(f"{'mode':<8} {'RSS/symbol [MB]':>16} {'pickle [MB]':>12} {'model [MB]':>11} "
+          f"{'frame [KB]':>11} {'X [KB]':>9}")
+    context = multiprocessing.get_context("spawn")
+    resident = {}
+    for mode, compact in MODES.items():
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            resident[mode] = pool.submit(resident_per_symbol, compact, args.symbols, args.candles).result()
+        size = sizes(compact, args.candles)
+        print(f"{mode:<8} {resident[mode] / 2**20:>16.2f} {size['pickle'] / 2**20:>12.2f} "
+              f"{size['model'] / 2**20:>11.2f} {size['frame'] / 2**10:>11.1f} {size['sequences'] / 2**10:>9.1f}")
+    print(f"compact holds {resident['default'] / resident['compact']:.1f}x more symbols per MB")
+
+    errors, gap, same_forest_gap = walk_forward(args.window, args.steps)
+    print(f"\n{args.steps} one-step-ahead predictions over a {args.window}-candle window")
+    for mode, mae in errors.items():
+        print(f"{mode:<8} MAE {mae:.6f}")
+    print(f"mean |compact - default| prediction: {gap:.3e}")
+    print(f"largest |CompactForest - forest| on the same inputs: {same_forest_gap:.3e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare full refits with incremental updates as new candles arrive.
+
+Walks a synthetic series forward ``--step`` candles at a time over a sliding
+``--window``-candle history. At each step every backend either refits
+(random_forest) or updates (incremental_forest, sgd), then predicts the next
+close. Reports mean fit/update time and one-step-ahead MAE. Run from the
+AIService directory:
+
+    python -m benchmarks.bench_incremental [--steps 20] [--step 5] [--window 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import PREDICTOR_BACKENDS, StockPredictor
+
+
+def run_backend(backend, features, close, window, step, steps):
+    predictor = StockPredictor(backend=backend)
+    start = time.perf_counter()
+    predictor.train_model(features.iloc[:window])
+    initial_fit = time.perf_counter() - start
+
+    fit_times, errors = [], []
+    for i in range(1, steps + 1):
+        end = window + i * step
+        df = features.iloc[end - window:end].reset_index(drop=True)
+        start = time.perf_counter()
+        if predictor.supports_incremental:
+            predictor.update_model(df)
+        else:
+            predictor.train_model(df)
+        fit_times.append(time.perf_counter() - start)
+
+        prediction, _, _ = predictor.predict_from_features(df)
+        errors.append(abs(prediction - close[end]))
+
+    return initial_fit, np.mean(fit_times), np.mean(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--step', type=int, default=5)
+    parser.add_argument('--window', type=int, default=500)
+    parser.add_argument('--backends', nargs='+', default=list(PREDICTOR_BACKENDS))
+    args = parser.parse_args()
+
+    raw = make_ohlcv(args.window + args.steps * args.step + 1, seed=7)
+    predictor = StockPredictor()
+    features = predictor.add_sentiment(
+        predictor.create_technical_indicators(raw.copy()))
+    close = raw['close'].to_numpy()
+
+    print(f"{args.steps} steps of {args.step} candles over a {args.window}-candle window")
+    print(f"{'backend':<20} {'initial fit [s]':>16} {'per step [s]':>13} {'MAE':>10}")
+    for backend in args.backends:
+        initial, per_step, mae = run_backend(
+            backend, features, close, args.window, args.step, args.steps)
+        print(f"{backend:<20} {initial:>16.3f} {per_step:>13.3f} {mae:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Check IndicatorEngine against the pandas indicators and time both.
+
+The streaming engine must reproduce create_technical_indicators row for row
+(up to floating-point rounding); the script exits non-zero if it does not.
+tests/test_indicator_engine.py holds the parity tests. Run from the
+AIService directory:
+
+    python -m benchmarks.bench_indicator_engine [--rows 5000] [--updates 500]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_ohlcv
+from models.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+from models.predictor import StockPredictor
+
+
+def check_parity(df, rtol=1e-9, atol=1e-9) -> bool:
+    expected = StockPredictor().create_technical_indicators(df.copy())
+    actual = IndicatorEngine.from_frame(df, history=len(df)).frame()
+    ok = True
+    for column in INDICATOR_COLUMNS:
+        a = actual[column].to_numpy(dtype=float)
+        e = expected[column].to_numpy(dtype=float)
+        if not np.allclose(a, e, rtol=rtol, atol=atol, equal_nan=True):
+            worst = np.nanmax(np.abs(a - e))
+            print(f"  MISMATCH {column}: max abs diff {worst:.3e}")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--updates', type=int, default=500)
+    args = parser.parse_args()
+
+    ok = True
+    for seed, price in [(0, 100.0), (1, 60_000.0), (2, 0.05)]:
+        df = make_ohlcv(args.rows, seed=seed, start_price=price)
+        # Flat stretch: zero deltas and a constant 20-bar window
+        df.loc[100:130, ['open', 'high', 'low', 'close']] = price
+        parity = check_parity(df)
+        print(f"parity seed={seed} start_price={price}: {'ok' if parity else 'FAILED'}")
+        ok &= parity
+
+    # Rolling update: one new candle at a time on top of a 1000-candle window
+    df = make_ohlcv(1000 + args.updates)
+    window, updates = df.iloc[:1000], df.iloc[1000:]
+    predictor = StockPredictor()
+
+    start = time.perf_counter()
+    for i in range(args.updates):
+        predictor.create_technical_indicators(df.iloc[i + 1:1001 + i].copy())
+    batch = (time.perf_counter() - start) / args.updates
+
+    engine = IndicatorEngine.from_frame(window)
+    start = time.perf_counter()
+    for row in updates.itertuples(index=False):
+        engine.append(*row)
+    incremental = (time.perf_counter() - start) / args.updates
+
+    print(f"per new candle: pandas recompute {batch * 1e3:.3f} ms, "
+          f"engine append {incremental * 1e6:.1f} us ({batch / incremental:.0f}x)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Time the shared indicator kernels against the pandas expressions they replace.
+
+rolling_mean_many computes the predictor's four SMAs (sma_5 .. sma_50) in
+one pass; pandas takes one rolling().mean() per window. rolling_max and
+rolling_min give high_20 and low_20. Each is timed for every size in
+--rows, after a quick check that the results agree; tests/test_indicators.py
+holds the full parity tests. Run from the AIService directory:
+
+    python -m benchmarks.bench_indicators [--rows 1000 100000 1000000] [--repeat 5]
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.report import measure
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import SMA_WINDOWS, kernels
+
+
+def bench_size(rows: int, repeat: int) -> bool:
+    df = make_ohlcv(rows)
+    close, high = df["close"].to_numpy(), df["high"].to_numpy()
+    series = pd.Series(close)
+    cases = [
+        (f"rolling_mean_many({len(SMA_WINDOWS)})", lambda: kernels.rolling_mean_many(close, SMA_WINDOWS),
+         lambda: np.stack([series.rolling(window).mean() for window in SMA_WINDOWS])),
+        ("rolling_max(20)", lambda: kernels.rolling_max(high, 20),
+         lambda: pd.Series(high).rolling(20).max().to_numpy()),
+        ("rolling_min(20)", lambda: kernels.rolling_min(high, 20),
+         lambda: pd.Series(high).rolling(20).min().to_numpy()),
+    ]
+
+    ok = True
+    print(f"{rows} bars")
+    print(f"{'kernel':<22} {'kernel [ms]':>12} {'pandas [ms]':>12} {'speedup':>8}")
+    for name, kernel, reference in cases:
+        if not np.allclose(kernel(), reference(), rtol=1e-9, equal_nan=True):
+            print(f"  MISMATCH {name}")
+            ok = False
+        kernel_s = measure(kernel, repeat)["best_s"]
+        reference_s = measure(reference, repeat)["best_s"]
+        print(f"{name:<22} {kernel_s * 1e3:>12.2f} {reference_s * 1e3:>12.2f} {reference_s / kernel_s:>7.2f}x")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    ok = True
+    for rows in args.rows:
+        ok &= bench_size(rows, args.repeat)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare request parsing + DataFrame construction for the three payload formats.
+
+Times the part of a request before indicators are computed: JSON validation
+into the request model, sorting, and building the OHLCV frame. Run from the
+AIService directory:
+
+    python -m benchmarks.bench_ingestion [--candles 1000]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import StockPredictor
+from models.schemas import ColumnarPredictionRequest, PredictionRequest
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candles', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    df = make_ohlcv(args.candles)
+    predictor = StockPredictor()
+
+    objects = json.dumps({"symbol": "BTCUSDT", "candles": [
+        {"openTime": int(r.timestamp), "open": r.open, "high": r.high,
+         "low": r.low, "close": r.close, "volume": r.volume}
+        for r in df.itertuples(index=False)]})
+    columns = json.dumps({"symbol": "BTCUSDT", "columns": {
+        "openTime": df['timestamp'].tolist(), "open": df['open'].tolist(),
+        "high": df['high'].tolist(), "low": df['low'].tolist(),
+        "close": df['close'].tolist(), "volume": df['volume'].tolist()}})
+    # Binance sends prices as strings and 12 fields per kline
+    klines = json.dumps({"symbol": "BTCUSDT", "klines": [
+        [int(r.timestamp), f"{r.open:.8f}", f"{r.high:.8f}", f"{r.low:.8f}",
+         f"{r.close:.8f}", f"{r.volume:.8f}", int(r.timestamp) + 59_999,
+         "0", 100, "0", "0", "0"]
+        for r in df.itertuples(index=False)]})
+
+    def candle_objects():
+        request = PredictionRequest.model_validate_json(objects)
+        candles = sorted(request.candles, key=lambda x: x.timestamp)
+        predictor.candles_to_frame(candles)
+
+    def columnar(body):
+        request = ColumnarPredictionRequest.model_validate_json(body)
+        predictor.arrays_to_frame(request.arrays)
+
+    baseline = best_of(candle_objects, args.repeat)
+    print(f"{args.candles} candles, best of {args.repeat}")
+    print(f"  CandleData objects: {baseline * 1e3:7.2f} ms")
+    for name, body in [("columns", columns), ("raw klines", klines)]:
+        elapsed = best_of(lambda: columnar(body), args.repeat)
+        print(f"  {name + ':':<19} {elapsed * 1e3:7.2f} ms ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
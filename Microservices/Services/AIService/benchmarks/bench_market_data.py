@@ -0,0 +1,109 @@
+"""Check the Binance client against the local kline replay server and time it.
+
+Pagination, the incremental cache and rate-limit handling must return
+exactly the klines the server holds; the script exits non-zero if they do
+not. The timing compares one fresh requests.get per symbol (the old
+get_binance_data) with fetch_many() on the pooled session. Run from the
+AIService directory:
+
+    python -m benchmarks.bench_market_data [--symbols 20] [--latency 0.02]
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.kline_server import KlineReplayServer
+from benchmarks.synthetic import make_klines
+from core.market_data import KLINES_PATH, BinanceClient
+
+INTERVAL = "1m"
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"  {name}: {'ok' if ok else 'FAILED'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=3500, help="Klines per symbol on the server")
+    parser.add_argument('--latency', type=float, default=0.02, help="Server seconds per response")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    klines = {(symbol, INTERVAL): make_klines(args.rows, seed=i) for i, symbol in enumerate(symbols)}
+    server = KlineReplayServer({key: list(rows) for key, rows in klines.items()},
+                               latency=args.latency).start()
+    symbol, rows = symbols[0], klines[(symbols[0], INTERVAL)]
+
+    print("correctness")
+    ok = True
+    client = BinanceClient(base_url=server.url)
+    ok &= check("forward pages from startTime",
+                client.klines(symbol, INTERVAL, start_time=rows[0][0]) == rows)
+    ok &= check("backward pages for a limit", client.klines(symbol, INTERVAL, limit=2500) == rows[-2500:])
+    ok &= check("startTime/endTime window",
+                client.klines(symbol, INTERVAL, start_time=rows[10][0], end_time=rows[1500][0]) == rows[10:1501])
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = BinanceClient(base_url=server.url, cache_dir=cache_dir)
+        first = client.history(symbol, INTERVAL, limit=2000)
+        # Two new candles, and the last one stored so far closed at a different price
+        update = make_klines(3, seed=99, start_time=rows[-1][0], step_ms=60_000)
+        server.append(symbol, INTERVAL, update)
+        before = len(server.requests)
+        second = client.history(symbol, INTERVAL, limit=2000)
+        expected = (rows[:-1] + update)[-2000:]
+        ok &= check("cold cache", first == rows[-2000:])
+        ok &= check(f"incremental update ({len(server.requests) - before} request)",
+                    second == expected and len(server.requests) - before == 1)
+        ok &= check("older history behind the cache",
+                    client.history(symbol, INTERVAL, limit=3000) == (rows[:-1] + update)[-3000:])
+
+    limited = KlineReplayServer(dict(klines), weight_per_minute=12, window_seconds=1.0).start()
+    client = BinanceClient(base_url=limited.url, max_retries=5)
+    results, errors = client.fetch_many(symbols[:3], INTERVAL, limit=1000)
+    ok &= check(f"rate limited ({client.stats()['rate_limited']} 429s)",
+                not errors and all(results[s] == klines[(s, INTERVAL)][-1000:] for s in symbols[:3]))
+    limited.shutdown()
+
+    print(f"timing: {len(symbols)} symbols x 1000 klines, {args.latency * 1e3:.0f} ms server latency")
+    start = time.perf_counter()
+    for s in symbols:
+        response = requests.get(f"{server.url}{KLINES_PATH}?symbol={s}&interval={INTERVAL}&limit=1000")
+        response.raise_for_status()
+        response.json()
+    baseline = time.perf_counter() - start
+    print(f"  requests.get per symbol: {baseline:.2f}s")
+
+    client = BinanceClient(base_url=server.url, max_concurrency=8)
+    start = time.perf_counter()
+    results, errors = client.fetch_many(symbols, INTERVAL, limit=1000)
+    elapsed = time.perf_counter() - start
+    print(f"  fetch_many, pooled:      {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+    ok &= check("fetch_many results", not errors and all(
+        results[s] == server.klines[(s, INTERVAL)][-1000:] for s in symbols))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Whole history: several pages cold, one request for the newest candles warm
+        client = BinanceClient(base_url=server.url, max_concurrency=8, cache_dir=cache_dir)
+        start = time.perf_counter()
+        client.fetch_many(symbols, INTERVAL, limit=args.rows)
+        cold = time.perf_counter() - start
+        before = client.requests
+        start = time.perf_counter()
+        client.fetch_many(symbols, INTERVAL, limit=args.rows)
+        warm = time.perf_counter() - start
+        print(f"  {args.rows} klines per symbol: cold cache {cold:.2f}s ({before} requests), "
+              f"warm cache {warm:.2f}s ({client.requests - before} requests)")
+
+    server.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
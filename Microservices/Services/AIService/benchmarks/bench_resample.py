@@ -0,0 +1,234 @@
+"""Check klines resampled from a base interval against pandas, and count downloads.
+
+The local kline replay server holds enough 1m klines for --symbols
+symbols, ending at the current minute, plus the higher intervals built from
+them with pandas resample(), the way Binance aggregates. ResampledKlines
+(base 1m) must return exactly those higher-interval klines, cold and after
+each of --rounds new 1m candles, while the intervals' views are updated
+incrementally. A second check resamples 1h klines to 1d and Monday-aligned
+1w ones. The script exits non-zero on a mismatch.
+
+Download volume is counted on the server for fetching --limit candles of
+each of --intervals per symbol directly, interval by interval, and through
+ResampledKlines, cold and per round of polling for new candles. Last, the
+aggregation itself is timed against pandas on --timing-rows 1m klines. Run
+from the AIService directory:
+
+    python -m benchmarks.bench_resample [--symbols 5] [--intervals 1m 5m 15m 1h] [--limit 100]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.kline_server import KlineReplayServer
+from benchmarks.report import measure
+from benchmarks.synthetic import make_ohlcv
+from core.market_data import BinanceClient, kline_weight
+from core.resample import ResampledKlines, bucket_spec, klines_to_array, resample
+
+BASE = "1m"
+DAY_MS = 86_400_000
+AGGREGATE = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum",
+             "quote_volume": "sum", "trades": "sum", "taker_base": "sum", "taker_quote": "sum"}
+PANDAS_RULES = {"m": "min", "h": "h", "d": "D"}
+
+
+def base_frame(n_rows: int, seed: int, start_time: int, step_ms: int) -> pd.DataFrame:
+    """make_ohlcv plus the quote volume, trade count and taker volumes Binance reports"""
+    df = make_ohlcv(n_rows, seed=seed, start_time=start_time, step_ms=step_ms)
+    rng = np.random.default_rng(seed + 1000)
+    df["quote_volume"] = (df["volume"] * df["close"]).round(8)
+    df["trades"] = rng.integers(1, 500, n_rows)
+    df["taker_base"] = (df["volume"] * rng.uniform(0, 1, n_rows)).round(8)
+    df["taker_quote"] = (df["taker_base"] * df["close"]).round(8)
+    df[["open", "high", "low", "close", "volume"]] = df[["open", "high", "low", "close", "volume"]].round(8)
+    return df
+
+
+def to_klines(df: pd.DataFrame, step_ms: int) -> list:
+    return [[int(r.timestamp), f"{r.open:.8f}", f"{r.high:.8f}", f"{r.low:.8f}", f"{r.close:.8f}",
+             f"{r.volume:.8f}", int(r.timestamp) + step_ms - 1, f"{r.quote_volume:.8f}", int(r.trades),
+             f"{r.taker_base:.8f}", f"{r.taker_quote:.8f}", "0"]
+            for r in df.itertuples(index=False)]
+
+
+def pandas_resample(df: pd.DataFrame, interval: str) -> list:
+    """Reference klines of interval, built with pandas from base candles"""
+    length_ms, _ = bucket_spec(interval)
+    unit = interval[-1]
+    rule = "W-MON" if unit == "w" else f"{interval[:-1]}{PANDAS_RULES[unit]}"
+    indexed = df.set_index(pd.to_datetime(df["timestamp"], unit="ms"))
+    kwargs = {"closed": "left", "label": "left"}
+    if unit != "w":
+        kwargs["origin"] = "epoch"
+    out = indexed.resample(rule, **kwargs).agg(AGGREGATE).dropna(subset=["open"])
+    out.insert(0, "timestamp", out.index.as_unit("ms").asi8)
+    return to_klines(out.reset_index(drop=True), length_ms)
+
+
+def same(actual: list, expected: list) -> bool:
+    if len(actual) != len(expected):
+        return False
+    if not len(actual):
+        return True
+    a, b = klines_to_array(actual), klines_to_array(expected)
+    prices_equal = [row[1:5] for row in actual] == [row[1:5] for row in expected]
+    return prices_equal and np.array_equal(a[:, [0, 6, 8]], b[:, [0, 6, 8]]) and np.allclose(a, b, rtol=1e-12)
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"  {name}: {'ok' if ok else 'FAILED'}")
+    return ok
+
+
+class Market:
+    """Base candles per symbol on a replay server, with the higher intervals built from them"""
+
+    def __init__(self, symbols: list, intervals: list, n_rows: int, end_time: int):
+        self.intervals = intervals
+        self.frames = {symbol: base_frame(n_rows, i, end_time - (n_rows - 1) * 60_000, 60_000)
+                       for i, symbol in enumerate(symbols)}
+        self.server = KlineReplayServer(self.build()).start()
+
+    def build(self) -> dict:
+        klines = {}
+        for symbol, df in self.frames.items():
+            klines[(symbol, BASE)] = to_klines(df, 60_000)
+            for interval in self.intervals:
+                klines[(symbol, interval)] = pandas_resample(df, interval)
+        return klines
+
+    def tick(self, seed: int):
+        """One more base candle per symbol, and the higher intervals rebuilt"""
+        for i, (symbol, df) in enumerate(self.frames.items()):
+            last = df.iloc[-1]
+            new = base_frame(1, seed * 1000 + i, int(last.timestamp) + 60_000, 60_000)
+            new[["open"]] = last.close
+            new["high"] = np.maximum(new["high"], new["open"])
+            new["low"] = np.minimum(new["low"], new["open"])
+            self.frames[symbol] = pd.concat([df, new], ignore_index=True)
+        with self.server._lock:
+            self.server.klines = self.build()
+
+    def downloads(self, since: int) -> tuple:
+        """(requests, weight) the server saw from request number since on"""
+        served = self.server.requests[since:]
+        return len(served), sum(kline_weight(min(int(q.get("limit", 500)), 1000)) for q in served)
+
+
+def check_parity(args) -> bool:
+    print("parity")
+    ok = True
+    now_minute = int(time.time() * 1000) // 60_000 * 60_000
+    need_minutes = max(bucket_spec(i)[0] for i in args.intervals) // 60_000 * args.limit
+    # Whole days, so the first bucket of every interval is complete
+    n_rows = (need_minutes // 1440 + 2) * 1440 + now_minute % DAY_MS // 60_000
+    market = Market(["SYMUSDT"], args.intervals, n_rows, now_minute)
+    store = ResampledKlines(BinanceClient(base_url=market.server.url), BASE, refresh_seconds=0)
+    for interval in args.intervals:
+        expected = market.server.klines[("SYMUSDT", interval)][-args.limit:]
+        ok &= check(f"{interval} history, cold", same(store.history("SYMUSDT", interval, args.limit), expected))
+
+    last_open = {i: store.history("SYMUSDT", i, 1)[-1][0] for i in args.intervals}
+    rebuilds = store.stats()["view_rebuilds"]
+    for round_ in range(args.rounds):
+        market.tick(round_)
+        for interval in args.intervals:
+            expected = [row for row in market.server.klines[("SYMUSDT", interval)] if row[0] >= last_open[interval]]
+            ok &= same(store.klines("SYMUSDT", interval, start_time=last_open[interval]), expected)
+    stats = store.stats()
+    ok &= check(f"{args.rounds} new candles ({stats['view_updates']} incremental view updates, "
+                f"{stats['view_rebuilds'] - rebuilds} rebuilds)", ok and stats["view_rebuilds"] == rebuilds)
+    market.server.shutdown()
+
+    # Days and Monday weeks from hourly klines
+    start = int(pd.Timestamp("2024-01-01").value // 10**6)
+    hourly = base_frame(24 * 120, 3, start, 3_600_000)
+    server = KlineReplayServer({("SYMUSDT", "1h"): to_klines(hourly, 3_600_000)}).start()
+    store = ResampledKlines(BinanceClient(base_url=server.url), "1h", refresh_seconds=0)
+    for interval in ("1d", "1w"):
+        expected = pandas_resample(hourly, interval)
+        actual = store.klines("SYMUSDT", interval, start_time=start, limit=len(expected))
+        ok &= check(f"{interval} from 1h", same(actual, expected))
+    ok &= check("weeks open on Monday", all(
+        pd.Timestamp(row[0], unit="ms").dayofweek == 0 for row in store.klines("SYMUSDT", "1w", start_time=start)))
+    server.shutdown()
+    return ok
+
+
+def count_downloads(args):
+    now_minute = int(time.time() * 1000) // 60_000 * 60_000
+    need_minutes = max(bucket_spec(i)[0] for i in args.intervals) // 60_000 * args.limit
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    market = Market(symbols, args.intervals, need_minutes + 1440, now_minute)
+    sources = {
+        "direct, per interval": BinanceClient(base_url=market.server.url),
+        f"resampled from {BASE}": ResampledKlines(BinanceClient(base_url=market.server.url), BASE),
+    }
+
+    print(f"\ndownloads: {args.symbols} symbols x {len(args.intervals)} intervals "
+          f"({' '.join(args.intervals)}), {args.limit} candles each, {args.rounds} polls")
+    print(f"{'':<34} {'requests':>9} {'weight':>7} {'rows':>8}")
+    for name, source in sources.items():
+        before, rows_before = len(market.server.requests), source.stats()["fetched_rows"]
+        last_open = {(symbol, interval): source.history(symbol, interval, args.limit)[-1][0]
+                     for symbol in symbols for interval in args.intervals}
+        requests, weight = market.downloads(before)
+        rows = source.stats()["fetched_rows"] - rows_before
+        print(f"{name + ', cold':<34} {requests:>9} {weight:>7} {rows:>8}")
+
+        # Polling for new candles, as a stream per (symbol, interval) does
+        before, rows_before = len(market.server.requests), source.stats()["fetched_rows"]
+        for round_ in range(args.rounds):
+            market.tick(100 + round_)
+            time.sleep(1.1)  # past the store's refresh interval
+            for (symbol, interval), after in last_open.items():
+                source.klines(symbol, interval, start_time=after)
+        requests, weight = market.downloads(before)
+        rows = source.stats()["fetched_rows"] - rows_before
+        print(f"{name + ', per poll':<34} {requests / args.rounds:>9.1f} {weight / args.rounds:>7.1f} "
+              f"{rows / args.rounds:>8.1f}")
+    market.server.shutdown()
+
+
+def bench_aggregation(rows: int, repeat: int):
+    df = base_frame(rows, 0, 1_700_006_400_000, 60_000)
+    values = klines_to_array(to_klines(df, 60_000))
+    indexed = df.set_index(pd.to_datetime(df["timestamp"], unit="ms")).drop(columns="timestamp")
+    print(f"\naggregation of {rows} 1m klines")
+    print(f"{'interval':<9} {'resample [ms]':>14} {'pandas [ms]':>12} {'ratio':>7} {'update [ms]':>12}")
+    for interval in ("5m", "1h", "4h", "1d"):
+        length_ms, offset_ms = bucket_spec(interval)
+        rule = f"{interval[:-1]}{PANDAS_RULES[interval[-1]]}"
+        ours = measure(lambda: resample(values, length_ms, offset_ms), repeat)["best_s"]
+        pandas = measure(lambda: indexed.resample(rule, closed="left", label="left", origin="epoch")
+                         .agg(AGGREGATE), repeat)["best_s"]
+        # What a top-up costs: the last bucket and one new candle re-aggregated
+        view = resample(values, length_ms, offset_ms)
+        first = np.searchsorted(values[:, 0], view[-1, 0])
+        update = measure(lambda: np.concatenate((view[:-1], resample(values[first:], length_ms, offset_ms,
+                                                                    drop_partial_first=False))), repeat)["best_s"]
+        print(f"{interval:<9} {ours * 1e3:>14.2f} {pandas * 1e3:>12.2f} {pandas / ours:>6.1f}x {update * 1e3:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5)
+    parser.add_argument('--intervals', nargs='+', default=["1m", "5m", "15m", "1h"])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--timing-rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    ok = check_parity(args)
+    count_downloads(args)
+    bench_aggregation(args.timing_rows, args.repeat)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Compare the as-of sentiment join against the original merge + ffill.
+
+Sentiment readings are spread at random over the candle window, so few
+land exactly on a candle openTime. For each size the script times packing
+the SentimentData objects into arrays, the as-of join, and the legacy
+merge, and checks that both joins agree when readings are taken only at
+candle open times. Run from the AIService directory:
+
+    python -m benchmarks.bench_sentiment [--candles 1000] [--sizes 100 10000 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import SENTIMENT_COLUMNS, StockPredictor
+from models.schemas import SentimentArrays, SentimentData
+
+
+def legacy_add_sentiment(df, sentiment):
+    """The exact-timestamp merge add_sentiment used to do"""
+    sentiment_df = pd.DataFrame([{
+        'timestamp': s.timestamp,
+        'sentiment_score': s.sentiment_score,
+        'news_count': s.news_count,
+        'social_mentions': s.social_mentions
+    } for s in sentiment])
+    df = df.merge(sentiment_df, on='timestamp', how='left')
+    df[SENTIMENT_COLUMNS] = df[SENTIMENT_COLUMNS].ffill()
+    df[SENTIMENT_COLUMNS] = df[SENTIMENT_COLUMNS].fillna(0)
+    return df
+
+
+def make_sentiment(timestamps, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    n = len(timestamps)
+    return [SentimentData(timestamp=int(t), sentiment_score=float(score),
+                          news_count=int(news), social_mentions=int(social))
+            for t, score, news, social in zip(timestamps, rng.uniform(-1, 1, n),
+                                              rng.integers(0, 20, n), rng.integers(0, 500, n))]
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def check_parity(candles: pd.DataFrame):
+    """On readings at candle open times the as-of join must match the legacy merge"""
+    rng = np.random.default_rng(1)
+    at_candles = np.sort(rng.choice(candles['timestamp'].to_numpy(), len(candles) // 10, replace=False))
+    sentiment = make_sentiment(at_candles)
+    expected = legacy_add_sentiment(candles.copy(), sentiment)[SENTIMENT_COLUMNS].to_numpy()
+    aligned = StockPredictor().add_sentiment(candles.copy(), sentiment)[SENTIMENT_COLUMNS].to_numpy()
+    assert np.array_equal(aligned, expected), "as-of join differs from the legacy merge"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candles', type=int, default=1000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    candles = make_ohlcv(args.candles)
+    check_parity(candles)
+
+    predictor = StockPredictor()
+    decaying = StockPredictor(sentiment_tolerance_ms=3_600_000, sentiment_half_life_ms=600_000)
+    first, last = int(candles['timestamp'].iloc[0]), int(candles['timestamp'].iloc[-1])
+    print(f"{args.candles} candles; readings at random times over the window")
+    print(f"{'readings':>9} {'matched':>8} {'pack [ms]':>10} {'as-of [ms]':>11} "
+          f"{'decay [ms]':>11} {'legacy [ms]':>12} {'speedup':>8}")
+    for size in args.sizes:
+        rng = np.random.default_rng(size)
+        sentiment = make_sentiment(rng.integers(first, last + 1, size))
+
+        pack, arrays = best_of(lambda: SentimentArrays.from_records(sentiment), args.repeat)
+        asof, df = best_of(lambda: predictor.add_sentiment(candles.copy(), arrays), args.repeat)
+        decay, _ = best_of(lambda: decaying.add_sentiment(candles.copy(), arrays), args.repeat)
+        legacy, old = best_of(lambda: legacy_add_sentiment(candles, sentiment), args.repeat)
+        # Candles the legacy merge gave a reading of their own rather than a forward-filled one
+        matched = int(np.isin(candles['timestamp'], arrays.timestamp).sum())
+
+        total = pack + asof
+        print(f"{size:>9} {matched:>8} {pack * 1e3:>10.2f} {asof * 1e3:>11.2f} "
+              f"{decay * 1e3:>11.2f} {legacy * 1e3:>12.2f} {legacy / total:>7.1f}x")
+        assert len(df) == len(candles), "the join must keep one row per candle"
+        if len(old) != len(candles):
+            print(f"{'':>9} legacy merge duplicated candles: {len(old)} rows")
+
+
+if __name__ == '__main__':
+    main()
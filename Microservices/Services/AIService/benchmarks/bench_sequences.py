@@ -0,0 +1,70 @@
+"""Compare the strided create_sequences against the original iloc loop.
+
+The legacy loop is kept in tests/legacy.py, and tests/test_sequences.py
+checks that both give the same arrays. The legacy loop copies the whole
+feature frame on every row and takes minutes at 100k rows, so by default
+only its first --legacy-rows sequences are built, on the full-size frame,
+and its time is scaled up to all of them (marked ~).
+--full-legacy runs it to the end. Run from the AIService directory:
+
+    python -m benchmarks.bench_sequences [--sizes 100 1000 100000] [--legacy-rows 2000] [--full-legacy]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import StockPredictor
+from tests.legacy import legacy_create_sequences
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 1000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-rows', type=int, default=2000,
+                        help="Sequences the legacy loop builds before its time is extrapolated")
+    parser.add_argument('--full-legacy', action='store_true',
+                        help="Run the legacy loop over every row")
+    args = parser.parse_args()
+
+    predictor = StockPredictor()
+    print(f"{'rows':>8} {'legacy [ms]':>12} {'strided [ms]':>13} {'last only [ms]':>15} {'speedup':>8}")
+    for size in args.sizes:
+        df = predictor.create_technical_indicators(make_ohlcv(size))
+        df['sentiment_score'] = 0
+        df['news_count'] = 0
+        df['social_mentions'] = 0
+
+        strided, (X, y, columns) = best_of(
+            lambda: predictor.create_sequences(df), args.repeat)
+        last, _ = best_of(lambda: predictor.create_sequences(
+            df, last_only=True), args.repeat)
+        limit = None if args.full_legacy or len(X) <= args.legacy_rows else args.legacy_rows
+        # The legacy loop takes minutes at 100k rows, so time it only once there
+        legacy, (X_old, y_old) = best_of(
+            lambda: legacy_create_sequences(df, columns, limit=limit),
+            1 if size > 10_000 else args.repeat)
+        assert np.array_equal(X[:len(X_old)], X_old) and np.array_equal(y[:len(y_old)], y_old)
+        estimated = " "
+        if limit is not None:
+            legacy *= len(X) / limit
+            estimated = "~"
+
+        print(f"{size:>8} {estimated}{legacy * 1e3:>11.2f} {strided * 1e3:>13.3f} "
+              f"{last * 1e3:>15.3f} {legacy / strided:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
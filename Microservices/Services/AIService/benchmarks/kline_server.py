@@ -0,0 +1,163 @@
+"""Local stand-in for Binance's /api/v3/klines that replays recorded klines.
+
+Serves startTime/endTime/limit queries the way Binance does (oldest first,
+at most 1000 rows, newest rows when no startTime is given) from klines held
+in memory, reports X-MBX-USED-WEIGHT-1M and answers 429 with Retry-After
+once a request would exceed its weight limit. Point BINANCE_BASE_URL at it:
+
+    python -m benchmarks.kline_server --record recorded.json --symbols BTCUSDT ETHUSDT
+    python -m benchmarks.kline_server --data recorded.json --port 8900
+
+--record fetches the klines from the configured BINANCE_BASE_URL and saves
+them as {"SYMBOL:interval": [rows...]}; without --data synthetic klines are
+served.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from core.market_data import DEFAULT_LIMIT, KLINES_PATH, MAX_LIMIT, USED_WEIGHT_HEADER, kline_weight
+
+
+class KlineReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, klines: dict, port: int = 0, latency: float = 0.0,
+                 weight_per_minute: int = 0, window_seconds: float = 60.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.klines = klines  # (symbol, interval) -> rows, oldest first
+        self.latency = latency
+        self.weight_per_minute = weight_per_minute
+        self.window_seconds = window_seconds
+        self.requests = []  # query parameters of every request served
+        self._spent = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "KlineReplayServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def append(self, symbol: str, interval: str, rows: list):
+        """New candles; a row with the last stored openTime replaces it"""
+        with self._lock:
+            stored = self.klines.setdefault((symbol, interval), [])
+            while stored and rows and stored[-1][0] >= rows[0][0]:
+                stored.pop()
+            stored.extend(rows)
+
+    def charge(self, weight: int):
+        """Record a request's weight; returns (used weight, rejected)"""
+        with self._lock:
+            now = time.monotonic()
+            while self._spent and self._spent[0][0] <= now - self.window_seconds:
+                self._spent.popleft()
+            used = sum(w for _, w in self._spent)
+            if self.weight_per_minute and used + weight > self.weight_per_minute:
+                return used, True
+            self._spent.append((now, weight))
+            return used + weight, False
+
+    def query(self, symbol, interval, start_time, end_time, limit) -> list:
+        with self._lock:
+            rows = self.klines.get((symbol, interval))
+            if rows is None:
+                return None
+            rows = [row for row in rows
+                    if (start_time is None or row[0] >= start_time)
+                    and (end_time is None or row[0] <= end_time)]
+        return rows[:limit] if start_time is not None else rows[-limit:]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: KlineReplayServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != KLINES_PATH:
+            return self._reply(404, {"code": -1, "msg": "Not found"})
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.server.requests.append(query)
+
+        limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        used, rejected = self.server.charge(kline_weight(limit))
+        if rejected:
+            return self._reply(429, {"code": -1003, "msg": "Too many requests"},
+                               {"Retry-After": "1", USED_WEIGHT_HEADER: str(used)})
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        start_time = int(query["startTime"]) if "startTime" in query else None
+        end_time = int(query["endTime"]) if "endTime" in query else None
+        rows = self.server.query(query.get("symbol"), query.get("interval"), start_time, end_time, limit)
+        if rows is None:
+            return self._reply(400, {"code": -1121, "msg": "Invalid symbol."})
+        self._reply(200, rows, {USED_WEIGHT_HEADER: str(used)})
+
+
+def load_recording(path: str) -> dict:
+    with open(path) as f:
+        recorded = json.load(f)
+    return {tuple(key.split(":", 1)): rows for key, rows in recorded.items()}
+
+
+def record(path: str, symbols: list, interval: str, limit: int):
+    from core.market_data import BinanceClient
+
+    client = BinanceClient.from_settings()
+    recorded = {f"{symbol}:{interval}": client.klines(symbol, interval, limit=limit)
+                for symbol in symbols}
+    with open(path, "w") as f:
+        json.dump(recorded, f)
+    print(f"Recorded {', '.join(f'{key} ({len(rows)})' for key, rows in recorded.items())} to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', help="Recorded klines to serve")
+    parser.add_argument('--record', help="Fetch klines and save them here instead of serving")
+    parser.add_argument('--symbols', nargs='+', default=["BTCUSDT", "ETHUSDT"])
+    parser.add_argument('--interval', default="1m")
+    parser.add_argument('--rows', type=int, default=5000, help="Rows per symbol to record or synthesize")
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--weight-per-minute', type=int, default=1200)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.symbols, args.interval, args.rows)
+        return
+
+    if args.data:
+        klines = load_recording(args.data)
+    else:
+        from benchmarks.synthetic import make_klines
+        klines = {(symbol, args.interval): make_klines(args.rows, seed=i)
+                  for i, symbol in enumerate(args.symbols)}
+    server = KlineReplayServer(klines, args.port, args.latency, args.weight_per_minute)
+    print(f"Serving {len(klines)} kline series on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
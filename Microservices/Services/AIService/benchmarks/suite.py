@@ -0,0 +1,139 @@
+"""Benchmark suite for the prediction hot paths, reported as JSON.
+
+Covers the StockPredictor steps (prepare_features, create_technical_indicators,
+create_sequences, train_model, predict) on synthetic candles of each
+--candles size, and /predict through the FastAPI app in-process: latency of
+cold (fresh symbol, model fit) and warm (cached model) requests, and
+throughput with --concurrency requests in flight. Needs no network. Run
+from the AIService directory:
+
+    python -m benchmarks.suite [--candles 500 1000 5000] > before.json
+    python -m benchmarks.suite --compare before.json
+
+The JSON report goes to stdout (or --output), progress to stderr.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from fastapi.testclient import TestClient
+
+from benchmarks.report import Report, compare, environment, measure
+from benchmarks.synthetic import make_candles, make_ohlcv
+from main import app
+from models.predictor import StockPredictor
+
+
+def bench_predictor(report: Report, n_candles: int, repeat: int):
+    candles = make_candles(n_candles)
+    predictor = StockPredictor()
+    frame = predictor.candles_to_frame(candles)
+    features = predictor.prepare_features(candles)
+
+    report.add(f"predictor.prepare_features[{n_candles}]",
+               measure(lambda: predictor.prepare_features(candles), repeat))
+    report.add(f"predictor.create_technical_indicators[{n_candles}]",
+               measure(lambda: predictor.create_technical_indicators(frame.copy()), repeat))
+    report.add(f"predictor.create_sequences[{n_candles}]",
+               measure(lambda: predictor.create_sequences(features), repeat))
+    # Model fits dominate; fewer repeats keep the suite short
+    report.add(f"predictor.train_model[{n_candles}]",
+               measure(lambda: StockPredictor().train_model(features), max(1, repeat // 2)))
+    report.add(f"predictor.predict[{n_candles}]",
+               measure(lambda: StockPredictor().predict(candles), max(1, repeat // 2)))
+
+
+def _payload(symbol: str, n_candles: int, seed: int = 0) -> dict:
+    df = make_ohlcv(n_candles, seed)
+    candles = [{"openTime": int(row.timestamp), "open": row.open, "high": row.high,
+                "low": row.low, "close": row.close, "volume": row.volume}
+               for row in df.itertuples(index=False)]
+    return {"symbol": symbol, "interval": "1m", "candles": candles}
+
+
+def _latency(times: list, **extra) -> dict:
+    times = sorted(times)
+    return {
+        "best_s": times[0],
+        "median_s": statistics.median(times),
+        "p95_s": round(times[min(len(times) - 1, int(len(times) * 0.95))], 6),
+        "repeat": len(times),
+        **extra,
+    }
+
+
+def bench_endpoint(report: Report, n_candles: int, requests: int, cold_requests: int,
+                   concurrency: int):
+    run = uuid.uuid4().hex[:6]
+    with TestClient(app) as client:
+        def post(body):
+            start = time.perf_counter()
+            client.post("/predict", json=body).raise_for_status()
+            return time.perf_counter() - start
+
+        cold = [post(_payload(f"COLD{run}{i}", n_candles, i)) for i in range(cold_requests)]
+        report.add(f"/predict cold[{n_candles}]", _latency(cold))
+
+        warm_body = _payload(f"WARM{run}", n_candles)
+        post(warm_body)
+        warm = [post(warm_body) for _ in range(requests)]
+        report.add(f"/predict warm[{n_candles}]",
+                   _latency(warm, requests_per_s=round(len(warm) / sum(warm), 2)))
+
+    async def concurrent():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/predict", json=warm_body)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post("/predict", json=warm_body)
+                    response.raise_for_status()
+                    return time.perf_counter() - start
+
+            start = time.perf_counter()
+            times = await asyncio.gather(*(one() for _ in range(requests)))
+            return times, time.perf_counter() - start
+
+    times, elapsed = asyncio.run(concurrent())
+    report.add(f"/predict warm x{concurrency}[{n_candles}]",
+               _latency(times, requests_per_s=round(len(times) / elapsed, 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candles', type=int, nargs='+', default=[500, 1000, 5000],
+                        help="Sizes for the predictor steps")
+    parser.add_argument('--request-candles', type=int, default=500, help="Candles per /predict request")
+    parser.add_argument('--requests', type=int, default=20, help="Warm /predict requests per measurement")
+    parser.add_argument('--cold-requests', type=int, default=5, help="/predict requests that fit a model")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Earlier JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio counted as a regression with --compare")
+    args = parser.parse_args()
+
+    # Model-fit log lines would drown the progress output
+    logging.getLogger().setLevel(logging.WARNING)
+    report = Report("aiservice", environment(args, ("numpy", "pandas", "sklearn", "fastapi")))
+    print("AIService benchmarks", file=sys.stderr)
+    for n_candles in args.candles:
+        bench_predictor(report, n_candles, args.repeat)
+    bench_endpoint(report, args.request_candles, args.requests, args.cold_requests, args.concurrency)
+
+    report.write(args.output)
+    if args.compare and not compare(report.to_dict(), args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from models.schemas import CandleData
+
+
+def make_ohlcv(n_rows: int, seed: int = 0, start_price: float = 100.0,
+               start_time: int = 1_700_000_000_000, step_ms: int = 60_000) -> pd.DataFrame:
+    """Random-walk OHLCV frame with the column names used by StockPredictor"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.01, n_rows)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, n_rows))
+    return pd.DataFrame({
+        'timestamp': start_time + np.arange(n_rows, dtype=np.int64) * step_ms,
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + spread),
+        'low': np.minimum(open_, close) * (1 - spread),
+        'close': close,
+        'volume': rng.uniform(1, 1000, n_rows),
+    })
+
+
+def make_candles(n_rows: int, seed: int = 0, **kwargs) -> list:
+    """Same data as make_ohlcv, as CandleData objects"""
+    df = make_ohlcv(n_rows, seed, **kwargs)
+    return [
+        CandleData(openTime=int(row.timestamp), open=row.open, high=row.high,
+                   low=row.low, close=row.close, volume=row.volume)
+        for row in df.itertuples(index=False)
+    ]
+
+
+def make_klines(n_rows: int, seed: int = 0, **kwargs) -> list:
+    """Same data as make_ohlcv, as raw Binance klines (prices as strings, 12 fields)"""
+    df = make_ohlcv(n_rows, seed, **kwargs)
+    step_ms = kwargs.get("step_ms", 60_000)
+    return [
+        [int(r.timestamp), f"{r.open:.8f}", f"{r.high:.8f}", f"{r.low:.8f}",
+         f"{r.close:.8f}", f"{r.volume:.8f}", int(r.timestamp) + step_ms - 1,
+         "0", 100, "0", "0", "0"]
+        for r in df.itertuples(index=False)
+    ]
@@ -0,0 +1,80 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Service configuration, read from environment variables / .env"""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    model_version: str = "1.0.0"
+    min_candles: int = 100
+    max_candles: int = 1000
+
+    # Fitted model registry
+    registry_max_entries: int = 64
+    registry_ttl_seconds: float = 6 * 3600
+    registry_retrain_after_candles: int = 5
+    # Directory for fitted model snapshots; empty disables them
+    snapshot_dir: str = ""
+
+    # Model backend: "random_forest", "incremental_forest" or "sgd"
+    predictor_backend: str = "random_forest"
+    incremental_trees_per_update: int = 50
+    incremental_max_trees: int = 100
+    incremental_update_window: int = 200
+    # float32 features and flattened random forests, for many cached symbols
+    compact_mode: bool = False
+
+    # Sentiment as-of join: readings older than the tolerance are ignored
+    # and values halve every half-life (0 disables either)
+    sentiment_tolerance_seconds: float = 0.0
+    sentiment_half_life_seconds: float = 0.0
+
+    # Results of recent requests keyed by candle-window fingerprint; entries
+    # live for one candle interval, or the TTL below for unknown intervals.
+    # 0 entries disables the cache
+    prediction_cache_max_entries: int = 1024
+    prediction_cache_ttl_seconds: float = 60.0
+
+    # /predict/batch
+    batch_max_items: int = 100
+
+    # Worker pool for CPU-bound prediction work ("thread" or "process")
+    executor_kind: str = "thread"
+    executor_max_workers: int = 4
+    executor_max_queue: int = 32
+    executor_timeout_seconds: float = 30.0
+
+    # Sampling profiler: fraction of requests profiled (0 disables it),
+    # seconds between stack samples, and where folded stacks are written
+    profile_sample_rate: float = 0.0
+    profile_interval_seconds: float = 0.005
+    profile_dir: str = "profiles"
+
+    # Pushed predictions (/ws/predict, /stream/predict): candle feed
+    # ("binance" or "replay"), candles kept per stream, seconds between
+    # polls / replayed candles / retries after a failure, and messages
+    # buffered per subscriber
+    stream_feed: str = "binance"
+    stream_history_candles: int = 1000
+    stream_poll_seconds: float = 5.0
+    stream_replay_dir: str = ""
+    stream_replay_delay_seconds: float = 1.0
+    stream_retry_seconds: float = 10.0
+    stream_queue_size: int = 16
+
+    # Binance market data client (core/market_data.py)
+    binance_base_url: str = "https://api.binance.com"
+    binance_timeout_seconds: float = 10.0
+    binance_max_connections: int = 10
+    binance_max_retries: int = 3
+    binance_max_concurrency: int = 4
+    binance_weight_per_minute: int = 1200
+    # Directory for cached klines; empty disables the cache
+    kline_cache_dir: str = ""
+    # Interval fetched from Binance; multiples of it are resampled from its
+    # candles (core/resample.py). Empty fetches every interval as asked
+    kline_base_interval: str = ""
+    kline_base_max_rows: int = 100_000
+
+
+settings = Settings()
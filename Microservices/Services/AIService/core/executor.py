@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from core.metrics import collect_stages, metrics, record_stage, record_stages
+from core.profiling import sample_stacks, save_profile, should_profile
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the work queue is full and a task is rejected"""
+
+
+class ExecutorTimeout(Exception):
+    """Raised when a task does not finish within the per-request timeout"""
+
+
+def _timed_call(fn: Callable, args: tuple, profile: bool = False,
+                profile_interval: float = 0.005, report: Optional[Callable[[], dict]] = None):
+    # Runs in the worker; the start time lets the caller measure queue wait,
+    # and stage timings, profiles and the worker's report are handed back to
+    # be recorded there
+    started_at = time.time()
+    with collect_stages() as stages, sample_stacks(profile, profile_interval) as stacks:
+        result = fn(*args)
+    state = (os.getpid(), report()) if report is not None else None
+    return started_at, result, stages, stacks, state
+
+
+class PredictionExecutor:
+    """Runs CPU-bound work off the event loop on a bounded thread/process pool.
+
+    At most ``max_workers`` tasks run at once and at most ``max_queue`` more
+    wait for a worker; anything beyond that is rejected with
+    ExecutorSaturated instead of piling up. Each task gets ``timeout_seconds``
+    from submission to completion.
+
+    A ``profile_sample_rate`` fraction of tasks runs under the sampling
+    profiler, and their folded stacks are saved to ``profile_dir``.
+
+    State kept in the workers, like the model registry, is invisible to the
+    server in process mode. There ``worker_report`` (a module-level function,
+    so it pickles) is called in the worker after each task, and the latest
+    answer of every worker process is kept for ``worker_reports``.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4,
+                 max_queue: int = 32, timeout_seconds: float = 30.0,
+                 profile_sample_rate: float = 0.0, profile_interval: float = 0.005,
+                 profile_dir: str = "profiles",
+                 worker_report: Optional[Callable[[], dict]] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_interval = profile_interval
+        self.profile_dir = profile_dir
+        self.worker_report = worker_report
+
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._reports: Dict[int, dict] = {}
+
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    @property
+    def pool(self) -> Executor:
+        # Created on first use so importing this module in a worker process
+        # does not start a pool of its own.
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="predict")
+        return self._pool
+
+    @property
+    def in_flight(self) -> int:
+        return min(self._pending, self.max_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending - self.in_flight
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        """Run fn(*args) in the pool and await its result"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"{self._pending} predictions already queued or running")
+            self._pending += 1
+            self.submitted += 1
+
+        submitted_at = time.time()
+        profile = should_profile(self.profile_sample_rate)
+        report = self.worker_report if self.kind == "process" else None
+        try:
+            future = self.pool.submit(_timed_call, fn, args, profile, self.profile_interval, report)
+        except Exception:
+            self._release(None)
+            raise
+        # The slot is held until the worker really finishes, even if the
+        # caller has given up on it, so the bound stays honest.
+        future.add_done_callback(self._release)
+
+        try:
+            started_at, result, stages, stacks, state = await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=self.timeout_seconds if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise ExecutorTimeout(
+                f"Prediction did not finish within {self.timeout_seconds:g}s")
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        finished_at = time.time()
+        with self._lock:
+            self.completed += 1
+            wait = max(0.0, started_at - submitted_at)
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.run_seconds_total += finished_at - started_at
+            if state is not None:
+                self._reports[state[0]] = state[1]
+        record_stage("queue_wait", wait)
+        record_stages(stages)
+        if profile:
+            metrics.inc("profiles_total")
+            save_profile(stacks, self.profile_dir, getattr(fn, "__name__", "task"))
+        return result
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failed": self.failed,
+            "wait_seconds_avg": self.wait_seconds_total / completed,
+            "wait_seconds_max": self.wait_seconds_max,
+            "run_seconds_avg": self.run_seconds_total / completed,
+        }
+
+    def worker_reports(self) -> Dict[int, dict]:
+        """Latest worker_report of each worker process, by pid; empty in thread mode"""
+        with self._lock:
+            return dict(self._reports)
+
+    def shutdown(self):
+        self._reports = {}
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
@@ -0,0 +1,106 @@
+"""Sources of closed candles for the prediction streams.
+
+A feed gives the recent history of a (symbol, interval) to prime a stream
+with, then follows it, yielding each candle once it has closed. Candles are
+raw Binance kline rows: [openTime, open, high, low, close, volume,
+closeTime, ...].
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+
+from core.config import settings
+from core.market_data import BinanceClient, KlineCache
+from core.resample import kline_source
+
+logger = logging.getLogger(__name__)
+
+
+def kline_to_candle(row: list) -> tuple:
+    """(timestamp, open, high, low, close, volume) of a kline row"""
+    return (int(row[0]), float(row[1]), float(row[2]), float(row[3]),
+            float(row[4]), float(row[5]))
+
+
+class CandleFeed(ABC):
+    @abstractmethod
+    def history(self, symbol: str, interval: str, limit: int) -> List[list]:
+        """Up to ``limit`` of the latest closed candles, oldest first; may block"""
+
+    @abstractmethod
+    def follow(self, symbol: str, interval: str, after: int) -> AsyncIterator[list]:
+        """Closed candles opened after ``after``, as they close"""
+
+    def close(self):
+        pass
+
+
+class BinanceFeed(CandleFeed):
+    """Polls the klines endpoint through a BinanceClient (or ResampledKlines).
+
+    Between polls it sleeps until the open candle is due to close, so a
+    stream costs about one request per bar however many clients watch it.
+    """
+
+    def __init__(self, client: BinanceClient, poll_seconds: float = 5.0):
+        self.client = client
+        self.poll_seconds = poll_seconds
+
+    @staticmethod
+    def _closed(rows: list) -> list:
+        now = int(time.time() * 1000)
+        return [row for row in rows if int(row[6]) < now]
+
+    def history(self, symbol: str, interval: str, limit: int) -> List[list]:
+        # One extra row for the candle that is still open
+        return self._closed(self.client.history(symbol, interval, limit + 1))[-limit:]
+
+    async def follow(self, symbol: str, interval: str, after: int) -> AsyncIterator[list]:
+        while True:
+            rows = await asyncio.to_thread(self.client.klines, symbol, interval, start_time=after + 1)
+            for row in self._closed(rows):
+                after = int(row[0])
+                yield row
+            pending = [row for row in rows if int(row[0]) > after]
+            wait = self.poll_seconds
+            if pending:
+                # Ask again just after the open candle closes
+                wait = max(self.poll_seconds, int(pending[0][6]) / 1000 - time.time() + 0.5)
+            await asyncio.sleep(wait)
+
+    def close(self):
+        self.client.close()
+
+
+class ReplayFeed(CandleFeed):
+    """Replays klines saved in a KlineCache directory (see KLINE_CACHE_DIR).
+
+    The first ``limit`` saved candles are the history; the rest are yielded
+    one every ``delay_seconds``, then the feed goes quiet.
+    """
+
+    def __init__(self, directory: str, delay_seconds: float = 1.0):
+        self.cache = KlineCache(directory)
+        self.delay_seconds = delay_seconds
+
+    def history(self, symbol: str, interval: str, limit: int) -> List[list]:
+        return self.cache.load(symbol, interval)[:limit]
+
+    async def follow(self, symbol: str, interval: str, after: int) -> AsyncIterator[list]:
+        rows = await asyncio.to_thread(self.cache.load, symbol, interval)
+        for row in rows:
+            if int(row[0]) > after:
+                await asyncio.sleep(self.delay_seconds)
+                yield row
+        await asyncio.Event().wait()
+
+
+def make_feed(kind: Optional[str] = None) -> CandleFeed:
+    kind = kind or settings.stream_feed
+    if kind == "binance":
+        return BinanceFeed(kline_source(), settings.stream_poll_seconds)
+    if kind == "replay":
+        return ReplayFeed(settings.stream_replay_dir, settings.stream_replay_delay_seconds)
+    raise ValueError(f"Unknown stream feed: {kind}")
@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KLINES_PATH = "/api/v3/klines"
+MAX_LIMIT = 1000
+DEFAULT_LIMIT = 500
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+
+def kline_weight(limit: int) -> int:
+    """Request weight Binance charges for a klines call of this size"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightLimiter:
+    """Client-side budget for Binance's per-minute request weight.
+
+    Every request reserves its weight before it is sent and waits while the
+    last minute's weight would go over ``weight_per_minute``. The weight the
+    server reports back (shared with anything else using the same IP) is
+    folded in, and a 429/418 pauses all requests for its Retry-After.
+    """
+
+    def __init__(self, weight_per_minute: int = 1200, window_seconds: float = 60.0):
+        self.weight_per_minute = weight_per_minute
+        self.window_seconds = window_seconds
+        self._spent = deque()  # (monotonic time, weight)
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+
+    def _used(self, now: float) -> int:
+        while self._spent and self._spent[0][0] <= now - self.window_seconds:
+            self._spent.popleft()
+        return sum(weight for _, weight in self._spent)
+
+    def acquire(self, weight: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._resume_at - now
+                if wait <= 0:
+                    if not self._spent or self._used(now) + weight <= self.weight_per_minute:
+                        self._spent.append((now, weight))
+                        return
+                    wait = self._spent[0][0] + self.window_seconds - now
+                self.waits += 1
+                self.wait_seconds_total += wait
+            time.sleep(wait)
+
+    def observe(self, used_weight: int):
+        """Catch up with the weight the server says this IP has used"""
+        with self._lock:
+            now = time.monotonic()
+            missing = used_weight - self._used(now)
+            if missing > 0:
+                self._spent.append((now, missing))
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+class KlineCache:
+    """Raw klines on disk, one JSON file per (symbol, interval).
+
+    Rows are kept exactly as Binance returns them, oldest first. Files are
+    written to a temporary name and renamed into place.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def path(self, symbol: str, interval: str) -> Path:
+        name = "__".join(re.sub(r"[^A-Za-z0-9_.-]", "_", part) for part in (symbol, interval))
+        return self.directory / f"{name}.json"
+
+    def lock(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def load(self, symbol: str, interval: str) -> list:
+        path = self.path(symbol, interval)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable kline cache {path}: {str(e)}")
+            return []
+
+    def save(self, symbol: str, interval: str, rows: list):
+        path = self.path(symbol, interval)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w") as f:
+                json.dump(rows, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"Could not save kline cache {path}: {str(e)}")
+            tmp.unlink(missing_ok=True)
+
+
+def merge_klines(older: list, newer: list) -> list:
+    """older followed by newer, newer winning from its first openTime on"""
+    if not newer:
+        return older
+    first = newer[0][0]
+    keep = len(older)
+    while keep and older[keep - 1][0] >= first:
+        keep -= 1
+    return older[:keep] + newer
+
+
+class BinanceClient:
+    """Kline fetcher on one pooled HTTP session.
+
+    ``klines()`` pages through startTime/endTime for histories longer than
+    one request allows, ``history()`` does the same through the on-disk
+    cache so only candles from the last stored openTime on are fetched, and
+    ``fetch_many()`` runs several symbols concurrently. All requests share
+    one WeightLimiter; 5xx responses and connection errors are retried with
+    backoff.
+    """
+
+    def __init__(self, base_url: str = "https://api.binance.com", timeout_seconds: float = 10.0,
+                 max_connections: int = 10, max_retries: int = 3, max_concurrency: int = 4,
+                 weight_per_minute: int = 1200, cache_dir: str = ""):
+        self.base_url = base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.limiter = WeightLimiter(weight_per_minute)
+        self.cache = KlineCache(cache_dir) if cache_dir else None
+
+        self.session = requests.Session()
+        # 429/418 are left to _get_klines so the pause applies to every request
+        retry = Retry(total=max_retries, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset({"GET"}), respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.cached_rows = 0
+        self.fetched_rows = 0
+
+    @classmethod
+    def from_settings(cls) -> "BinanceClient":
+        return cls(
+            base_url=settings.binance_base_url,
+            timeout_seconds=settings.binance_timeout_seconds,
+            max_connections=settings.binance_max_connections,
+            max_retries=settings.binance_max_retries,
+            max_concurrency=settings.binance_max_concurrency,
+            weight_per_minute=settings.binance_weight_per_minute,
+            cache_dir=settings.kline_cache_dir,
+        )
+
+    def close(self):
+        self.session.close()
+
+    def _get_klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+                    end_time: Optional[int] = None, limit: int = DEFAULT_LIMIT) -> list:
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(kline_weight(limit))
+            response = self.session.get(self.base_url + KLINES_PATH, params=params,
+                                        timeout=self.timeout_seconds)
+            with self._lock:
+                self.requests += 1
+            used = response.headers.get(USED_WEIGHT_HEADER)
+            if used is not None:
+                self.limiter.observe(int(used))
+            # 429: over the limit, 418: banned for ignoring 429s
+            if response.status_code in (418, 429) and attempt < self.max_retries:
+                retry_after = float(response.headers.get("Retry-After", 1))
+                with self._lock:
+                    self.rate_limited += 1
+                logger.warning(f"Binance rate limit hit, pausing {retry_after:g}s")
+                self.limiter.pause(retry_after)
+                continue
+            response.raise_for_status()
+            rows = response.json()
+            with self._lock:
+                self.fetched_rows += len(rows)
+            return rows
+
+    def klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+               end_time: Optional[int] = None, limit: Optional[int] = None) -> list:
+        """Raw klines, oldest first, paging past Binance's 1000 per request.
+
+        From start_time on (up to end_time or now) when it is given, capped
+        at limit rows; otherwise the newest limit rows up to end_time.
+        """
+        if start_time is None:
+            remaining = limit or DEFAULT_LIMIT
+            pages = []
+            while remaining > 0:
+                want = min(remaining, MAX_LIMIT)
+                page = self._get_klines(symbol, interval, end_time=end_time, limit=want)
+                if page:
+                    pages.append(page)
+                    remaining -= len(page)
+                if len(page) < want:
+                    break
+                end_time = page[0][0] - 1
+            return [row for page in reversed(pages) for row in page]
+
+        rows = []
+        while limit is None or len(rows) < limit:
+            want = MAX_LIMIT if limit is None else min(MAX_LIMIT, limit - len(rows))
+            page = self._get_klines(symbol, interval, start_time=start_time,
+                                    end_time=end_time, limit=want)
+            rows.extend(page)
+            if len(page) < want:
+                break
+            start_time = page[-1][0] + 1
+        return rows
+
+    def history(self, symbol: str, interval: str, limit: int = DEFAULT_LIMIT,
+                start_time: Optional[int] = None) -> list:
+        """Like klines(), but served from the cache and topped up incrementally"""
+        if self.cache is None:
+            return self.klines(symbol, interval, start_time=start_time,
+                               limit=None if start_time is not None else limit)[-limit:]
+
+        with self.cache.lock(symbol, interval):
+            cached = self.cache.load(symbol, interval)
+            if cached:
+                # The newest stored candle may still have been open; fetch it again
+                rows = merge_klines(cached, self.klines(symbol, interval, start_time=cached[-1][0]))
+                if start_time is not None and start_time < rows[0][0]:
+                    older = self.klines(symbol, interval, start_time=start_time, end_time=rows[0][0] - 1)
+                    rows = merge_klines(older, rows)
+                elif start_time is None and len(rows) < limit:
+                    older = self.klines(symbol, interval, end_time=rows[0][0] - 1, limit=limit - len(rows))
+                    rows = merge_klines(older, rows)
+                with self._lock:
+                    self.cached_rows += len(cached) - 1
+            else:
+                rows = self.klines(symbol, interval, start_time=start_time,
+                                   limit=None if start_time is not None else limit)
+            if rows:
+                self.cache.save(symbol, interval, rows)
+
+        if start_time is not None:
+            rows = [row for row in rows if row[0] >= start_time]
+        return rows[-limit:]
+
+    def fetch_many(self, symbols: List[str], interval: str, limit: int = DEFAULT_LIMIT,
+                   start_time: Optional[int] = None) -> Tuple[Dict[str, list], Dict[str, str]]:
+        """history() for several symbols at once; returns (klines, errors) by symbol"""
+        def fetch(symbol):
+            try:
+                return symbol, self.history(symbol, interval, limit, start_time), None
+            except Exception as e:
+                logger.error(f"Fetching {symbol} {interval} failed: {str(e)}")
+                return symbol, None, str(e)
+
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix="klines") as pool:
+            for symbol, rows, error in pool.map(fetch, symbols):
+                if error is None:
+                    results[symbol] = rows
+                else:
+                    errors[symbol] = error
+        return results, errors
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "fetched_rows": self.fetched_rows,
+            "cached_rows": self.cached_rows,
+            "limiter_waits": self.limiter.waits,
+            "limiter_wait_seconds": self.limiter.wait_seconds_total,
+        }
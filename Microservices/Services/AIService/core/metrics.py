@@ -0,0 +1,149 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Seconds; fine at the low end for per-stage timings, up to slow model fits
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local = threading.local()
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        # Prometheus buckets are upper-inclusive
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Counters and latency histograms, rendered in the Prometheus text format.
+
+    Each update is a dict lookup and a few additions under one lock, cheap
+    enough to leave on for every request.
+    """
+
+    def __init__(self, namespace: str = "aiservice"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def render(self, gauges: Dict[str, float] = None, counters: Dict[str, float] = None) -> str:
+        """All metrics, plus values kept elsewhere, as Prometheus exposition text"""
+        lines = []
+
+        def header(name, kind):
+            full = f"{self.namespace}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = header(name, "counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}{_labels(labels)} {_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                full = header(name, "histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{full}_bucket{_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f"{full}_bucket{_labels(labels, le='+Inf')} {histogram.count}")
+                    lines.append(f"{full}_sum{_labels(labels)} {_number(histogram.sum)}")
+                    lines.append(f"{full}_count{_labels(labels)} {histogram.count}")
+        for name, value in sorted((counters or {}).items()):
+            full = header(name, "counter")
+            lines.append(f"{full} {_number(value)}")
+        for name, value in sorted((gauges or {}).items()):
+            full = header(name, "gauge")
+            lines.append(f"{full} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("stage_seconds", "Time spent in each stage of a prediction request")
+metrics.describe("request_seconds", "Request latency by route, body parsing included")
+metrics.describe("requests_total", "Requests by route and status code")
+metrics.describe("profiles_total", "Requests run under the sampling profiler")
+
+
+def record_stage(name: str, seconds: float):
+    collected = getattr(_local, "stages", None)
+    if collected is not None:
+        collected.append((name, seconds))
+    else:
+        metrics.observe("stage_seconds", seconds, stage=name)
+
+
+def record_stages(stages: List[Tuple[str, float]]):
+    for name, seconds in stages:
+        metrics.observe("stage_seconds", seconds, stage=name)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block as one stage of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_stages():
+    """Keep this thread's stage timings in a list instead of recording them.
+
+    Used around work in the executor pool, so timings taken in a worker
+    process travel back with the result and are recorded by the server.
+    """
+    previous = getattr(_local, "stages", None)
+    _local.stages = []
+    try:
+        yield _local.stages
+    finally:
+        _local.stages = previous
@@ -0,0 +1,86 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a helper thread.
+
+    Stacks are counted in the folded format flame graph tools read
+    ("outer;inner;innermost" -> samples). The sampled thread is never
+    interrupted, so the cost is the helper thread waking up every interval.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float = 0.005):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+        return dict(self.stacks)
+
+
+def should_profile(sample_rate: float) -> bool:
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+@contextmanager
+def sample_stacks(enabled: bool, interval_seconds: float = 0.005):
+    """Profile the calling thread for the block; yields a dict filled in on exit"""
+    stacks = {}
+    if not enabled:
+        yield stacks
+        return
+    sampler = StackSampler(threading.get_ident(), interval_seconds).start()
+    try:
+        yield stacks
+    finally:
+        stacks.update(sampler.stop())
+
+
+def save_profile(stacks: dict, directory: str, name: str) -> Optional[Path]:
+    """Write folded stacks to <directory>/<timestamp>_<name>.folded"""
+    if not stacks:
+        return None
+    path = Path(directory)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / f"{time.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1e6) % 1_000_000:06d}_{name}.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items())))
+    except OSError as e:
+        logger.error(f"Could not save profile to {directory}: {str(e)}")
+        return None
+    logger.info(f"Saved profile {path}")
+    return path
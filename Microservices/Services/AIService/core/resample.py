@@ -0,0 +1,289 @@
+"""Higher-interval klines resampled from one base interval kept locally.
+
+Only the finest interval a deployment needs (KLINE_BASE_INTERVAL, e.g.
+"1m") is fetched from Binance. Every interval that is a whole multiple of it
+("5m", "1h", "4h", "1d", "1w") is aggregated from those candles the way
+Binance builds its own: first open, highest high, lowest low, last close,
+summed volumes and trade counts, buckets aligned to the epoch (weeks to
+Monday 00:00 UTC).
+
+Base candles are held in memory as one float64 array per symbol and topped
+up with a single request from the newest stored openTime on, however many
+intervals are read from them. The aggregated candles of each interval are
+kept too and updated incrementally: a top-up only re-aggregates the last,
+possibly still open, bucket and appends the new ones.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from core.config import settings
+from core.market_data import DEFAULT_LIMIT, MAX_LIMIT, BinanceClient
+
+logger = logging.getLogger(__name__)
+
+_INTERVAL = re.compile(r"^(\d+)([smhdw])$")
+_UNIT_MS = {"s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 7 * 86_400_000}
+# The epoch was a Thursday; Binance's weeks start on Monday
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+# Columns of the base array, in kline row order
+OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME, CLOSE_TIME = range(7)
+QUOTE_VOLUME, TRADES, TAKER_BASE_VOLUME, TAKER_QUOTE_VOLUME = range(7, 11)
+SUMMED = [VOLUME, QUOTE_VOLUME, TRADES, TAKER_BASE_VOLUME, TAKER_QUOTE_VOLUME]
+N_COLUMNS = 11
+
+
+def bucket_spec(interval: str) -> Optional[tuple]:
+    """(length, offset) in ms of an interval's buckets, None for months and unknown intervals"""
+    match = _INTERVAL.match(interval)
+    if match is None:
+        return None
+    unit = match.group(2)
+    return int(match.group(1)) * _UNIT_MS[unit], WEEK_OFFSET_MS if unit == "w" else 0
+
+
+def klines_to_array(rows: list) -> np.ndarray:
+    """Kline rows as an (n, 11) float64 array; the trailing "ignore" field is dropped"""
+    if not rows:
+        return np.empty((0, N_COLUMNS))
+    return np.array([row[:N_COLUMNS] for row in rows], dtype=np.float64)
+
+
+def array_to_klines(values: np.ndarray) -> list:
+    """Kline rows as Binance returns them: times and trade counts as ints, the rest as strings"""
+    if not len(values):
+        return []
+    times = values[:, [OPEN_TIME, CLOSE_TIME, TRADES]].astype(np.int64).tolist()
+    text = np.char.mod("%.8f", values[:, [OPEN, HIGH, LOW, CLOSE, VOLUME, QUOTE_VOLUME,
+                                          TAKER_BASE_VOLUME, TAKER_QUOTE_VOLUME]]).tolist()
+    return [[t[0], s[0], s[1], s[2], s[3], s[4], t[1], s[5], t[2], s[6], s[7], "0"]
+            for t, s in zip(times, text)]
+
+
+def resample(values: np.ndarray, length_ms: int, offset_ms: int = 0,
+             drop_partial_first: bool = True) -> np.ndarray:
+    """Aggregate base klines (oldest first, as from klines_to_array) into buckets.
+
+    A first bucket the base candles start in the middle of is dropped unless
+    drop_partial_first is False; the last bucket is kept even if it is not
+    complete yet, like the open candle Binance returns.
+    """
+    if not len(values):
+        return np.empty((0, N_COLUMNS))
+    open_time = values[:, OPEN_TIME].astype(np.int64)
+    bucket = (open_time - offset_ms) // length_ms
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.append(starts[1:], len(values)) - 1
+
+    out = np.empty((len(starts), N_COLUMNS))
+    out[:, OPEN_TIME] = bucket[starts] * length_ms + offset_ms
+    out[:, CLOSE_TIME] = out[:, OPEN_TIME] + length_ms - 1
+    out[:, OPEN] = values[starts, OPEN]
+    out[:, CLOSE] = values[ends, CLOSE]
+    out[:, HIGH] = np.maximum.reduceat(values[:, HIGH], starts)
+    out[:, LOW] = np.minimum.reduceat(values[:, LOW], starts)
+    out[:, SUMMED] = np.add.reduceat(values[:, SUMMED], starts, axis=0)
+    if drop_partial_first and open_time[0] != out[0, OPEN_TIME]:
+        out = out[1:]
+    return out
+
+
+class _Symbol:
+    """Base candles of one symbol and the intervals aggregated from them"""
+
+    def __init__(self, values: np.ndarray, requested_from: int, refreshed_at: int):
+        self.values = values
+        self.requested_from = requested_from  # earliest openTime asked of Binance
+        self.refreshed_at = refreshed_at  # ms
+        self.views: Dict[str, np.ndarray] = {}
+        self.lock = threading.Lock()
+
+
+class ResampledKlines:
+    """history()/klines() of a BinanceClient, served from one base interval.
+
+    Intervals that are not a multiple of the base, and requests that would
+    need more than ``max_base_rows`` base candles, go to the client as they
+    are. Base candles are fetched again at most every ``refresh_seconds``
+    while none has closed since the last top-up.
+    """
+
+    def __init__(self, client: BinanceClient, base_interval: str = "1m",
+                 max_base_rows: int = 100_000, refresh_seconds: float = 1.0):
+        spec = bucket_spec(base_interval)
+        if spec is None:
+            raise ValueError(f"Unsupported base interval: {base_interval}")
+        self.client = client
+        self.base_interval = base_interval
+        self.base_ms = spec[0]
+        self.max_base_rows = max_base_rows
+        self.refresh_ms = int(refresh_seconds * 1000)
+        self._symbols: Dict[str, _Symbol] = {}
+        self._symbols_lock = threading.Lock()
+
+        self.passed_through = 0
+        self.top_ups = 0
+        self.backfills = 0
+        self.view_rebuilds = 0
+        self.view_updates = 0
+
+    @classmethod
+    def from_settings(cls, client: BinanceClient) -> "ResampledKlines":
+        return cls(client, base_interval=settings.kline_base_interval,
+                   max_base_rows=settings.kline_base_max_rows)
+
+    def close(self):
+        self.client.close()
+
+    def supports(self, interval: str) -> bool:
+        spec = bucket_spec(interval)
+        return spec is not None and spec[0] % self.base_ms == 0 and spec[1] % self.base_ms == 0
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
+
+    # ---------------------------------------------------------
+    # Base candles
+    # ---------------------------------------------------------
+    def _symbol(self, symbol: str, start: int) -> _Symbol:
+        with self._symbols_lock:
+            state = self._symbols.get(symbol)
+        if state is not None:
+            return state
+        now = self._now_ms()
+        rows = self.client.history(symbol, self.base_interval, limit=self.max_base_rows, start_time=start)
+        with self._symbols_lock:
+            return self._symbols.setdefault(symbol, _Symbol(klines_to_array(rows), start, now))
+
+    def _top_up(self, state: _Symbol, symbol: str, start: int):
+        """Base candles from start on and up to now; call with state.lock held"""
+        now = self._now_ms()
+        if start < state.requested_from:
+            end = int(state.values[0, OPEN_TIME]) - 1 if len(state.values) else None
+            older = klines_to_array(self.client.klines(symbol, self.base_interval,
+                                                       start_time=start, end_time=end))
+            state.values = np.concatenate((older, state.values))
+            state.requested_from = start
+            state.views.clear()
+            self.backfills += 1
+
+        # Skip the request while the newest candle is still open and was fetched a moment ago
+        if now - state.refreshed_at < self.refresh_ms and now // self.base_ms == state.refreshed_at // self.base_ms:
+            return
+        if len(state.values):
+            # The newest stored candle may still have been open; fetch it again
+            newer = klines_to_array(self.client.klines(symbol, self.base_interval,
+                                                       start_time=int(state.values[-1, OPEN_TIME])))
+            if len(newer):
+                keep = np.searchsorted(state.values[:, OPEN_TIME], newer[0, OPEN_TIME])
+                state.values = np.concatenate((state.values[:keep], newer))
+        else:
+            state.values = klines_to_array(self.client.klines(symbol, self.base_interval, start_time=start))
+        state.refreshed_at = now
+        self.top_ups += 1
+
+        if len(state.values) > self.max_base_rows + MAX_LIMIT:
+            state.values = state.values[-self.max_base_rows:]
+            state.requested_from = int(state.values[0, OPEN_TIME])
+            state.views.clear()
+
+    def _view(self, state: _Symbol, interval: str) -> np.ndarray:
+        """Aggregated candles of one interval, brought up to date with the base; call with state.lock held"""
+        length_ms, offset_ms = bucket_spec(interval)
+        base = state.values
+        view = state.views.get(interval)
+        if view is None or not len(view):
+            view = resample(base, length_ms, offset_ms)
+            self.view_rebuilds += 1
+        else:
+            # Re-aggregate from the last bucket on, which may have been open
+            first = np.searchsorted(base[:, OPEN_TIME], view[-1, OPEN_TIME])
+            view = np.concatenate((view[:-1], resample(base[first:], length_ms, offset_ms,
+                                                       drop_partial_first=False)))
+            self.view_updates += 1
+        state.views[interval] = view
+        return view
+
+    def _candles(self, symbol: str, interval: str, start: int) -> Optional[np.ndarray]:
+        """Aggregated candles of interval covering start..now, None if too many base rows"""
+        if (self._now_ms() - start) // self.base_ms > self.max_base_rows:
+            return None
+        state = self._symbol(symbol, start)
+        with state.lock:
+            self._top_up(state, symbol, start)
+            return self._view(state, interval)
+
+    def _bucket_start(self, interval: str, time_ms: int) -> int:
+        length_ms, offset_ms = bucket_spec(interval)
+        return (time_ms - offset_ms) // length_ms * length_ms + offset_ms
+
+    # ---------------------------------------------------------
+    # BinanceClient interface
+    # ---------------------------------------------------------
+    def history(self, symbol: str, interval: str, limit: int = DEFAULT_LIMIT,
+                start_time: Optional[int] = None) -> list:
+        """Like BinanceClient.history(): the newest limit candles, from start_time on if given"""
+        if self.supports(interval):
+            length_ms = bucket_spec(interval)[0]
+            if start_time is None:
+                start = self._bucket_start(interval, self._now_ms()) - (limit - 1) * length_ms
+            else:
+                start = self._bucket_start(interval, start_time)
+            view = self._candles(symbol, interval, start)
+            if view is not None:
+                return array_to_klines(view[view[:, OPEN_TIME] >= (start_time or start)][-limit:])
+        self.passed_through += 1
+        return self.client.history(symbol, interval, limit, start_time)
+
+    def klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+               end_time: Optional[int] = None, limit: Optional[int] = None) -> list:
+        """Like BinanceClient.klines(): from start_time on, or the newest limit candles up to end_time"""
+        if self.supports(interval):
+            length_ms = bucket_spec(interval)[0]
+            if start_time is None:
+                end = self._now_ms() if end_time is None else end_time
+                start = self._bucket_start(interval, end) - ((limit or DEFAULT_LIMIT) - 1) * length_ms
+            else:
+                start = self._bucket_start(interval, start_time)
+            view = self._candles(symbol, interval, start)
+            if view is not None:
+                opened = view[:, OPEN_TIME]
+                selected = view[(opened >= (start_time or start))
+                                & (opened <= (np.inf if end_time is None else end_time))]
+                if start_time is None:
+                    selected = selected[-(limit or DEFAULT_LIMIT):]
+                elif limit is not None:
+                    selected = selected[:limit]
+                return array_to_klines(selected)
+        self.passed_through += 1
+        return self.client.klines(symbol, interval, start_time=start_time, end_time=end_time, limit=limit)
+
+    def stats(self) -> dict:
+        with self._symbols_lock:
+            states = list(self._symbols.values())
+        return {
+            **self.client.stats(),
+            "base_interval": self.base_interval,
+            "base_symbols": len(states),
+            "base_rows": sum(len(state.values) for state in states),
+            "base_top_ups": self.top_ups,
+            "base_backfills": self.backfills,
+            "views": sum(len(state.views) for state in states),
+            "view_rebuilds": self.view_rebuilds,
+            "view_updates": self.view_updates,
+            "passed_through": self.passed_through,
+        }
+
+
+def kline_source():
+    """The BinanceClient from settings, behind ResampledKlines when KLINE_BASE_INTERVAL is set"""
+    client = BinanceClient.from_settings()
+    if not settings.kline_base_interval:
+        return client
+    return ResampledKlines.from_settings(client)
@@ -1,6 +1,7 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.endpoints import router
+from api.endpoints import router, executor, streams
 import logging
 import os
 from dotenv import load_dotenv
@@ -12,10 +13,19 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await streams.close()
+    executor.shutdown()
+
+
 app = FastAPI(
     title="Stock Price Prediction API",
     description="Predicts next closing price using historical candle data and optional sentiment",
-    version=os.getenv("MODEL_VERSION", "1.0.0")
+    version=os.getenv("MODEL_VERSION", "1.0.0"),
+    lifespan=lifespan
 )
 
 origins = [
@@ -47,7 +57,12 @@ async def root():
         "version": os.getenv("MODEL_VERSION", "1.0.0"),
         "endpoints": {
             "/predict": "POST - Predict next closing price",
+            "/predict/columnar": "POST - Predict from candle columns or raw Binance klines",
+            "/predict/batch": "POST - Predict next closing price for several symbols",
             "/health": "GET - Health check",
+            "/metrics": "GET - Prometheus metrics",
+            "/ws/predict/{symbol}/{interval}": "WebSocket - Prediction pushed for every closed candle",
+            "/stream/predict/{symbol}/{interval}": "GET - Same as /ws/predict, as server-sent events",
             "/docs": "GET - API documentation"
         }
     }
@@ -0,0 +1,208 @@
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Same columns, in the same order, as StockPredictor.create_technical_indicators
+INDICATOR_COLUMNS = [
+    'price_change', 'high_low_pct', 'open_close_pct',
+    'sma_5', 'sma_10', 'sma_20', 'sma_50',
+    'rsi',
+    'bb_middle', 'bb_upper', 'bb_lower', 'bb_position',
+    'volume_sma', 'volume_ratio',
+    'volatility',
+    'high_20', 'low_20', 'price_position',
+]
+
+
+def _div(a: float, b: float) -> float:
+    # float64 semantics like pandas: x/0 -> +-inf, 0/0 -> nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+class RollingWindow:
+    """Running sum and sum of squares over the last ``size`` values.
+
+    Values are shifted by the first value seen to limit cancellation in the
+    variance, and the sums are recomputed from the window every ``size``
+    pushes so rounding error cannot accumulate.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    def push(self, value: float):
+        if self.shift is None:
+            self.shift = value
+        if len(self.values) == self.size:
+            old = self.values[0] - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        x = value - self.shift
+        self.total += x
+        self.total_sq += x * x
+
+        self._pushes += 1
+        if self._pushes % self.size == 0:
+            self._resum()
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def mean(self) -> float:
+        if not self.full:
+            return math.nan
+        return self.shift + self.total / self.size
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), like pandas rolling().std()"""
+        if not self.full:
+            return math.nan
+        n = self.size
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def _resum(self):
+        self.shift = self.values[-1]
+        shifted = [v - self.shift for v in self.values]
+        self.total = math.fsum(shifted)
+        self.total_sq = math.fsum(x * x for x in shifted)
+
+
+class RollingExtreme:
+    """Rolling max (or min) over the last ``size`` values using a monotonic deque"""
+
+    def __init__(self, size: int, mode: str = 'max'):
+        self.size = size
+        self.is_max = mode == 'max'
+        self._deque = deque()  # (index, value), values monotonic
+        self._count = 0
+
+    def push(self, value: float):
+        index = self._count
+        self._count += 1
+        while self._deque and (self._deque[-1][1] <= value if self.is_max
+                               else self._deque[-1][1] >= value):
+            self._deque.pop()
+        self._deque.append((index, value))
+        if self._deque[0][0] <= index - self.size:
+            self._deque.popleft()
+
+    def value(self) -> float:
+        if self._count < self.size:
+            return math.nan
+        return self._deque[0][1]
+
+
+class IndicatorEngine:
+    """Incremental version of StockPredictor.create_technical_indicators.
+
+    Keeps O(window) rolling state per indicator, so appending a candle costs
+    O(1) and yields the same feature values the batch pandas path computes
+    for that row. The last ``history`` rows are kept for frame().
+    """
+
+    def __init__(self, history: int = 1000):
+        self.rows = deque(maxlen=history)
+        self.last_timestamp: Optional[int] = None
+        self._last_close: Optional[float] = None
+
+        self._sma = {window: RollingWindow(window) for window in (5, 10, 50)}
+        self._close_20 = RollingWindow(20)
+        self._gain = RollingWindow(14)
+        self._loss = RollingWindow(14)
+        self._volume_20 = RollingWindow(20)
+        self._high_20 = RollingExtreme(20, 'max')
+        self._low_20 = RollingExtreme(20, 'min')
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, history: int = 1000) -> "IndicatorEngine":
+        """Build an engine primed with the candles of an OHLCV frame"""
+        engine = cls(history=history)
+        engine.extend(df)
+        return engine
+
+    def extend(self, df: pd.DataFrame):
+        for row in df[OHLCV_COLUMNS].itertuples(index=False):
+            self.append(*row)
+
+    def append(self, timestamp: int, open: float, high: float, low: float,
+               close: float, volume: float) -> dict:
+        """Add one closed candle and return its row with all indicator columns"""
+        timestamp = int(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            raise ValueError(
+                f"Candle at {timestamp} is not newer than {self.last_timestamp}")
+
+        if self._last_close is None:
+            price_change = math.nan
+            delta = math.nan
+        else:
+            price_change = _div(close, self._last_close) - 1
+            delta = close - self._last_close
+        self._last_close = close
+        self.last_timestamp = timestamp
+
+        for window in self._sma.values():
+            window.push(close)
+        self._close_20.push(close)
+        # NaN deltas count as no gain and no loss, as in delta.where(...)
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-delta if delta < 0 else 0.0)
+        self._volume_20.push(volume)
+        self._high_20.push(high)
+        self._low_20.push(low)
+
+        sma_20 = self._close_20.mean()
+        bb_std = self._close_20.std()
+        bb_upper = sma_20 + bb_std * 2
+        bb_lower = sma_20 - bb_std * 2
+        volume_sma = self._volume_20.mean()
+        high_20 = self._high_20.value()
+        low_20 = self._low_20.value()
+        rs = _div(self._gain.mean(), self._loss.mean())
+
+        row = {
+            'timestamp': timestamp,
+            'open': open,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'price_change': price_change,
+            'high_low_pct': (high - low) / close,
+            'open_close_pct': (close - open) / open,
+            'sma_5': self._sma[5].mean(),
+            'sma_10': self._sma[10].mean(),
+            'sma_20': sma_20,
+            'sma_50': self._sma[50].mean(),
+            'rsi': 100 - _div(100, 1 + rs),
+            'bb_middle': sma_20,
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
+            'bb_position': _div(close - bb_lower, bb_upper - bb_lower),
+            'volume_sma': volume_sma,
+            'volume_ratio': _div(volume, volume_sma),
+            'volatility': bb_std,
+            'high_20': high_20,
+            'low_20': low_20,
+            'price_position': _div(close - low_20, high_20 - low_20),
+        }
+        self.rows.append(row)
+        return row
+
+    def frame(self) -> pd.DataFrame:
+        """The retained rows as a DataFrame shaped like the batch indicator output"""
+        return pd.DataFrame(list(self.rows), columns=OHLCV_COLUMNS + INDICATOR_COLUMNS)
@@ -0,0 +1,128 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional
+
+from models.predictor import FEATURE_SET_VERSION
+from models.schemas import CandleArrays, CandleData, SentimentData
+
+_INTERVAL = re.compile(r"^(\d+)([smhdwM])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400, "M": 30 * 86400}
+
+
+def interval_seconds(interval: str) -> Optional[float]:
+    """Length of a Binance-style interval ("1m", "4h", "1d", "1M"), None if unrecognised"""
+    match = _INTERVAL.match(interval)
+    if match is None:
+        return None
+    return int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+
+class WindowFingerprint(NamedTuple):
+    """Identifies a candle window without hashing every candle"""
+    symbol: str
+    interval: str
+    first_open_time: int
+    last_open_time: int
+    count: int
+    last_close: float
+    sentiment: Optional[int] = None
+    feature_version: str = FEATURE_SET_VERSION
+
+
+def _sentiment_digest(sentiment: Optional[List[SentimentData]]) -> Optional[int]:
+    if not sentiment:
+        return None
+    return hash(tuple((s.timestamp, s.sentiment_score, s.news_count, s.social_mentions)
+                      for s in sentiment))
+
+
+def fingerprint_candles(request, candles: List[CandleData]) -> WindowFingerprint:
+    """Fingerprint of a request whose candles are sorted by openTime"""
+    return WindowFingerprint(request.symbol, request.interval, candles[0].timestamp,
+                             candles[-1].timestamp, len(candles), candles[-1].close,
+                             _sentiment_digest(request.sentiment))
+
+
+def fingerprint_arrays(request, arrays: CandleArrays) -> WindowFingerprint:
+    return WindowFingerprint(request.symbol, request.interval, int(arrays.open_time[0]),
+                             int(arrays.open_time[-1]), len(arrays.open_time),
+                             float(arrays.close[-1]), _sentiment_digest(request.sentiment))
+
+
+class PredictionCache:
+    """LRU cache of prediction results keyed by candle-window fingerprint.
+
+    Clients often resend the same window several times within one candle.
+    An entry lives for one candle interval (``default_ttl_seconds`` when the
+    interval is not recognised), by which time a new candle has changed the
+    window anyway. The still-forming last candle is covered by its close
+    being part of the key. ``max_entries`` of 0 disables the cache.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+
+        self._entries: "OrderedDict[WindowFingerprint, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def ttl_for(self, key: WindowFingerprint) -> float:
+        seconds = interval_seconds(key.interval)
+        return self.default_ttl_seconds if seconds is None else seconds
+
+    def get(self, key: WindowFingerprint) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: WindowFingerprint, value: Any):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_for(key)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
@@ -1,27 +1,191 @@
 import numpy as np
 import pandas as pd
+import copy
 import logging
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import MinMaxScaler
-from typing import List, Optional
-from models.schemas import CandleData, SentimentData
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from typing import List, Optional, Tuple, Union
+from core.metrics import stage
+from models.schemas import CandleArrays, CandleData, SentimentArrays, SentimentData
+import sys
+import time
 import warnings
+from pathlib import Path
+
+try:
+    import indicator_kernels as kernels
+except ImportError:
+    # Running from the source tree; the image copies the module into /app
+    sys.path.append(str(Path(__file__).resolve().parents[3] / "Shared" / "Indicators"))
+    import indicator_kernels as kernels
 
 warnings.filterwarnings("ignore")
 logger = logging.getLogger(__name__)
 
+# Bump whenever the feature columns or their construction change, so models
+# fitted on the old feature set are never reused for the new one.
+FEATURE_SET_VERSION = "4"
+
+SMA_WINDOWS = (5, 10, 20, 50)
+
+# Leading rows of a series without a full 50-candle window (sma_50); they
+# never survive the dropna in create_sequences.
+INDICATOR_WARMUP = 49
+
+# random_forest: full refit on every training call
+# incremental_forest: full fit once, then grow trees on recent windows only
+# sgd: linear model updated online with partial_fit
+PREDICTOR_BACKENDS = ("random_forest", "incremental_forest", "sgd")
+
+SENTIMENT_COLUMNS = ['sentiment_score', 'news_count', 'social_mentions']
+
+# Indicator columns only needed to derive others; compact predictors drop
+# them once bb_position, volume_ratio and price_position are computed
+INTERMEDIATE_COLUMNS = ['bb_middle', 'bb_upper', 'bb_lower', 'volume_sma', 'high_20', 'low_20']
+
+
+def align_sentiment(timestamps: np.ndarray, sentiment: SentimentArrays,
+                    tolerance_ms: Optional[float] = None,
+                    half_life_ms: Optional[float] = None) -> np.ndarray:
+    """As-of join: for each candle, the latest sentiment at or before its timestamp.
+
+    Returns one row of SENTIMENT_COLUMNS per candle. Readings older than
+    ``tolerance_ms`` are ignored, and with ``half_life_ms`` a reading's
+    values are halved for every half-life of age. Candles with no usable
+    reading get zeros.
+    """
+    values = np.column_stack([getattr(sentiment, name) for name in SENTIMENT_COLUMNS])
+    latest = np.searchsorted(sentiment.timestamp, timestamps, side='right') - 1
+    found = latest >= 0
+    latest = latest.clip(0)
+    age = (timestamps - sentiment.timestamp[latest]).astype(np.float64)
+    if tolerance_ms is not None:
+        found &= age <= tolerance_ms
+
+    aligned = values[latest]
+    if half_life_ms:
+        aligned *= np.exp2(-age / half_life_ms)[:, None]
+    aligned[~found] = 0.0
+    return aligned
+
+
+class OnlineRegressor:
+    """SGD linear regressor with a running target scaler, updatable with partial_fit"""
+
+    def __init__(self, epochs: int = 5, random_state: int = 42):
+        self.epochs = epochs
+        self.random_state = random_state
+        self.reset()
+
+    def reset(self):
+        self.model = SGDRegressor(
+            alpha=1e-4, learning_rate="adaptive", eta0=0.01,
+            random_state=self.random_state)
+        self.y_scaler = StandardScaler()
+
+    def fit(self, X, y):
+        self.reset()
+        return self.partial_fit(X, y, epochs=self.epochs)
+
+    def partial_fit(self, X, y, epochs: int = 1):
+        y = np.asarray(y, dtype=np.float64).reshape(-1, 1)
+        self.y_scaler.partial_fit(y)
+        y_scaled = self.y_scaler.transform(y).ravel()
+        for _ in range(epochs):
+            self.model.partial_fit(X, y_scaled)
+        return self
+
+    def predict(self, X):
+        y_scaled = self.model.predict(X).reshape(-1, 1)
+        return self.y_scaler.inverse_transform(y_scaled).ravel()
+
+
+class CompactForest:
+    """A fitted RandomForestRegressor reduced to the arrays inference needs.
+
+    All trees' nodes are concatenated: split feature (int16), threshold
+    (float32), child indices (int32) and node value (float32), about 18
+    bytes a node against sklearn's 72, with no per-tree Python objects.
+    The forest compares features as float32 anyway, so rounding each
+    threshold down to float32 keeps every split decision. Leaves point at
+    themselves, which lets all trees descend in lockstep, one array step
+    per level. Predictions differ from the forest's only by the float32
+    rounding of the leaf values.
+    """
+
+    def __init__(self, forest: RandomForestRegressor):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots = offsets[:-1].astype(np.int32)
+        self.depth = max(tree.max_depth for tree in trees)
+        self.n_features_in_ = forest.n_features_in_
+
+        feature = np.concatenate([tree.feature for tree in trees])
+        leaf = feature < 0
+        index_type = np.int16 if self.n_features_in_ < 2 ** 15 else np.int32
+        self.feature = np.where(leaf, 0, feature).astype(index_type)
+
+        threshold = np.concatenate([tree.threshold for tree in trees])
+        self.threshold = threshold.astype(np.float32)
+        rounded_up = self.threshold > threshold
+        self.threshold[rounded_up] = np.nextafter(self.threshold[rounded_up], np.float32(-np.inf))
+
+        nodes = np.arange(offsets[-1], dtype=np.int32)
+        self.left = np.concatenate([tree.children_left + offset for tree, offset in zip(trees, offsets)])
+        self.right = np.concatenate([tree.children_right + offset for tree, offset in zip(trees, offsets)])
+        self.left = np.where(leaf, nodes, self.left).astype(np.int32)
+        self.right = np.where(leaf, nodes, self.right).astype(np.int32)
+        self.value = np.concatenate([tree.value.reshape(-1) for tree in trees]).astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(part.nbytes for part in (self.roots, self.feature, self.threshold,
+                                            self.left, self.right, self.value))
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1, dtype=np.float64)
+
 
 class StockPredictor:
     # paste your whole class here as-is
-    def __init__(self):
+    # Defaults for predictors pickled before compact mode existed
+    compact = False
+    feature_dtype = np.float64
+
+    def __init__(self, backend: str = "random_forest", trees_per_update: int = 50,
+                 max_trees: int = 100, update_window: int = 200,
+                 sentiment_tolerance_ms: Optional[float] = None,
+                 sentiment_half_life_ms: Optional[float] = None,
+                 compact: bool = False):
+        """With ``compact`` the features are kept as float32, the intermediate
+        indicator columns are dropped, and a random_forest model is replaced
+        by its CompactForest once fitted. incremental_forest keeps its sklearn
+        forest, which updates grow."""
+        if backend not in PREDICTOR_BACKENDS:
+            raise ValueError(f"Unknown predictor backend: {backend}")
+        self.backend = backend
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self.update_window = update_window
+        self.sentiment_tolerance_ms = sentiment_tolerance_ms
+        self.sentiment_half_life_ms = sentiment_half_life_ms
+        self.compact = compact
+        self.feature_dtype = np.float32 if compact else np.float64
+
         self.scaler = MinMaxScaler()
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1
-        )
+        self.model = self._build_model()
         self.feature_names = []
+        self.is_trained = False
+        self.trained_at = None
+        self.trained_until = None
+        self.trained_samples = 0
 
     def create_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create technical indicators from OHLCV data"""
@@ -31,12 +195,14 @@ class StockPredictor:
         df['open_close_pct'] = (df['close'] - df['open']) / df['open']
 
         # Moving averages
-        df['sma_5'] = df['close'].rolling(window=5).mean()
-        df['sma_10'] = df['close'].rolling(window=10).mean()
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-
-        # Relative Strength Index (RSI)
+        sma = kernels.rolling_mean_many(df['close'].to_numpy(dtype=np.float64), SMA_WINDOWS)
+        for window, values in zip(SMA_WINDOWS, sma):
+            df[f'sma_{window}'] = values
+
+        # Relative Strength Index (RSI), from plain 14-bar means of gains and losses
+        # (Cutler's). The BackTestService strategies use TA-Lib's Wilder-smoothed RSI;
+        # the models here were fitted on this one, so changing it means a new
+        # FEATURE_SET_VERSION and retraining
         delta = df['close'].diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
@@ -59,16 +225,45 @@ class StockPredictor:
         df['volatility'] = df['close'].rolling(window=20).std()
 
         # Price position relative to recent high/low
-        df['high_20'] = df['high'].rolling(window=20).max()
-        df['low_20'] = df['low'].rolling(window=20).min()
+        df['high_20'] = kernels.rolling_max(df['high'].to_numpy(dtype=np.float64), 20)
+        df['low_20'] = kernels.rolling_min(df['low'].to_numpy(dtype=np.float64), 20)
         df['price_position'] = (df['close'] - df['low_20']) / \
             (df['high_20'] - df['low_20'])
 
+        if self.compact:
+            df = df.drop(columns=INTERMEDIATE_COLUMNS)
+            derived = df.columns.difference(['timestamp', 'open', 'high', 'low', 'close', 'volume'],
+                                            sort=False)
+            df = df.astype(dict.fromkeys(derived, np.float32), copy=False)
+
         return df
 
-    def prepare_features(self, candles: List[CandleData], sentiment: Optional[List[SentimentData]] = None) -> pd.DataFrame:
-        """Prepare features for prediction"""
-        # Convert candles to DataFrame
+    def create_technical_indicators_batch(self, frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Create technical indicators for several symbols in one pass
+
+        The frames are stacked and the indicators computed once over the stacked
+        frame. Rows whose indicator windows reach back into the previous symbol
+        are masked to NaN; those are the warm-up rows that create_sequences
+        drops for a single symbol anyway, so results match the per-frame path
+        up to floating-point rounding.
+        """
+        if not frames:
+            return []
+
+        lengths = [len(frame) for frame in frames]
+        stacked = pd.concat(frames, ignore_index=True)
+        stacked = self.create_technical_indicators(stacked)
+
+        indicator_columns = stacked.columns.difference(frames[0].columns)
+        offsets = np.cumsum([0] + lengths)
+        position = np.arange(len(stacked)) - np.repeat(offsets[:-1], lengths)
+        stacked.loc[position < INDICATOR_WARMUP, indicator_columns] = np.nan
+
+        return [stacked.iloc[start:stop].reset_index(drop=True)
+                for start, stop in zip(offsets[:-1], offsets[1:])]
+
+    def candles_to_frame(self, candles: List[CandleData]) -> pd.DataFrame:
+        """Convert candles to an OHLCV DataFrame sorted by open time"""
         candle_data = []
         for candle in candles:
             candle_data.append({
@@ -81,35 +276,82 @@ class StockPredictor:
             })
 
         df = pd.DataFrame(candle_data)
-        df = df.sort_values('timestamp').reset_index(drop=True)
-
-        # Create technical indicators
-        df = self.create_technical_indicators(df)
-
-        # Add sentiment data if provided
-        if sentiment:
-            sentiment_df = pd.DataFrame([{
-                'timestamp': s.timestamp,
-                'sentiment_score': s.sentiment_score,
-                'news_count': s.news_count,
-                'social_mentions': s.social_mentions
-            } for s in sentiment])
-
-            # Merge sentiment data (forward fill for missing values)
-            df = df.merge(sentiment_df, on='timestamp', how='left')
-            df[['sentiment_score', 'news_count', 'social_mentions']] = df[[
-                'sentiment_score', 'news_count', 'social_mentions']].fillna(method='ffill')
-            df[['sentiment_score', 'news_count', 'social_mentions']] = df[[
-                'sentiment_score', 'news_count', 'social_mentions']].fillna(0)
+        return df.sort_values('timestamp').reset_index(drop=True)
+
+    def arrays_to_frame(self, arrays: CandleArrays) -> pd.DataFrame:
+        """Wrap already validated and sorted candle columns in a DataFrame"""
+        return pd.DataFrame({
+            'timestamp': arrays.open_time,
+            'open': arrays.open,
+            'high': arrays.high,
+            'low': arrays.low,
+            'close': arrays.close,
+            'volume': arrays.volume
+        }, copy=False)
+
+    def add_sentiment(self, df: pd.DataFrame,
+                      sentiment: Optional[Union[List[SentimentData], SentimentArrays]] = None) -> pd.DataFrame:
+        """Add sentiment columns aligned to the candle timestamps
+
+        Each candle takes the latest sentiment at or before its open time
+        (see align_sentiment).
+        """
+        if sentiment is not None and len(sentiment):
+            if not isinstance(sentiment, SentimentArrays):
+                sentiment = SentimentArrays.from_records(sentiment)
+            aligned = align_sentiment(
+                df['timestamp'].to_numpy(dtype=np.int64), sentiment,
+                self.sentiment_tolerance_ms, self.sentiment_half_life_ms)
+            for i, name in enumerate(SENTIMENT_COLUMNS):
+                df[name] = aligned[:, i].astype(self.feature_dtype, copy=False)
         else:
-            df['sentiment_score'] = 0
-            df['news_count'] = 0
-            df['social_mentions'] = 0
+            zero = np.float32(0) if self.compact else 0
+            df['sentiment_score'] = zero
+            df['news_count'] = zero
+            df['social_mentions'] = zero
 
         return df
 
-    def create_sequences(self, df: pd.DataFrame, sequence_length: int = 20):
-        """Create sequences for time series prediction"""
+    def prepare_features(self, candles: List[CandleData], sentiment: Optional[List[SentimentData]] = None) -> pd.DataFrame:
+        """Prepare features for prediction"""
+        with stage("frame"):
+            df = self.candles_to_frame(candles)
+
+        # Create technical indicators
+        with stage("indicators"):
+            df = self.create_technical_indicators(df)
+
+        with stage("sentiment"):
+            return self.add_sentiment(df, sentiment)
+
+    def prepare_features_from_arrays(self, arrays: CandleArrays, sentiment: Optional[List[SentimentData]] = None) -> pd.DataFrame:
+        """Prepare features from candle columns, skipping per-candle objects"""
+        with stage("frame"):
+            df = self.arrays_to_frame(arrays)
+        with stage("indicators"):
+            df = self.create_technical_indicators(df)
+        with stage("sentiment"):
+            return self.add_sentiment(df, sentiment)
+
+    def prepare_features_batch(self, batch: List[Tuple[List[CandleData], Optional[List[SentimentData]]]]) -> List[pd.DataFrame]:
+        """Prepare features for several (candles, sentiment) pairs at once"""
+        with stage("frame"):
+            frames = [self.candles_to_frame(candles) for candles, _ in batch]
+        with stage("indicators"):
+            frames = self.create_technical_indicators_batch(frames)
+        with stage("sentiment"):
+            return [self.add_sentiment(df, sentiment)
+                    for df, (_, sentiment) in zip(frames, batch)]
+
+    def create_sequences(self, df: pd.DataFrame, sequence_length: int = 20, last_only: bool = False):
+        """Create sequences for time series prediction
+
+        Row i of X holds the features of ``sequence_length`` consecutive candles,
+        flattened oldest first, and y[i] is the close of the candle that follows
+        them. X is a read-only strided view over one contiguous feature array,
+        so no per-row copies are made. With ``last_only`` only the window ending
+        at the latest candle is returned (for inference) and y is empty.
+        """
         feature_columns = [
             'price_change', 'high_low_pct', 'open_close_pct', 'sma_5', 'sma_10', 'sma_20', 'sma_50',
             'rsi', 'bb_position', 'volume_ratio', 'volatility', 'price_position',
@@ -123,26 +365,45 @@ class StockPredictor:
             raise ValueError(
                 f"Not enough data points. Need at least {sequence_length + 1}, got {len(df_clean)}")
 
-        X, y = [], []
+        values = np.ascontiguousarray(
+            df_clean[feature_columns].to_numpy(dtype=self.feature_dtype))
 
-        for i in range(len(df_clean) - sequence_length):
-            X.append(df_clean[feature_columns].iloc[i:i +
-                     sequence_length].values.flatten())
-            y.append(df_clean['close'].iloc[i+sequence_length])
+        if last_only:
+            X = values[-sequence_length:].reshape(1, -1)
+            return X, np.empty(0), feature_columns
 
-        return np.array(X), np.array(y), feature_columns
+        n_rows, n_features = values.shape
+        item = values.itemsize
+        X = np.lib.stride_tricks.as_strided(
+            values,
+            shape=(n_rows - sequence_length, sequence_length * n_features),
+            strides=(n_features * item, item),
+            writeable=False)
+        y = df_clean['close'].to_numpy(dtype=np.float64)[sequence_length:]
+
+        return X, y, feature_columns
 
     def train_model(self, df: pd.DataFrame):
         """Train the prediction model"""
         try:
-            X, y, feature_names = self.create_sequences(df)
+            with stage("sequences"):
+                X, y, feature_names = self.create_sequences(df)
             self.feature_names = feature_names
 
-            # Scale features
-            X_scaled = self.scaler.fit_transform(X)
+            with stage("fit"):
+                # Scale features
+                X_scaled = self.scaler.fit_transform(X)
+
+                # Train model
+                self.model = self._build_model()
+                self.model.fit(X_scaled, y)
+                if self.compact and self.backend == "random_forest":
+                    self.model = CompactForest(self.model)
 
-            # Train model
-            self.model.fit(X_scaled, y)
+            self.is_trained = True
+            self.trained_at = time.time()
+            self.trained_until = int(df['timestamp'].iloc[-1])
+            self.trained_samples = len(X)
 
             logger.info(f"Model trained successfully with {len(X)} samples")
 
@@ -150,37 +411,101 @@ class StockPredictor:
             logger.error(f"Error training model: {str(e)}")
             raise
 
+    @property
+    def supports_incremental(self) -> bool:
+        return self.backend != "random_forest"
+
+    def update_model(self, df: pd.DataFrame):
+        """Update the fitted model with the windows whose targets are new
+
+        At least ``update_window`` of the most recent windows are used. The
+        scaler stays as fitted by train_model so existing trees/weights keep
+        their meaning. incremental_forest adds ``trees_per_update`` trees
+        fitted on those windows and retires the oldest beyond ``max_trees``;
+        sgd runs one partial_fit pass over them.
+        """
+        if not self.is_trained:
+            return self.train_model(df)
+        if not self.supports_incremental:
+            raise RuntimeError(f"Backend {self.backend} does not support incremental updates")
+
+        new_candles = int((df['timestamp'] > self.trained_until).sum())
+        if new_candles == 0:
+            return
+
+        with stage("sequences"):
+            X, y, _ = self.create_sequences(df)
+        recent = min(len(X), max(new_candles, self.update_window))
+
+        with stage("update"):
+            X_scaled = self.scaler.transform(X[-recent:])
+            y_recent = y[-recent:]
+
+            if self.backend == "incremental_forest":
+                grown = len(self.model.estimators_) + self.trees_per_update
+                self.model.set_params(warm_start=True, n_estimators=grown)
+                self.model.fit(X_scaled, y_recent)
+                if len(self.model.estimators_) > self.max_trees:
+                    self.model.estimators_ = self.model.estimators_[-self.max_trees:]
+                    self.model.n_estimators = self.max_trees
+            else:
+                self.model.partial_fit(X_scaled, y_recent)
+
+        self.trained_until = int(df['timestamp'].iloc[-1])
+        self.trained_samples += recent
+
+        logger.info(f"Model updated with {recent} recent samples")
+
+    def updated(self, df: pd.DataFrame) -> "StockPredictor":
+        """Return an updated copy, leaving this predictor untouched for readers"""
+        predictor = copy.deepcopy(self)
+        predictor.update_model(df)
+        return predictor
+
+    def _build_model(self):
+        if self.backend == "sgd":
+            return OnlineRegressor()
+        return RandomForestRegressor(
+            n_estimators=100,
+            max_depth=10,
+            random_state=42,
+            n_jobs=-1
+        )
+
     def predict(self, candles: List[CandleData], sentiment: Optional[List[SentimentData]] = None):
-        """Make prediction for next closing price"""
+        """Make prediction for next closing price, refitting on the given candles"""
         try:
             df = self.prepare_features(candles, sentiment)
 
             self.train_model(df)
 
-            # Prepare the last sequence for prediction
-            X, _, _ = self.create_sequences(df, sequence_length=20)
+            return self.predict_from_features(df)
+
+        except Exception as e:
+            logger.error(f"Error making prediction: {str(e)}")
+            raise
+
+    def predict_from_features(self, df: pd.DataFrame):
+        """Predict next closing price from prepared features using the fitted model"""
+        if not self.is_trained:
+            raise RuntimeError("Model must be trained before predicting")
 
-            if len(X) == 0:
-                raise ValueError(
-                    "Not enough data to create prediction sequence")
+        # The window ending at the latest candle predicts the next close
+        with stage("sequences"):
+            last_sequence, _, _ = self.create_sequences(
+                df, sequence_length=20, last_only=True)
 
-            # Use the last sequence
-            last_sequence = X[-1:]
+        with stage("inference"):
             X_scaled = self.scaler.transform(last_sequence)
 
             # Make prediction
             prediction = self.model.predict(X_scaled)[0]
 
-            # Calculate confidence score based on feature importance and recent volatility
-            feature_importance = self.model.feature_importances_
-            confidence = min(
-                0.95, max(0.1, 1.0 - df['volatility'].iloc[-20:].mean()))
-
-            features_used = [
-                f"{name}_lag_{i}" for name in self.feature_names for i in range(20)]
+        # Calculate confidence score based on recent volatility
+        confidence = min(
+            0.95, max(0.1, 1.0 - df['volatility'].iloc[-20:].mean()))
 
-            return prediction, confidence, features_used
+        features_used = [
+            f"{name}_lag_{i}" for name in self.feature_names for i in range(20)]
 
-        except Exception as e:
-            logger.error(f"Error making prediction: {str(e)}")
-            raise
+        return prediction, confidence, features_used
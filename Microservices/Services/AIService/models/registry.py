@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from models.predictor import FEATURE_SET_VERSION, StockPredictor
+from models.snapshots import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+
+class ModelKey(NamedTuple):
+    symbol: str
+    interval: str
+    feature_version: str = FEATURE_SET_VERSION
+
+
+class ModelRegistry:
+    """LRU/TTL cache of fitted predictors keyed by (symbol, interval, feature-set version).
+
+    A cached predictor is reused until it expires (``ttl_seconds`` after it was
+    fitted) or until at least ``retrain_after_candles`` candles newer than its
+    training watermark arrive. Stale predictors whose backend supports it are
+    updated incrementally; the rest are refitted from scratch. Either way a
+    new predictor is built and swapped in, so concurrent readers never see a
+    half-fitted model.
+
+    With a snapshot store, every fitted predictor is also written to disk and
+    a key missing from memory is looked up there before fitting, so restarts
+    and new replicas start warm.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 6 * 3600,
+                 retrain_after_candles: int = 5,
+                 factory: Callable[[], StockPredictor] = StockPredictor,
+                 snapshots: Optional[SnapshotStore] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.retrain_after_candles = retrain_after_candles
+        self.factory = factory
+        self.snapshots = snapshots
+
+        self._entries: "OrderedDict[ModelKey, StockPredictor]" = OrderedDict()
+        self._lock = threading.Lock()
+        # [lock, threads holding or waiting for it], only while there are any
+        self._key_locks: Dict[ModelKey, List] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.fits = 0
+        self.updates = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def has_models(self) -> bool:
+        """True if any fitted model is in memory or available as a snapshot"""
+        return len(self._entries) > 0 or (
+            self.snapshots is not None and len(self.snapshots) > 0)
+
+    def get(self, key: ModelKey) -> Optional[StockPredictor]:
+        """Return the cached predictor for key, dropping it if it has expired"""
+        with self._lock:
+            predictor = self._entries.get(key)
+            if predictor is None:
+                return None
+            if self._is_expired(predictor):
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return predictor
+
+    def put(self, key: ModelKey, predictor: StockPredictor):
+        with self._lock:
+            self._entries[key] = predictor
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                logger.info(f"Evicted model {evicted} from registry")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def needs_refit(self, predictor: Optional[StockPredictor], df: pd.DataFrame) -> bool:
+        """Decide whether the candles in df warrant refitting the predictor"""
+        if predictor is None or not predictor.is_trained:
+            return True
+        new_candles = int((df['timestamp'] > predictor.trained_until).sum())
+        return new_candles >= self.retrain_after_candles
+
+    def predict(self, key: ModelKey, df: pd.DataFrame):
+        """Predict from prepared features, fitting only when the cached model is stale"""
+        predictor = self.get(key)
+        if not self.needs_refit(predictor, df):
+            self.hits += 1
+            return predictor.predict_from_features(df)
+
+        # Only one fit per key at a time; late arrivals reuse the fresh model.
+        with self._key_lock(key):
+            predictor = self.get(key)
+            if predictor is None:
+                predictor = self._load_snapshot(key)
+            if self.needs_refit(predictor, df):
+                self.misses += 1
+                if predictor is not None and predictor.supports_incremental:
+                    predictor = predictor.updated(df)
+                    self.updates += 1
+                else:
+                    predictor = self.factory()
+                    predictor.train_model(df)
+                    self.fits += 1
+                self.put(key, predictor)
+                if self.snapshots is not None:
+                    self.snapshots.save(key, predictor)
+            else:
+                self.hits += 1
+
+        return predictor.predict_from_features(df)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fits": self.fits,
+            "updates": self.updates,
+            "evictions": self.evictions,
+            "snapshots": self.snapshots.stats() if self.snapshots is not None else None,
+        }
+
+    def _is_expired(self, predictor: StockPredictor) -> bool:
+        return (self.ttl_seconds > 0 and predictor.trained_at is not None
+                and time.time() - predictor.trained_at > self.ttl_seconds)
+
+    def _load_snapshot(self, key: ModelKey) -> Optional[StockPredictor]:
+        if self.snapshots is None:
+            return None
+        predictor = self.snapshots.load(key)
+        if predictor is None:
+            return None
+        if not self.snapshots.matches(predictor):
+            # Written under this name by a build with another backend or mode
+            self.snapshots.rejected += 1
+            logger.warning(f"Ignoring snapshot for {key}: {predictor.backend} "
+                           f"{'compact' if predictor.compact else 'full'} predictor, "
+                           f"expected {' '.join(self.snapshots.variant)}")
+            return None
+        if self._is_expired(predictor):
+            return None
+        self.put(key, predictor)
+        return predictor
+
+    @contextmanager
+    def _key_lock(self, key: ModelKey):
+        """Hold key's fit lock; it is dropped once no thread holds or waits for it,
+        so there are never more locks than fits in flight"""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
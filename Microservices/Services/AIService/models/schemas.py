@@ -1,5 +1,7 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, List, NamedTuple, Optional
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from core.config import settings
 
 
 class CandleData(BaseModel):
@@ -22,9 +24,122 @@ class SentimentData(BaseModel):
 
 
 class PredictionRequest(BaseModel):
-    candles: List[CandleData] = Field(..., min_items=100, max_items=1000)
+    candles: List[CandleData] = Field(..., min_items=settings.min_candles, max_items=settings.max_candles)
     sentiment: Optional[List[SentimentData]] = None
     symbol: str = Field(default="UNKNOWN")
+    interval: str = Field(default="1h")
+
+
+class CandleArrays(NamedTuple):
+    """OHLCV columns as float64 arrays (open_time as int64), sorted by open_time"""
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def validated(cls, open_time, open, high, low, close, volume) -> "CandleArrays":
+        """Check the columns as whole arrays and sort them only if needed"""
+        open_time = np.asarray(open_time, dtype=np.int64)
+        prices = [np.asarray(column, dtype=np.float64)
+                  for column in (open, high, low, close)]
+        volume = np.asarray(volume, dtype=np.float64)
+
+        n = len(open_time)
+        if any(len(column) != n for column in prices + [volume]):
+            raise ValueError("All candle columns must have the same length")
+        if not settings.min_candles <= n <= settings.max_candles:
+            raise ValueError(
+                f"Between {settings.min_candles} and {settings.max_candles} candles required, got {n}")
+        for name, column in zip(("open", "high", "low", "close"), prices):
+            if not np.all(column > 0):
+                raise ValueError(f"All {name} prices must be positive numbers")
+        if not np.all(volume >= 0):
+            raise ValueError("All volumes must be non-negative numbers")
+
+        if np.any(np.diff(open_time) < 0):
+            order = np.argsort(open_time, kind="stable")
+            open_time = open_time[order]
+            prices = [column[order] for column in prices]
+            volume = volume[order]
+
+        return cls(open_time, *prices, volume)
+
+
+class SentimentArrays(NamedTuple):
+    """Sentiment columns as float64 arrays (timestamp as int64), sorted by timestamp"""
+    timestamp: np.ndarray
+    sentiment_score: np.ndarray
+    news_count: np.ndarray
+    social_mentions: np.ndarray
+
+    @classmethod
+    def from_records(cls, sentiment: List[SentimentData]) -> "SentimentArrays":
+        """Pack validated SentimentData into columns, sorting only if needed"""
+        n = len(sentiment)
+        timestamp = np.fromiter((s.timestamp for s in sentiment), dtype=np.int64, count=n)
+        columns = [np.fromiter((getattr(s, name) for s in sentiment), dtype=np.float64, count=n)
+                   for name in ("sentiment_score", "news_count", "social_mentions")]
+
+        if np.any(np.diff(timestamp) < 0):
+            order = np.argsort(timestamp, kind="stable")
+            timestamp = timestamp[order]
+            columns = [column[order] for column in columns]
+
+        return cls(timestamp, *columns)
+
+
+class CandleColumns(BaseModel):
+    openTime: List[int]
+    open: List[float]
+    high: List[float]
+    low: List[float]
+    close: List[float]
+    volume: List[float]
+
+
+class ColumnarPredictionRequest(BaseModel):
+    """Candles as parallel arrays or as raw Binance klines instead of objects
+
+    Give exactly one of ``columns`` or ``klines``. Klines are the rows the
+    Binance /klines endpoint returns: [openTime, open, high, low, close,
+    volume, closeTime, ...], with prices as strings or numbers.
+    """
+    columns: Optional[CandleColumns] = None
+    klines: Optional[List[List[Any]]] = None
+    sentiment: Optional[List[SentimentData]] = None
+    symbol: str = Field(default="UNKNOWN")
+    interval: str = Field(default="1h")
+
+    _arrays: CandleArrays = PrivateAttr()
+
+    @model_validator(mode="after")
+    def build_arrays(self):
+        if (self.columns is None) == (self.klines is None):
+            raise ValueError("Provide exactly one of 'columns' or 'klines'")
+
+        if self.columns is not None:
+            c = self.columns
+            self._arrays = CandleArrays.validated(
+                c.openTime, c.open, c.high, c.low, c.close, c.volume)
+        else:
+            try:
+                table = np.array(self.klines, dtype=object)
+                if table.ndim != 2 or table.shape[1] < 6:
+                    raise ValueError
+                values = table[:, 1:6].astype(np.float64)
+                open_time = table[:, 0].astype(np.int64)
+            except (ValueError, TypeError):
+                raise ValueError(
+                    "Each kline must start with openTime, open, high, low, close, volume")
+            self._arrays = CandleArrays.validated(open_time, *values.T)
+        return self
+
+    @property
+    def arrays(self) -> CandleArrays:
+        return self._arrays
 
 
 class PredictionResponse(BaseModel):
@@ -33,3 +148,17 @@ class PredictionResponse(BaseModel):
     model_version: str
     features_used: List[str]
     symbol: str
+
+
+class BatchPredictionRequest(BaseModel):
+    requests: List[PredictionRequest] = Field(..., min_items=1)
+
+
+class BatchPredictionItem(BaseModel):
+    symbol: str
+    result: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionItem]
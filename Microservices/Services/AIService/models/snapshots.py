@@ -0,0 +1,114 @@
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import joblib
+
+from models.predictor import StockPredictor
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".joblib"
+
+
+class SnapshotStore:
+    """On-disk snapshots of fitted predictors, one file per registry key and
+    predictor variant.
+
+    The variant is the predictor backend and compact mode the service runs
+    with, and is part of the file name, so replicas configured differently
+    can share the directory. A loaded predictor is checked against it too
+    (``matches``); one built another way is rejected and refitted.
+
+    Snapshots are uncompressed joblib pickles, so the model's NumPy arrays
+    (tree nodes, scaler ranges) are written raw, in .npy layout, and read
+    back in one piece each, with nothing to decompress. Nothing is read
+    until a key is asked for.
+
+    In compact mode they are loaded with mmap_mode="r": a
+    CompactForest's flattened node arrays and the scaler's ranges stay
+    read-only maps of the file, paged in as predictions touch them and
+    shared through the page cache by every worker and replica that loads
+    the same snapshot. It is off otherwise, because unpickling a
+    scikit-learn tree copies its node arrays into the tree's own buffers,
+    so a mapped file would only be read once and then held open.
+    Files are written to a temporary name and renamed into place, so
+    replicas sharing the directory never see a partial snapshot.
+    """
+
+    def __init__(self, directory: str, backend: str = "random_forest", compact: bool = False):
+        self.directory = Path(directory)
+        self.backend = backend
+        self.compact = compact
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.loads = 0
+        self.saves = 0
+        self.failures = 0
+        self.rejected = 0
+
+    @property
+    def variant(self) -> tuple:
+        return self.backend, "compact" if self.compact else "full"
+
+    def path(self, key) -> Path:
+        name = "__".join(re.sub(r"[^A-Za-z0-9_.-]", "_", str(part))
+                         for part in (*key, *self.variant))
+        return self.directory / f"{name}{SNAPSHOT_SUFFIX}"
+
+    def exists(self, key) -> bool:
+        return self.path(key).exists()
+
+    def __len__(self):
+        return len(self.files())
+
+    def files(self) -> List[Path]:
+        return sorted(self.directory.glob(f"*__{'__'.join(self.variant)}{SNAPSHOT_SUFFIX}"))
+
+    def save(self, key, predictor: StockPredictor):
+        path = self.path(key)
+        tmp = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            joblib.dump(predictor, tmp, compress=0)
+            os.replace(tmp, path)
+            self.saves += 1
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Could not save snapshot {path}: {str(e)}")
+            tmp.unlink(missing_ok=True)
+
+    def load(self, key) -> Optional[StockPredictor]:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        try:
+            predictor = joblib.load(path, mmap_mode="r" if self.compact else None)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Could not load snapshot {path}: {str(e)}")
+            return None
+        if not isinstance(predictor, StockPredictor):
+            self.failures += 1
+            logger.error(f"Snapshot {path} does not hold a StockPredictor")
+            return None
+        self.loads += 1
+        logger.info(f"Loaded model snapshot {path.name}")
+        return predictor
+
+    def matches(self, predictor: StockPredictor) -> bool:
+        """True if predictor was built with this store's backend and compact mode"""
+        return predictor.backend == self.backend and predictor.compact == self.compact
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "variant": "__".join(self.variant),
+            "loads": self.loads,
+            "saves": self.saves,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
@@ -1,13 +1,15 @@
 import requests
 import json
 
+from core.resample import kline_source
+
+client = kline_source()
+
 
 def get_binance_data(symbol="BTCUSDT", interval="1h", limit=1000):
-    """Get raw candle data from Binance API"""
-    url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&limit={limit}"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    """Get raw candle data from Binance API (through the kline cache if KLINE_CACHE_DIR is set,
+    resampled from KLINE_BASE_INTERVAL candles if that is set)"""
+    return client.history(symbol, interval, limit)
 
 
 def predict_price(symbol="BTCUSDT", interval="1h"):
@@ -17,13 +19,14 @@ def predict_price(symbol="BTCUSDT", interval="1h"):
 
     prediction_data = {
         "symbol": symbol,
-        "candles": candles
+        "interval": interval,
+        "klines": candles
     }
 
     print("Making prediction...")
     try:
         response = requests.post(
-            "http://localhost:8000/predict",
+            "http://localhost:8000/predict/columnar",
             json=prediction_data
         )
 
@@ -56,7 +59,8 @@ def generate_curl():
 
     curl_data = {
         "symbol": "BTCUSDT",
-        "candles": candles
+        "interval": "1h",
+        "klines": candles
     }
 
     with open("btc_data.json", "w") as f:
@@ -64,7 +68,7 @@ def generate_curl():
 
     print("✅ Data saved to btc_data.json")
     print("\n💡 CURL command:")
-    print("curl -X POST 'http://localhost:8000/predict' \\")
+    print("curl -X POST 'http://localhost:8000/predict/columnar' \\")
     print("  -H 'Content-Type: application/json' \\")
     print("  -d @btc_data.json")
 
@@ -0,0 +1,16 @@
+"""Implementations the service used to have, kept as references for the
+tests and benchmarks that compare against them."""
+import numpy as np
+
+
+def legacy_create_sequences(df, feature_columns, sequence_length=20, limit=None):
+    """The per-row iloc implementation create_sequences used to have; with
+    ``limit`` only the first ``limit`` sequences"""
+    df_clean = df[feature_columns + ['close']].dropna()
+    X, y = [], []
+    n_sequences = len(df_clean) - sequence_length
+    for i in range(n_sequences if limit is None else min(limit, n_sequences)):
+        X.append(df_clean[feature_columns].iloc[i:i +
+                 sequence_length].values.flatten())
+        y.append(df_clean['close'].iloc[i+sequence_length])
+    return np.array(X), np.array(y)
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api.endpoints
+from api.tasks import prepare_batch
+from benchmarks.synthetic import make_candles
+from main import app
+
+BAD_LENGTH = 250
+
+
+def picky_prepare_batch(batch):
+    """prepare_batch that fails on any batch holding a window of BAD_LENGTH candles"""
+    if any(len(candles) == BAD_LENGTH for candles, _ in batch):
+        raise ValueError("Bad candles")
+    return prepare_batch(batch)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api.endpoints, "prepare_batch", picky_prepare_batch)
+    api.endpoints.prediction_cache.clear()
+    with TestClient(app) as client:
+        yield client
+
+
+def item(symbol, n_rows):
+    return {"symbol": symbol, "interval": "1m",
+            "candles": [candle.model_dump() for candle in make_candles(n_rows, seed=n_rows)]}
+
+
+def test_a_bad_item_fails_alone(client):
+    response = client.post("/predict/batch", json={"requests": [
+        item("AAAUSDT", 300), item("BADUSDT", BAD_LENGTH), item("CCCUSDT", 320)]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["symbol"] for result in results] == ["AAAUSDT", "BADUSDT", "CCCUSDT"]
+    assert results[1] == {"symbol": "BADUSDT", "result": None, "error": "Bad candles"}
+    assert all(results[i]["result"] is not None and results[i]["error"] is None for i in (0, 2))
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.endpoints
+from benchmarks.synthetic import make_candles
+from core.executor import ExecutorSaturated, ExecutorTimeout, PredictionExecutor
+from main import app
+
+_calls = []
+
+
+def work(x):
+    _calls.append(x)
+    return x * 2
+
+
+def wait(event):
+    event.wait(5)
+    return "done"
+
+
+def report():
+    """Stands in for api.tasks.registry_stats: state only the worker holds"""
+    return {"calls": len(_calls)}
+
+
+def run(executor, coroutine):
+    try:
+        return asyncio.run(coroutine)
+    finally:
+        executor.shutdown()
+
+
+def test_process_workers_report_their_state():
+    executor = PredictionExecutor(kind="process", max_workers=1, worker_report=report)
+
+    async def calls():
+        results = [await executor.run(work, x) for x in range(3)]
+        return results, executor.worker_reports()
+
+    results, reports = run(executor, calls())
+    assert results == [0, 2, 4] and len(_calls) == 0
+    assert list(reports.values()) == [{"calls": 3}]
+    assert os.getpid() not in reports
+    assert executor.worker_reports() == {}
+
+
+def test_thread_workers_share_the_server_state():
+    executor = PredictionExecutor(kind="thread", max_workers=1, worker_report=report)
+    assert run(executor, executor.run(work, 1)) == 2
+    assert executor.worker_reports() == {}
+
+
+def test_full_queue_rejects_new_tasks():
+    executor = PredictionExecutor(max_workers=1, max_queue=1)
+    event = threading.Event()
+
+    async def calls():
+        running = asyncio.ensure_future(executor.run(wait, event))
+        queued = asyncio.ensure_future(executor.run(wait, event))
+        await asyncio.sleep(0.05)
+        assert (executor.in_flight, executor.queue_depth) == (1, 1)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(wait, event)
+        event.set()
+        return await asyncio.gather(running, queued)
+
+    assert run(executor, calls()) == ["done", "done"]
+    assert (executor.submitted, executor.completed, executor.rejected) == (2, 2, 1)
+
+
+def test_slow_tasks_time_out_but_hold_their_slot():
+    executor = PredictionExecutor(max_workers=1, max_queue=0, timeout_seconds=0.05)
+    event = threading.Event()
+
+    async def calls():
+        with pytest.raises(ExecutorTimeout):
+            await executor.run(wait, event)
+        # The worker is still busy with it, so there is no room yet
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(work, 1)
+        event.set()
+        await asyncio.sleep(0.05)
+        return await executor.run(work, 1)
+
+    assert run(executor, calls()) == 2
+    assert (executor.timeouts, executor.rejected, executor.completed) == (1, 1, 1)
+
+
+@pytest.mark.parametrize("error, status", [(ExecutorSaturated("busy"), 429), (ExecutorTimeout("slow"), 503)])
+def test_pool_errors_map_to_http_statuses(monkeypatch, error, status):
+    async def failing_run(fn, *args, timeout=None):
+        raise error
+
+    monkeypatch.setattr(api.endpoints.executor, "run", failing_run)
+    candles = [candle.model_dump() for candle in make_candles(300, seed=2)]
+    with TestClient(app) as client:
+        response = client.post("/predict", json={"candles": candles})
+    assert response.status_code == status
+    assert response.json()["detail"] == str(error)
+    assert (response.headers.get("Retry-After") == "1") == (status == 429)
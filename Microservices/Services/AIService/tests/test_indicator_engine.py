@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_ohlcv
+from models.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+from models.predictor import StockPredictor
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+@pytest.fixture(params=[(0, 100.0), (1, 60_000.0), (2, 0.05)], ids=["100", "60000", "0.05"])
+def candles(request):
+    seed, start_price = request.param
+    df = make_ohlcv(1500, seed=seed, start_price=start_price)
+    # A flat stretch: zero deltas and a constant 20-bar window
+    df.loc[100:130, ['open', 'high', 'low', 'close']] = start_price
+    return df
+
+
+def assert_rows_match(actual, expected):
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(actual[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=RTOL, atol=ATOL, err_msg=column)
+
+
+def test_engine_matches_batch_indicators(candles):
+    expected = StockPredictor().create_technical_indicators(candles.copy())
+    actual = IndicatorEngine.from_frame(candles, history=len(candles)).frame()
+    assert list(actual.columns[-len(INDICATOR_COLUMNS):]) == INDICATOR_COLUMNS
+    assert_rows_match(actual, expected)
+
+
+def test_appended_candles_match_batch_recompute(candles):
+    """One candle at a time on a 1000-candle window, as the live feed does"""
+    predictor = StockPredictor()
+    engine = IndicatorEngine.from_frame(candles.iloc[:1000])
+    for i, row in enumerate(candles.iloc[1000:].itertuples(index=False), start=1):
+        appended = engine.append(*row)
+        if i % 100 == 0:
+            # Recomputed over everything so far; the engine keeps the last 1000 rows
+            expected = predictor.create_technical_indicators(candles.iloc[:1000 + i].copy()).iloc[i:]
+            assert_rows_match(engine.frame(), expected.reset_index(drop=True))
+            for column in INDICATOR_COLUMNS:
+                assert appended[column] == pytest.approx(expected[column].iloc[-1], rel=RTOL, abs=ATOL,
+                                                         nan_ok=True)
+
+
+def test_engine_rejects_candles_out_of_order(candles):
+    engine = IndicatorEngine.from_frame(candles.iloc[:10])
+    with pytest.raises(ValueError):
+        engine.append(*candles.iloc[9])
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import SMA_WINDOWS, StockPredictor, kernels
+
+RTOL = 1e-9
+
+
+def legacy_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """create_technical_indicators as written before the shared kernels, all pandas"""
+    df['price_change'] = df['close'].pct_change()
+    df['high_low_pct'] = (df['high'] - df['low']) / df['close']
+    df['open_close_pct'] = (df['close'] - df['open']) / df['open']
+    df['sma_5'] = df['close'].rolling(window=5).mean()
+    df['sma_10'] = df['close'].rolling(window=10).mean()
+    df['sma_20'] = df['close'].rolling(window=20).mean()
+    df['sma_50'] = df['close'].rolling(window=50).mean()
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+    df['bb_middle'] = df['close'].rolling(window=20).mean()
+    bb_std = df['close'].rolling(window=20).std()
+    df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
+    df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
+    df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+    df['volume_sma'] = df['volume'].rolling(window=20).mean()
+    df['volume_ratio'] = df['volume'] / df['volume_sma']
+    df['volatility'] = df['close'].rolling(window=20).std()
+    df['high_20'] = df['high'].rolling(window=20).max()
+    df['low_20'] = df['low'].rolling(window=20).min()
+    df['price_position'] = (df['close'] - df['low_20']) / (df['high_20'] - df['low_20'])
+    return df
+
+
+def ohlcv(n_rows: int, seed: int, start_price: float) -> pd.DataFrame:
+    df = make_ohlcv(n_rows, seed=seed, start_price=start_price)
+    # A flat stretch: constant windows and zero price changes
+    df.iloc[100:200, 1:5] = start_price
+    return df
+
+
+@pytest.fixture(params=[(0, 100.0), (1, 60_000.0), (2, 0.05)], ids=["100", "60000", "0.05"])
+def candles(request) -> pd.DataFrame:
+    seed, start_price = request.param
+    return ohlcv(2000, seed, start_price)
+
+
+def test_rolling_mean_many_matches_pandas(candles):
+    close = candles['close'].to_numpy()
+    expected = np.stack([pd.Series(close).rolling(window).mean() for window in SMA_WINDOWS])
+    actual = kernels.rolling_mean_many(close, SMA_WINDOWS)
+    np.testing.assert_allclose(actual, expected, rtol=RTOL, atol=0)
+    for window, row in zip(SMA_WINDOWS, actual):
+        assert np.isnan(row[:window - 1]).all()
+        assert not np.isnan(row[window - 1:]).any()
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 20, 50])
+def test_rolling_extremes_match_pandas(candles, window):
+    high, low = candles['high'].to_numpy(), candles['low'].to_numpy()
+    np.testing.assert_array_equal(kernels.rolling_max(high, window), pd.Series(high).rolling(window).max())
+    np.testing.assert_array_equal(kernels.rolling_min(low, window), pd.Series(low).rolling(window).min())
+
+
+def test_kernels_treat_missing_values_like_pandas():
+    close = make_ohlcv(300)['close'].to_numpy()
+    close[[10, 150, 151]] = np.nan
+    series = pd.Series(close)
+    np.testing.assert_allclose(kernels.rolling_mean_many(close, SMA_WINDOWS),
+                               np.stack([series.rolling(window).mean() for window in SMA_WINDOWS]),
+                               rtol=RTOL)
+    np.testing.assert_array_equal(kernels.rolling_max(close, 20), series.rolling(20).max())
+    np.testing.assert_array_equal(kernels.rolling_min(close, 20), series.rolling(20).min())
+
+
+@pytest.mark.parametrize("n_rows", [0, 3, 49])
+def test_kernels_on_series_shorter_than_the_window(n_rows):
+    close = np.linspace(100.0, 101.0, n_rows)
+    assert np.isnan(kernels.rolling_mean_many(close, SMA_WINDOWS)[-1]).all()
+    assert np.isnan(kernels.rolling_max(close, 50)).all()
+
+
+def test_create_technical_indicators_matches_legacy_pandas(candles):
+    actual = StockPredictor().create_technical_indicators(candles.copy())
+    expected = legacy_indicators(candles.copy())
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=RTOL, atol=0)
+
+
+def test_compact_indicators_match_legacy_pandas(candles):
+    actual = StockPredictor(compact=True).create_technical_indicators(candles.copy())
+    expected = legacy_indicators(candles.copy())[actual.columns]
+    np.testing.assert_allclose(actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64),
+                               rtol=1e-6, atol=1e-6)
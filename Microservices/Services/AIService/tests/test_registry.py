@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from models.registry import ModelKey, ModelRegistry
+
+
+class FakePredictor:
+    """Stands in for StockPredictor: fitting blocks until the test lets it finish"""
+    supports_incremental = False
+    release = threading.Event()
+
+    def __init__(self):
+        self.is_trained = False
+        self.trained_at = None
+        self.trained_until = None
+
+    def train_model(self, df):
+        self.release.wait(5)
+        self.is_trained = True
+        self.trained_at = time.time()
+        self.trained_until = df['timestamp'].max()
+
+    def predict_from_features(self, df):
+        return 1.0, 0.5, []
+
+
+def frame(last: int) -> pd.DataFrame:
+    return pd.DataFrame({"timestamp": range(last - 99, last + 1)})
+
+
+def fitted(df=None) -> FakePredictor:
+    predictor = FakePredictor()
+    predictor.train_model(frame(100) if df is None else df)
+    return predictor
+
+
+@pytest.fixture(autouse=True)
+def fits_finish():
+    FakePredictor.release.set()
+
+
+def test_least_recently_used_is_evicted():
+    registry = ModelRegistry(max_entries=2, factory=FakePredictor)
+    a, b, c = (ModelKey(symbol, "1m") for symbol in ("A", "B", "C"))
+    registry.put(a, fitted())
+    registry.put(b, fitted())
+    registry.get(a)
+    registry.put(c, fitted())
+    assert registry.get(b) is None
+    assert registry.get(a) is not None and registry.get(c) is not None
+    assert registry.evictions == 1
+
+
+def test_expired_models_are_dropped():
+    registry = ModelRegistry(ttl_seconds=60, factory=FakePredictor)
+    key = ModelKey("A", "1m")
+    predictor = fitted()
+    registry.put(key, predictor)
+    assert registry.get(key) is predictor
+    predictor.trained_at -= 61
+    assert registry.get(key) is None
+    assert len(registry) == 0 and registry.evictions == 1
+
+
+def test_refits_after_enough_new_candles():
+    registry = ModelRegistry(retrain_after_candles=5, factory=FakePredictor)
+    key = ModelKey("A", "1m")
+    registry.predict(key, frame(100))
+    first = registry.get(key)
+    # Four candles past the training watermark: still fresh
+    registry.predict(key, frame(104))
+    assert registry.get(key) is first
+    registry.predict(key, frame(105))
+    assert registry.get(key) is not first and registry.get(key).trained_until == 105
+    assert (registry.fits, registry.hits, registry.misses) == (2, 1, 2)
+
+
+def test_one_fit_per_key_at_a_time():
+    FakePredictor.release.clear()
+    registry = ModelRegistry(factory=FakePredictor)
+    key = ModelKey("A", "1m")
+    threads = [threading.Thread(target=registry.predict, args=(key, frame(100))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Every thread is in, the first one fitting and the rest waiting for it
+    time.sleep(0.1)
+    FakePredictor.release.set()
+    for thread in threads:
+        thread.join()
+    assert (registry.fits, registry.misses, registry.hits) == (1, 1, 4)
+
+
+def test_fit_locks_are_dropped_once_no_one_waits():
+    FakePredictor.release.clear()
+    registry = ModelRegistry(factory=FakePredictor)
+    threads = [threading.Thread(target=registry.predict, args=(ModelKey(f"SYM{i % 3}", "1m"), frame(100)))
+               for i in range(9)]
+    for thread in threads:
+        thread.start()
+    FakePredictor.release.set()
+    for thread in threads:
+        thread.join()
+    assert registry._key_locks == {}
+    assert len(registry) == 3
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_ohlcv
+from models.predictor import StockPredictor
+from tests.legacy import legacy_create_sequences
+
+
+def features(n_rows: int, predictor: StockPredictor):
+    df = predictor.create_technical_indicators(make_ohlcv(n_rows, seed=n_rows))
+    df['sentiment_score'] = 0
+    df['news_count'] = 0
+    df['social_mentions'] = 0
+    return df
+
+
+@pytest.mark.parametrize("n_rows", [71, 100, 1000])
+@pytest.mark.parametrize("sequence_length", [1, 20, 21])
+def test_strided_sequences_match_legacy_loop(n_rows, sequence_length):
+    predictor = StockPredictor()
+    df = features(n_rows, predictor)
+    X, y, columns = predictor.create_sequences(df, sequence_length)
+    X_old, y_old = legacy_create_sequences(df, columns, sequence_length)
+    assert X.shape == X_old.shape
+    np.testing.assert_array_equal(X, X_old)
+    np.testing.assert_array_equal(y, y_old)
+    assert not X.flags.writeable
+
+
+def test_last_only_is_the_window_ending_at_the_latest_candle():
+    predictor = StockPredictor()
+    df = features(500, predictor)
+    X, _, columns = predictor.create_sequences(df)
+    X_last, y_last, _ = predictor.create_sequences(df, last_only=True)
+    clean = df[columns + ['close']].dropna()[columns].to_numpy()
+    assert X_last.shape == (1, X.shape[1]) and len(y_last) == 0
+    np.testing.assert_array_equal(X_last[0], clean[-20:].ravel())
+    # One candle on from the last training window, which needs a following close
+    np.testing.assert_array_equal(X_last[0, :-len(columns)], X[-1, len(columns):])
+
+
+def test_compact_sequences_are_the_legacy_ones_as_float32():
+    predictor = StockPredictor(compact=True)
+    df = features(300, predictor)
+    X, y, columns = predictor.create_sequences(df)
+    X_old, y_old = legacy_create_sequences(df, columns)
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(X, X_old.astype(np.float32))
+    np.testing.assert_array_equal(y, y_old)
+
+
+def test_too_few_rows_for_a_sequence():
+    predictor = StockPredictor()
+    df = features(70, predictor)
+    with pytest.raises(ValueError, match="Not enough data points"):
+        predictor.create_sequences(df, sequence_length=21)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_candles
+from models.predictor import CompactForest, StockPredictor
+from models.registry import ModelKey, ModelRegistry
+from models.snapshots import SnapshotStore
+
+KEY = ModelKey("BTCUSDT", "1m")
+
+
+def fitted(**kwargs):
+    predictor = StockPredictor(**kwargs)
+    df = predictor.prepare_features(make_candles(300, seed=7), None)
+    predictor.train_model(df)
+    return predictor, df
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["full", "compact"])
+def test_snapshots_round_trip(tmp_path, compact):
+    predictor, df = fitted(compact=compact)
+    store = SnapshotStore(str(tmp_path), compact=compact)
+    store.save(KEY, predictor)
+    loaded = store.load(KEY)
+
+    # Only compact forests are flat arrays, mapped rather than read
+    assert isinstance(loaded.model, CompactForest) == compact
+    assert isinstance(loaded.scaler.scale_, np.memmap) == compact
+    assert loaded.predict_from_features(df) == predictor.predict_from_features(df)
+
+
+def test_mapped_snapshots_update_a_copy(tmp_path):
+    predictor, df = fitted(compact=True, backend="incremental_forest")
+    store = SnapshotStore(str(tmp_path), backend="incremental_forest", compact=True)
+    store.save(KEY, predictor)
+    loaded = store.load(KEY)
+    assert isinstance(loaded.scaler.scale_, np.memmap)
+    # Never written in place; the registry swaps in the updated copy
+    updated = loaded.updated(df)
+    assert updated.predict_from_features(df)[0] > 0
+
+
+def test_variants_get_their_own_files(tmp_path):
+    full, compact = SnapshotStore(str(tmp_path)), SnapshotStore(str(tmp_path), compact=True)
+    sgd = SnapshotStore(str(tmp_path), backend="sgd")
+    assert full.path(KEY).name == f"BTCUSDT__1m__{KEY.feature_version}__random_forest__full.joblib"
+    assert len({full.path(KEY), compact.path(KEY), sgd.path(KEY)}) == 3
+
+    full.save(KEY, fitted()[0])
+    assert len(full) == 1 and len(compact) == 0 and compact.load(KEY) is None
+
+
+def test_registry_refits_over_a_mismatched_snapshot(tmp_path):
+    predictor, df = fitted()
+    store = SnapshotStore(str(tmp_path), compact=True)
+    # A full predictor under the compact name, e.g. copied in by hand
+    SnapshotStore(str(tmp_path)).save(KEY, predictor)
+    SnapshotStore(str(tmp_path)).path(KEY).rename(store.path(KEY))
+
+    registry = ModelRegistry(factory=lambda: StockPredictor(compact=True), snapshots=store)
+    registry.predict(KEY, df)
+    assert store.rejected == 1 and registry.fits == 1
+    assert store.load(KEY).compact
@@ -32,8 +32,8 @@ public class BacktestController : ControllerBase
     [HttpPost("run")]
     public async Task<IActionResult> RunBacktest([FromQuery] int strategy)
     {
-        var output = await _backtestRunner.Run(strategy);
-        return Ok(new { Output = output });
+        var result = await _backtestRunner.Run(strategy);
+        return Ok(new { Output = result.Output, Summary = result.Summary, RunId = result.RunId });
     }
 
     [HttpPost("collect-data")]
@@ -59,7 +59,7 @@ public class BacktestController : ControllerBase
 
             if (int.TryParse(request.Strategy, out int strategyId))
             {
-                var backtestOutput = await _backtestRunner.Run(strategyId);
+                var result = await _backtestRunner.Run(strategyId);
 
                 return Ok(new
                 {
@@ -68,7 +68,9 @@ public class BacktestController : ControllerBase
                     Interval = request.Interval,
                     Strategy = strategyId,
                     FilePath = filePath,
-                    Output = backtestOutput
+                    Output = result.Output,
+                    Summary = result.Summary,
+                    RunId = result.RunId
                 });
             }
             else
@@ -83,9 +85,28 @@ public class BacktestController : ControllerBase
         }
     }
 
+    // Pass ?run=<RunId from collect-data>; without it the newest run is used,
+    // which may be someone else's when several backtests run at once
     [HttpGet("chart-file")]
-    public IActionResult GetChartFile()
+    public async Task<IActionResult> GetChartFile([FromQuery] string? run)
     {
+        if (!string.IsNullOrWhiteSpace(run) && !BacktestRunner.IsValidRunId(run))
+            return BadRequest("Invalid run id.");
+
+        var runId = string.IsNullOrWhiteSpace(run) ? _sendBacktestResult.GetLatestRunId() : run;
+        if (runId != null && _sendBacktestResult.RunExists(runId))
+        {
+            // Render on first request; later requests get the saved file
+            var chartPath = _sendBacktestResult.GetRunChartFilePath(runId);
+            if (!System.IO.File.Exists(chartPath)
+                && (!await _backtestRunner.RenderChart(runId) || !System.IO.File.Exists(chartPath)))
+                return StatusCode(500, "Chart could not be rendered.");
+            return PhysicalFile(chartPath, "text/html");
+        }
+        if (!string.IsNullOrWhiteSpace(run))
+            return NotFound($"Run {run} not found.");
+
+        // Chart from before runs were saved
         var filePath = _sendBacktestResult.GetChartFilePath();
         if (!System.IO.File.Exists(filePath))
             return NotFound("Chart file not found.");
@@ -93,12 +114,24 @@ public class BacktestController : ControllerBase
         return PhysicalFile(filePath, "text/html");
     }
 
+    // Same run selection as chart-file
     [HttpGet("summary-file")]
-    public IActionResult GetSummaryFile()
+    public IActionResult GetSummaryFile([FromQuery] string? run)
     {
-        var filePath = _sendBacktestResult.GetSummaryFilePath();
-        if (!System.IO.File.Exists(filePath))
-            return NotFound("Summary file not found.");
+        if (!string.IsNullOrWhiteSpace(run) && !BacktestRunner.IsValidRunId(run))
+            return BadRequest("Invalid run id.");
+
+        var runId = string.IsNullOrWhiteSpace(run) ? _sendBacktestResult.GetLatestRunId() : run;
+        var filePath = runId != null ? _sendBacktestResult.GetRunSummaryFilePath(runId) : null;
+        if (filePath == null || !System.IO.File.Exists(filePath))
+        {
+            if (!string.IsNullOrWhiteSpace(run))
+                return NotFound($"Summary of run {run} not found.");
+            // Summary from before runs were saved
+            filePath = _sendBacktestResult.GetSummaryFilePath();
+            if (!System.IO.File.Exists(filePath))
+                return NotFound("Summary file not found.");
+        }
 
         var fileContent = System.IO.File.ReadAllText(filePath);
         return Content(fileContent, "application/json");
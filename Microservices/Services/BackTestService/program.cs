@@ -23,7 +23,10 @@ public class Program
 
         // Register services
         builder.Services.AddSingleton<BinanceService>();
+        builder.Services.AddSingleton<BacktestWorkerPool>();
         builder.Services.AddSingleton<BacktestRunner>();
+        if (builder.Configuration.GetValue("Backtest:UseWorkerPool", true))
+            builder.Services.AddHostedService<BacktestWorkerPoolWarmup>();
         builder.Services.AddScoped<SendBacktestResult>();
 
 
@@ -82,7 +85,7 @@ public class Program
         Console.WriteLine("HTTPS: https://localhost:443");
         Console.WriteLine("Data folder: ./data");
         Console.WriteLine("Python folder: ./python");
-        
+
         app.Run();
     }
 }
\ No newline at end of file
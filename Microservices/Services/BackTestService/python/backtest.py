@@ -1,21 +1,90 @@
+"""Backtest the built-in strategies on the downloaded candles.
+
+One-shot:  python3 -u python/backtest.py <strategy 1..4 | list like 1,3 | all>
+Server:    python3 -u python/backtest.py --serve
+Sweep:     python3 -u python/backtest.py --sweep <strategy 1..4> [options]
+Walk-fwd:  python3 -u python/backtest.py --walk-forward <strategy 1..4> [options]
+Convert:   python3 -u python/backtest.py --convert [data file]
+Chart:     python3 -u python/backtest.py --chart [run id | latest]
+
+In server mode the process stays up and answers one JSON request per stdin
+line, e.g. {"id": "7", "strategy": 2} (or "strategies": [1, 3]), with one
+JSON line on stdout:
+{"id": "7", "ok": true, "output": "...", "errors": "", "summary": {...},
+ "runs": ["<run id>"]}.
+Imports and the parsed dataset stay in memory between requests; the dataset
+is reloaded only when the data file changes. A {"ready": true} line is
+written once the server can take requests.
+
+Several strategies in one invocation share the loaded dataset and their
+indicators (indicators.py) and run in parallel worker processes where fork
+is available. The combined summary is then a list of result rows; a
+single strategy still gets a single row.
+
+Sweep mode runs a parameter grid for one strategy in parallel, see sweep.py.
+Walk-forward mode evaluates it on rolling train/test windows, optionally
+re-optimizing on each train window, see walkforward.py.
+
+Candles are read from a memory-mapped columnar store next to the JSON file
+when one is current (see candle_store.py); otherwise the JSON is parsed and
+the store is written for the next run. --convert does just that step.
+
+BACKTEST_ENGINE=vectorized (or "engine": "vectorized" in a server request)
+runs the strategies on the NumPy engine in vectorized.py instead of
+backtesting.Backtest. It reports the same summary.
+
+Each run's summary row, equity curve, trades and indicators are saved under
+plots/runs/<run id>/, so concurrent runs never overwrite each other's
+results, and its chart is rendered only when asked for (--chart, or
+{"chart": run id} in server mode); see charts.py. BACKTEST_CHARTS=eager
+renders right after every run, =off saves nothing and the summary is only
+returned.
+
+Finished results are kept in a content-addressed store (see results.py), so
+rerunning a strategy on the same candles returns at once.
+"""
 import sys
 import os
+import io
 import json
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from datetime import datetime
+from types import SimpleNamespace
 
 import pandas as pd
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
-import talib
+
+import candle_store
+import charts
+import indicators
+import results
+import vectorized
+from indicators import MACD, RSI, SMA
+
+DATA_FILE = os.getenv("BACKTEST_DATA_FILE", "/app/data/candles.json")
+PLOTS_DIR = "plots"
+ENGINES = ("event", "vectorized")
+ENGINE = os.getenv("BACKTEST_ENGINE", "event")
+CHART_MODES = ("lazy", "eager", "off")
+CHART_MODE = os.getenv("BACKTEST_CHARTS", "lazy")
+
+
+class DataLoadError(Exception):
+    pass
+
 
 # ---------------------------------------------------------
 # Parse strategy choice from CLI (expects 1..4; defaults to 1)
 # ---------------------------------------------------------
-def parse_choice() -> int:
+def parse_choice(arg=None) -> int:
     choice = 0
-    if len(sys.argv) > 1:
+    if arg is not None:
         try:
-            choice = int(sys.argv[1])
+            choice = int(arg)
         except Exception:
             print("Invalid argument, defaulting to 1")
             choice = 1
@@ -24,63 +93,114 @@ def parse_choice() -> int:
         choice = 1
     return choice
 
-choice = parse_choice()
 
-# ---------------------------------------------------------
-# Paths & setup
-# ---------------------------------------------------------
-print("Python received arguments:", sys.argv)
-os.makedirs("plots", exist_ok=True)
+def parse_choices(arg=None) -> list:
+    """Strategy choices from 2, "1,3", [1, 3] or "all"; duplicates dropped"""
+    if isinstance(arg, str) and arg.strip().lower() == "all":
+        return list(strategies_map)
+    if isinstance(arg, (list, tuple)):
+        parts = list(arg)
+    elif isinstance(arg, str) and "," in arg:
+        parts = [part for part in arg.split(",") if part.strip()]
+    else:
+        return [parse_choice(arg)]
 
-print("Starting Automated Backtesting...")
-print("=" * 50)
+    choices = []
+    for part in parts or [None]:
+        choice = parse_choice(part)
+        if choice not in choices:
+            choices.append(choice)
+    return choices
 
-data_file = "/app/data/candles.json"
-print(f"Loading data from: {data_file}")
 
 # ---------------------------------------------------------
-# Load JSON data 
+# Load data: columnar store if current, else JSON & clean
 # ---------------------------------------------------------
-try:
-    with open(data_file, "r") as f:
-        raw_data = json.load(f)
-    print(f"SUCCESS: Loaded {len(raw_data)} candle records")
-except Exception as e:
-    print(f"ERROR: Could not load data file: {e}")
-    sys.exit(1)
+def load_data(data_file: str = DATA_FILE) -> pd.DataFrame:
+    if candle_store.is_current(data_file):
+        try:
+            return load_store(data_file)
+        except Exception as e:
+            print(f"WARNING: Could not read columnar store, using JSON: {e}")
 
-# ---------------------------------------------------------
-# Convert to DataFrame & clean
-# ---------------------------------------------------------
-df = pd.DataFrame(raw_data)
-print(f"DataFrame created with {len(df)} rows")
+    df = load_json(data_file)
+    try:
+        path = candle_store.save(df, data_file)
+        print(f"Columnar store written: {path}")
+    except Exception as e:
+        print(f"WARNING: Could not write columnar store: {e}")
+    print("=" * 50)
+    return df
+
+
+def load_store(data_file: str) -> pd.DataFrame:
+    print(f"Loading data from: {candle_store.store_path(data_file)}")
+    df = candle_store.load(data_file)
+    print(f"SUCCESS: Memory-mapped {len(df)} candle records")
+    print(f"Date range: {df.index.min()} to {df.index.max()}")
+    print("=" * 50)
+    return df
+
+
+def load_json(data_file: str) -> pd.DataFrame:
+    print(f"Loading data from: {data_file}")
+
+    try:
+        with open(data_file, "r") as f:
+            raw_data = json.load(f)
+        print(f"SUCCESS: Loaded {len(raw_data)} candle records")
+    except Exception as e:
+        print(f"ERROR: Could not load data file: {e}")
+        raise DataLoadError(str(e))
 
-# Convert time and set index
-df['Date'] = pd.to_datetime(df['openTime'])
-df.set_index('Date', inplace=True)
+    df = pd.DataFrame(raw_data)
+    print(f"DataFrame created with {len(df)} rows")
 
-# Rename columns for backtesting
-df.rename(columns={
-    'open': 'Open',
-    'high': 'High',
-    'low': 'Low',
-    'close': 'Close',
-    'volume': 'Volume'
-}, inplace=True)
+    # Convert time and set index
+    df['Date'] = pd.to_datetime(df['openTime'])
+    df.set_index('Date', inplace=True)
 
-# Keep only OHLCV columns and convert to numeric
-df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
-for col in df.columns:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Rename columns for backtesting
+    df.rename(columns={
+        'open': 'Open',
+        'high': 'High',
+        'low': 'Low',
+        'close': 'Close',
+        'volume': 'Volume'
+    }, inplace=True)
 
-# Clean data
-initial_rows = len(df)
-df.dropna(inplace=True)
-final_rows = len(df)
+    # Keep only OHLCV columns and convert to numeric
+    df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
 
-print(f"Data cleaned: {initial_rows} -> {final_rows} rows")
-print(f"Date range: {df.index.min()} to {df.index.max()}")
-print("=" * 50)
+    # Clean data
+    initial_rows = len(df)
+    df.dropna(inplace=True)
+    final_rows = len(df)
+
+    print(f"Data cleaned: {initial_rows} -> {final_rows} rows")
+    print(f"Date range: {df.index.min()} to {df.index.max()}")
+    return df
+
+
+class DatasetCache:
+    """Keeps parsed datasets in memory until their file changes on disk"""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, data_file: str) -> pd.DataFrame:
+        version = candle_store.version(data_file)
+        cached = self._entries.get(data_file)
+        if cached is not None and cached[0] == version:
+            df = cached[1]
+            print(f"Using cached data from: {data_file} ({len(df)} rows)")
+            print("=" * 50)
+            return df
+        df = load_data(data_file)
+        self._entries[data_file] = (version, df)
+        return df
 
 # ---------------------------------------------------------
 # Strategy Classes
@@ -89,8 +209,8 @@ class MA30MA90(Strategy):
     ma_short = 10
     ma_long = 30
     def init(self):
-        self.short_ma = self.I(talib.SMA, self.data.Close, self.ma_short)
-        self.long_ma = self.I(talib.SMA, self.data.Close, self.ma_long)
+        self.short_ma = self.I(SMA, self.data.Close, self.ma_short)
+        self.long_ma = self.I(SMA, self.data.Close, self.ma_long)
     def next(self):
         if crossover(self.short_ma, self.long_ma):
             if self.position.is_short:
@@ -106,7 +226,7 @@ class RSI_Strategy(Strategy):
     upper_bound = 70
     lower_bound = 30
     def init(self):
-        self.rsi = self.I(talib.RSI, self.data.Close, self.rsi_window)
+        self.rsi = self.I(RSI, self.data.Close, self.rsi_window)
     def next(self):
         if crossover(self.rsi, self.upper_bound):
             if self.position.is_long:
@@ -122,10 +242,10 @@ class MACD_Strategy(Strategy):
     slowperiod = 26
     signalperiod = 9
     def init(self):
-        macd, signal, _ = talib.MACD(self.data.Close,
-                                     fastperiod=self.fastperiod,
-                                     slowperiod=self.slowperiod,
-                                     signalperiod=self.signalperiod)
+        macd, signal, _ = MACD(self.data.Close,
+                               fastperiod=self.fastperiod,
+                               slowperiod=self.slowperiod,
+                               signalperiod=self.signalperiod)
         self.macd = self.I(lambda: macd)
         self.signal = self.I(lambda: signal)
     def next(self):
@@ -142,8 +262,8 @@ class MA50MA200(Strategy):
     ma_short = 50
     ma_long = 200
     def init(self):
-        self.short_ma = self.I(talib.SMA, self.data.Close, self.ma_short)
-        self.long_ma = self.I(talib.SMA, self.data.Close, self.ma_long)
+        self.short_ma = self.I(SMA, self.data.Close, self.ma_short)
+        self.long_ma = self.I(SMA, self.data.Close, self.ma_long)
     def next(self):
         if crossover(self.short_ma, self.long_ma):
             if self.position.is_short:
@@ -164,88 +284,293 @@ strategies_map = {
     4: ("MA50-MA200", MA50MA200),
 }
 
-name, strategy_class = strategies_map[choice]
-print(f"Selected Strategy [{choice}]: {name}")
+ERROR_METRICS = {
+    "Return [%]": "ERROR",
+    "Sharpe Ratio": "ERROR",
+    "Max Drawdown [%]": "ERROR",
+    "Win Rate [%]": "ERROR",
+    "Total Trades": "ERROR"
+}
+
 
 # ---------------------------------------------------------
 # Run backtest
 # ---------------------------------------------------------
-results_summary = []
-try:
+def extract_metrics(name: str, stats) -> dict:
+    """Summary row for one run, as saved in the run's summary.json"""
+    return {
+        "Strategy": name,
+        "Return [%]": round(float(stats["Return [%]"]), 2),
+        "Sharpe Ratio": round(float(stats["Sharpe Ratio"]), 3),
+        "Max Drawdown [%]": round(float(stats["Max. Drawdown [%]"]), 2),
+        "Win Rate [%]": round(float(stats["Win Rate [%]"]), 2),
+        "Total Trades": int(stats["# Trades"])
+    }
+
+
+def run_strategy(df: pd.DataFrame, strategy_class, engine: str = ENGINE, params: dict = None):
+    """Backtest statistics for one strategy from the chosen engine"""
+    if engine == "vectorized":
+        return vectorized.run(df, strategy_class, cash=10000, **(params or {}))
     bt = Backtest(df, strategy_class, cash=10000, finalize_trades=True)
-    stats = bt.run()
+    return bt.run(**(params or {}))
 
-    # Extract metrics
-    total_return = float(stats["Return [%]"])
-    sharpe_ratio = float(stats["Sharpe Ratio"])
-    max_drawdown = float(stats["Max. Drawdown [%]"])
-    win_rate = float(stats["Win Rate [%]"])
-    total_trades = int(stats["# Trades"])
 
-    # Store results
-    results_summary.append({
-        "Strategy": name,
-        "Return [%]": round(total_return, 2),
-        "Sharpe Ratio": round(sharpe_ratio, 3),
-        "Max Drawdown [%]": round(max_drawdown, 2),
-        "Win Rate [%]": round(win_rate, 2),
-        "Total Trades": total_trades
-    })
-
-    print(f"SUCCESS: {name}")
-    print(f"  Return: {total_return:.2f}%")
-    print(f"  Sharpe: {sharpe_ratio:.3f}")
-    print(f"  Max DD: {max_drawdown:.2f}%")
-    print(f"  Win Rate: {win_rate:.2f}%")
-    print(f"  Trades: {total_trades}")
-
-    # Save chart (delete if exists)
-    filename = f"plots/chart.html"
-    if os.path.exists(filename):
-        os.remove(filename)
-        print(f"Deleted old chart: {filename}")
-    bt.plot(filename=filename)
-    print(f"  Chart: {filename}")
-
-except Exception as e:
-    print(f"ERROR: {name} failed - {e}")
-    results_summary.append({
-        "Strategy": name,
-        "Return [%]": "ERROR",
-        "Sharpe Ratio": "ERROR",
-        "Max Drawdown [%]": "ERROR",
-        "Win Rate [%]": "ERROR",
-        "Total Trades": "ERROR"
-    })
+def run_backtest(df: pd.DataFrame, choice: int, engine: str = ENGINE,
+                 chart: str = CHART_MODE) -> tuple:
+    """(summary row, run id); the run id is None when nothing was saved"""
+    name, strategy_class = strategies_map[choice]
+    run_id = None
+    print(f"Selected Strategy [{choice}]: {name}")
+    if engine not in ENGINES:
+        print(f"Unknown engine {engine}, using event")
+        engine = "event"
+
+    try:
+        key = results.result_key(df, strategy_class, engine)
+        stored = results.store.get(key)
+        meta = {"strategy": name, "choice": choice, "engine": engine, "params": {}}
+        if stored is not None:
+            result = stored.summary
+            print(f"SUCCESS: {name} (stored result {key})")
+        else:
+            stats = run_strategy(df, strategy_class, engine)
+            result = extract_metrics(name, stats)
+            results.store.put(key, stats, result, meta)
+            print(f"SUCCESS: {name}")
+        print(f"  Return: {result['Return [%]']:.2f}%")
+        print(f"  Sharpe: {result['Sharpe Ratio']:.3f}")
+        print(f"  Max DD: {result['Max Drawdown [%]']:.2f}%")
+        print(f"  Win Rate: {result['Win Rate [%]']:.2f}%")
+        print(f"  Trades: {result['Total Trades']}")
+
+        # Save the results; the chart is drawn from them when someone asks for it
+        if chart != "off":
+            meta = {**meta, "summary": result}
+            if stored is not None:
+                run_id = charts.save_parts(df, stored.equity, stored.trades, stored.indicators, meta)
+            else:
+                run_id = charts.save_run(df, stats, meta)
+            print(f"  Run: {run_id}")
+            if chart == "eager":
+                print(f"  Chart: {charts.render(run_id)}")
+            else:
+                print(f"  Chart: on demand (--chart {run_id})")
+
+    except Exception as e:
+        print(f"ERROR: {name} failed - {e}")
+        result = {"Strategy": name, **ERROR_METRICS}
+
+    return result, run_id
+
 
 # ---------------------------------------------------------
 # Final Summary
 # ---------------------------------------------------------
+def write_summary(results_summary: list, name: str, run_ids: list):
+    """Print the summary table; returns the summary (one row or a list of rows) and the run ids"""
+    print("\n" + "=" * 50)
+    print("BACKTEST SUMMARY")
+    print("=" * 50)
+
+    summary_df = pd.DataFrame(results_summary)
+    print(summary_df.to_string(index=False))
+
+    # Save summary JSON (remove best strategy logic); several strategies -> list of rows
+    if len(results_summary) > 1:
+        result = results_summary
+    else:
+        result = results_summary[0] if results_summary else {
+            "Strategy": name, **ERROR_METRICS}
+
+    run_ids = [run_id for run_id in run_ids if run_id]
+    print()
+    for run_id in run_ids:
+        print(f"Summary saved: {charts.RUNS_DIR / run_id / charts.SUMMARY_FILE}")
+    print(f"Runs saved in: {charts.RUNS_DIR}/")
+    print("\nBacktest completed!")
+    return result, run_ids
+
+
+def run_once(choice: int, df: pd.DataFrame, engine: str = ENGINE) -> tuple:
+    result, run_id = run_backtest(df, choice, engine)
+    return write_summary([result], result["Strategy"], [run_id])
+
+
 # ---------------------------------------------------------
-# Final Summary
+# Several strategies in one pass
 # ---------------------------------------------------------
-print("\n" + "=" * 50)
-print("BACKTEST SUMMARY")
-print("=" * 50)
+# Dataset for forked workers, set before the pool starts
+_shared = {}
 
-summary_df = pd.DataFrame(results_summary)
-print(summary_df.to_string(index=False))
 
-# Save summary JSON (remove best strategy logic)
-result = results_summary[0] if results_summary else {
-    "Strategy": name,
-    "Return [%]": "ERROR",
-    "Sharpe Ratio": "ERROR",
-    "Max Drawdown [%]": "ERROR",
-    "Win Rate [%]": "ERROR",
-    "Total Trades": "ERROR"
-}
+def prime_indicators(df: pd.DataFrame, strategy_class, params: dict = None):
+    """Run a strategy's init() outside a backtest so its indicators land in the shared cache"""
+    params = {**{key: value for key, value in vars(strategy_class).items()
+                 if not key.startswith("_") and not callable(value)}, **(params or {})}
+    data = SimpleNamespace(**{column: df[column].to_numpy() for column in df.columns})
+    probe = SimpleNamespace(data=data, I=lambda func, *args, **kwargs: func(*args, **kwargs),
+                            **params)
+    strategy_class.init(probe)
+
+
+# Strategy parameters that are SMA lengths of the close
+SMA_PARAMS = {MA30MA90: ("ma_short", "ma_long"), MA50MA200: ("ma_short", "ma_long")}
+
+
+def prime_sma(df: pd.DataFrame, strategy_class, combos: list):
+    """Every SMA length a strategy's parameter sets use, computed in one pass
+    into the shared cache (see prime_indicators)"""
+    names = SMA_PARAMS.get(strategy_class, ())
+    windows = {int((combo or {}).get(name, getattr(strategy_class, name)))
+               for combo in combos or [{}] for name in names}
+    if windows:
+        indicators.SMA_many(df["Close"].to_numpy(), sorted(windows))
+
+
+def _run_captured(task):
+    choice, engine = task
+    output, errors = io.StringIO(), io.StringIO()
+    before = indicators.cache.stats()
+    with redirect_stdout(output), redirect_stderr(errors):
+        result, run_id = run_backtest(_shared["df"], choice, engine)
+    after = indicators.cache.stats()
+    usage = {key: after[key] - before[key] for key in ("computed", "reused")}
+    return result, run_id, output.getvalue(), errors.getvalue(), usage
+
+
+def run_many(df: pd.DataFrame, choices: list, engine: str = ENGINE) -> tuple:
+    """Backtest several strategies on one dataset; summary rows and run ids in
+    the order of choices"""
+    indicators.cache.bind(df)
+    _shared["df"] = df
+    tasks = [(choice, engine) for choice in choices]
+
+    computed, reused = 0, 0
+    workers = min(len(tasks), os.cpu_count() or 1)
+    try:
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            # Workers inherit the dataset and the primed indicators; nothing is pickled
+            before = indicators.cache.computed
+            for choice in choices:
+                prime_indicators(df, strategies_map[choice][1])
+            computed = indicators.cache.computed - before
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("fork")) as pool:
+                runs = list(pool.map(_run_captured, tasks))
+        else:
+            runs = [_run_captured(task) for task in tasks]
+    finally:
+        # Drop the cached indicators and the dataset they hold on to
+        indicators.cache.unbind()
+        _shared.clear()
+
+    results, run_ids = [], []
+    for result, run_id, output, errors, usage in runs:
+        print(output, end="")
+        print(errors, end="", file=sys.stderr)
+        results.append(result)
+        run_ids.append(run_id)
+        computed += usage["computed"]
+        reused += usage["reused"]
+    print(f"Indicator cache: {computed} computed, {reused} reused")
+    return results, run_ids
+
+
+def run_selected(choices: list, df: pd.DataFrame, engine: str = ENGINE) -> tuple:
+    """(summary, run ids) as from write_summary"""
+    if len(choices) == 1:
+        return run_once(choices[0], df, engine)
+    results, run_ids = run_many(df, choices, engine)
+    return write_summary(results, "ALL", run_ids)
+
+
+# ---------------------------------------------------------
+# Server mode: JSON requests on stdin, JSON responses on stdout
+# ---------------------------------------------------------
+def handle_request(request: dict, datasets: DatasetCache) -> dict:
+    output, errors = io.StringIO(), io.StringIO()
+    response = {"id": request.get("id")}
+    with redirect_stdout(output), redirect_stderr(errors):
+        try:
+            if request.get("chart"):
+                response["chart"] = str(charts.render(request["chart"]))
+            else:
+                choices = parse_choices(request.get("strategies") or request.get("strategy"))
+                print("Python received request:", json.dumps(request))
+                print("Starting Automated Backtesting...")
+                print("=" * 50)
+                df = datasets.get(request.get("data_file") or DATA_FILE)
+                response["summary"], response["runs"] = run_selected(
+                    choices, df, request.get("engine") or ENGINE)
+            response["ok"] = True
+        except (DataLoadError, charts.RunNotFound) as e:
+            response.update(ok=False, error=str(e))
+        except Exception as e:
+            traceback.print_exc()
+            response.update(ok=False, error=str(e))
+    response["output"] = output.getvalue()
+    response["errors"] = errors.getvalue()
+    return response
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    datasets = DatasetCache()
+    stdout.write(json.dumps({"ready": True, "pid": os.getpid()}) + "\n")
+    stdout.flush()
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"id": None, "ok": False, "error": f"Invalid request: {e}",
+                        "output": "", "errors": ""}
+        else:
+            response = handle_request(request, datasets)
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def main():
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve()
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--chart":
+        charts.main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--convert":
+        candle_store.main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--sweep":
+        import sweep
+        sweep.main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--walk-forward":
+        import walkforward
+        walkforward.main(sys.argv[2:])
+        return
+
+    choices = parse_choices(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    print("Python received arguments:", sys.argv)
+    print("Starting Automated Backtesting...")
+    print("=" * 50)
+
+    try:
+        df = load_data(DATA_FILE)
+    except DataLoadError:
+        sys.exit(1)
+
+    run_selected(choices, df)
 
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-json_file = f"plots/summary.json"
-with open(json_file, "w") as f:
-    json.dump(result, f, indent=4)
 
-print(f"\nSummary saved: {json_file}")
-print("Charts saved in: plots/")
-print("\nBacktest completed!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Check the vectorized engine against backtesting.Backtest and time both.
+
+Every built-in strategy is run through both engines, with its default
+parameters and a few random ones from the sweep grids, and the summary rows
+must be identical; the script exits non-zero if they are not.
+tests/test_vectorized.py checks the fills trade by trade. Run from the
+python directory:
+
+    python -m benchmarks.bench_vectorized [--rows 1051200] [--event-rows 20000]
+"""
+import argparse
+import sys
+import time
+import warnings
+
+from backtesting import Backtest
+
+import vectorized
+from backtest import extract_metrics, strategies_map
+from benchmarks.synthetic import make_ohlcv
+from sweep import DEFAULT_GRIDS, build_combinations
+
+
+def check_parity(df, choice, params) -> bool:
+    name, strategy_class = strategies_map[choice]
+    with warnings.catch_warnings():
+        # Orders the broker cancels for lack of margin
+        warnings.simplefilter("ignore")
+        expected = Backtest(df, strategy_class, cash=10000, finalize_trades=True).run(**params)
+    actual = vectorized.run(df, strategy_class, cash=10000, **params)
+    expected, actual = extract_metrics(name, expected), extract_metrics(name, actual)
+    if expected != actual:
+        print(f"  MISMATCH {name} {params}:\n    event      {expected}\n    vectorized {actual}")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2 * 525_600, help="Minute bars for the timing run")
+    parser.add_argument('--event-rows', type=int, default=20_000, help="Bars for the side-by-side timing")
+    parser.add_argument('--combos', type=int, default=3, help="Random parameter sets per strategy")
+    args = parser.parse_args()
+
+    ok = True
+    for seed, freq in [(0, "5min"), (1, "1min"), (2, "1h")]:
+        df = make_ohlcv(3000, seed=seed, freq=freq)
+        # Flat stretch: indicators touch without crossing
+        df.iloc[500:560, :4] = df['Close'].iloc[500]
+        for choice, (name, strategy_class) in strategies_map.items():
+            combos = [{}] + build_combinations(strategy_class, DEFAULT_GRIDS[strategy_class],
+                                               samples=args.combos, seed=seed)
+            parity = all([check_parity(df, choice, params) for params in combos])
+            print(f"parity seed={seed} freq={freq} {name}: {'ok' if parity else 'FAILED'}")
+            ok &= parity
+
+    df = make_ohlcv(args.event_rows, seed=3)
+    for choice, (name, strategy_class) in strategies_map.items():
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            Backtest(df, strategy_class, cash=10000, finalize_trades=True).run()
+        event = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized.run(df, strategy_class)
+        fast = time.perf_counter() - start
+        print(f"{name} on {len(df)} bars: event-driven {event:.2f}s, "
+              f"vectorized {fast * 1e3:.1f} ms ({event / fast:.0f}x)")
+
+    df = make_ohlcv(args.rows, seed=4)
+    for choice, (name, strategy_class) in strategies_map.items():
+        start = time.perf_counter()
+        stats = vectorized.run(df, strategy_class)
+        elapsed = time.perf_counter() - start
+        print(f"{name} on {len(df)} minute bars: vectorized {elapsed:.3f}s, "
+              f"{stats['# Trades']} trades")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
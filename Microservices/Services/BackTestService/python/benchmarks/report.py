@@ -0,0 +1,10 @@
+"""The shared benchmark report helpers, Shared/Benchmarks/benchmark_report.py"""
+import sys
+from pathlib import Path
+
+try:
+    from benchmark_report import Report, compare, environment, measure
+except ImportError:
+    # Running from the source tree; the image copies the module into /app/python
+    sys.path.append(str(Path(__file__).resolve().parents[4] / "Shared" / "Benchmarks"))
+    from benchmark_report import Report, compare, environment, measure
@@ -0,0 +1,90 @@
+"""Benchmark suite for the backtest phases, reported as JSON.
+
+On synthetic candles of --rows minute bars, times loading (parsing
+candles.json, writing and memory-mapping the columnar store), computing each
+strategy's indicators, and running each strategy on the vectorized engine
+and, on the first --event-rows bars, on backtesting.Backtest. Needs no
+network. Run from the python directory:
+
+    python -m benchmarks.suite [--rows 525600] > before.json
+    python -m benchmarks.suite --compare before.json
+
+The JSON report goes to stdout (or --output), progress to stderr.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import warnings
+from contextlib import redirect_stdout
+
+import candle_store
+import indicators
+from backtest import load_data, load_json, prime_indicators, run_strategy, strategies_map
+from benchmarks.report import Report, compare, environment, measure
+from benchmarks.synthetic import make_ohlcv, write_candles_json
+
+
+def quiet(fn):
+    """fn with its progress prints swallowed"""
+    def call():
+        with redirect_stdout(io.StringIO()):
+            return fn()
+    return call
+
+
+def bench_load(report: Report, rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = os.path.join(directory, "candles.json")
+        write_candles_json(make_ohlcv(rows), data_file)
+        size = os.path.getsize(data_file)
+
+        report.add(f"load.json[{rows}]", measure(quiet(lambda: load_json(data_file)), repeat,
+                                                 bytes=size))
+        df = quiet(lambda: load_json(data_file))()
+        report.add(f"load.store_save[{rows}]", measure(lambda: candle_store.save(df, data_file), repeat))
+        report.add(f"load.store_mmap[{rows}]", measure(lambda: candle_store.load(data_file), repeat))
+        report.add(f"load.load_data[{rows}]", measure(quiet(lambda: load_data(data_file)), repeat))
+
+
+def bench_strategies(report: Report, rows: int, event_rows: int, repeat: int):
+    df = make_ohlcv(rows)
+    event_df = df.iloc[:event_rows]
+    # Indicators and runs are timed from scratch, not from the shared cache
+    indicators.cache.unbind()
+    for choice, (name, strategy_class) in strategies_map.items():
+        report.add(f"indicators.{name}[{rows}]",
+                   measure(lambda: prime_indicators(df, strategy_class), repeat))
+        report.add(f"run.vectorized.{name}[{rows}]",
+                   measure(lambda: run_strategy(df, strategy_class, "vectorized"), repeat))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            report.add(f"run.event.{name}[{event_rows}]",
+                       measure(lambda: run_strategy(event_df, strategy_class, "event"),
+                               max(1, repeat // 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=525_600, help="Minute bars (default: one year)")
+    parser.add_argument('--event-rows', type=int, default=20_000, help="Bars for backtesting.Backtest runs")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Earlier JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio counted as a regression with --compare")
+    args = parser.parse_args()
+
+    report = Report("backtestservice", environment(args, ("numpy", "pandas", "backtesting", "talib")))
+    print("BackTestService benchmarks", file=sys.stderr)
+    bench_load(report, args.rows, args.repeat)
+    bench_strategies(report, args.rows, args.event_rows, args.repeat)
+
+    report.write(args.output)
+    if args.compare and not compare(report.to_dict(), args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
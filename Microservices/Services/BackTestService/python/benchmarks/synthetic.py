@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(n_rows: int, seed: int = 0, start_price: float = 2000.0,
+               start: str = "2023-01-01", freq: str = "1min") -> pd.DataFrame:
+    """Random-walk OHLCV frame shaped like backtest.load_data() output"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.001, n_rows)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, n_rows))
+    index = pd.date_range(start, periods=n_rows, freq=freq, tz="UTC", name="Date")
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread),
+        'Low': np.minimum(open_, close) * (1 - spread),
+        'Close': close,
+        'Volume': rng.uniform(1, 1000, n_rows),
+    }, index=index)
+
+
+def write_candles_json(df: pd.DataFrame, path: str):
+    """Save a make_ohlcv frame as the candles.json the C# service downloads"""
+    step = df.index[1] - df.index[0] if len(df) > 1 else pd.Timedelta(minutes=1)
+    times = df.index.strftime("%Y-%m-%dT%H:%M:%SZ")
+    close_times = (df.index + step - pd.Timedelta(milliseconds=1)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    records = pd.DataFrame({
+        'openTime': times, 'open': df['Open'], 'high': df['High'], 'low': df['Low'],
+        'close': df['Close'], 'volume': df['Volume'], 'closeTime': close_times,
+    })
+    records.to_json(path, orient="records")
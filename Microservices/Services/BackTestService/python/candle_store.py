@@ -0,0 +1,117 @@
+"""Columnar on-disk copy of the downloaded candles.
+
+    python3 -u python/backtest.py --convert [data/candles.json]
+
+A store is a directory next to the JSON file (data/candles.json ->
+data/candles.columns/) holding one .npy file per column, Date as int64
+nanoseconds since the epoch and OHLCV as float64, plus meta.json recording
+the row count and the size and mtime of the JSON it was converted from.
+
+The columns are memory-mapped on load, so the DataFrame's OHLCV columns are
+views of the page cache instead of parsed text. A store whose source JSON
+has changed since conversion is ignored; backtest.load_data() then parses
+the JSON and rewrites the store.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+STORE_SUFFIX = ".columns"
+STORE_FORMAT = 1
+DATE_COLUMN = "Date"
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def store_path(data_file: str) -> Path:
+    path = Path(data_file)
+    return path.with_name(path.stem + STORE_SUFFIX)
+
+
+def _source_stamp(data_file: str) -> Optional[dict]:
+    try:
+        stat = os.stat(data_file)
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_meta(data_file: str) -> Optional[dict]:
+    try:
+        with open(store_path(data_file) / "meta.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(data_file: str) -> bool:
+    """True if a store exists and was converted from the JSON as it is now"""
+    meta = read_meta(data_file)
+    if meta is None or meta.get("format") != STORE_FORMAT:
+        return False
+    source = _source_stamp(data_file)
+    # Without the JSON the store is all there is
+    return source is None or meta.get("source") == source
+
+
+def version(data_file: str):
+    """Identifies the dataset behind data_file, for caching parsed frames"""
+    source = _source_stamp(data_file)
+    if source is not None:
+        return source["mtime_ns"], source["size"]
+    meta = read_meta(data_file)
+    if meta is None:
+        raise FileNotFoundError(f"No such data file or store: {data_file}")
+    return meta["source"]["mtime_ns"], meta["source"]["size"]
+
+
+def load(data_file: str) -> pd.DataFrame:
+    """Memory-map the store for data_file as a backtest-ready DataFrame"""
+    path = store_path(data_file)
+    meta = read_meta(data_file)
+    columns = {column: np.load(path / f"{column}.npy", mmap_mode="r")
+               for column in [DATE_COLUMN] + OHLCV_COLUMNS}
+    rows = meta["rows"]
+    for column, values in columns.items():
+        if len(values) != rows:
+            raise ValueError(f"{column} has {len(values)} rows, store says {rows}")
+
+    dates = columns.pop(DATE_COLUMN).view("datetime64[ns]")
+    index = pd.DatetimeIndex(dates, dtype=meta.get("date_dtype", "datetime64[ns]"),
+                             name=DATE_COLUMN, copy=False)
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def save(df: pd.DataFrame, data_file: str) -> Path:
+    """Write a cleaned OHLCV frame as the store for data_file"""
+    path = store_path(data_file)
+    path.mkdir(parents=True, exist_ok=True)
+    source = _source_stamp(data_file)
+
+    arrays = {DATE_COLUMN: df.index.as_unit("ns").asi8}
+    arrays.update({column: df[column].to_numpy(dtype=np.float64) for column in OHLCV_COLUMNS})
+    for column, values in arrays.items():
+        tmp = path / f".{column}.{os.getpid()}.npy"
+        np.save(tmp, np.ascontiguousarray(values))
+        os.replace(tmp, path / f"{column}.npy")
+
+    # meta.json last: until it names this source, readers keep using the JSON
+    meta = {"format": STORE_FORMAT, "rows": len(df), "date_dtype": str(df.index.dtype),
+            "source": source}
+    tmp = path / f".meta.{os.getpid()}.json"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=4)
+    os.replace(tmp, path / "meta.json")
+    return path
+
+
+def main(argv):
+    from backtest import DATA_FILE, load_data
+
+    data_file = argv[0] if argv else DATA_FILE
+    # load_data() parses the JSON and writes the store when it is missing or stale
+    df = load_data(data_file)
+    print(f"Columnar store: {store_path(data_file)} ({len(df)} rows)")
@@ -0,0 +1,289 @@
+"""Saved backtest runs and on-demand charts.
+
+    python3 -u python/backtest.py --chart [run id | latest] [--points N]
+    python3 -u python/backtest.py --chart --strategy 1 --params '{"ma_short": 20}'
+
+A finished run is saved as plots/runs/<run id>/ (run.npz with the OHLCV
+bars, equity curve, trades and indicators, meta.json with the strategy,
+parameters and summary row, and that row alone as summary.json) and
+plots/runs/latest names the most recent one. Rendering is a separate step that reads those files and draws
+the same chart as Backtest.plot (candlesticks, volume, equity, trade P/L
+and indicators), resampled to at most BACKTEST_CHART_POINTS candles, into
+plots/runs/<run id>/chart.html. Runs saved with close prices only get a
+plain line chart. With --strategy the run is replayed first, which is how
+a row of a sweep gets its chart.
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RUNS_DIR = Path("plots") / "runs"
+LATEST_FILE = "latest"
+CHART_FILE = "chart.html"
+SUMMARY_FILE = "summary.json"
+CHART_POINTS = int(os.getenv("BACKTEST_CHART_POINTS", "4000"))
+KEEP_RUNS = int(os.getenv("BACKTEST_KEEP_RUNS", "20"))
+
+TRADE_COLUMNS = ['Size', 'EntryBar', 'ExitBar', 'EntryPrice', 'ExitPrice', 'PnL']
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Candle widths Backtest.plot resamples to, in minutes
+RESAMPLE_MINUTES = {"1min": 1, "5min": 5, "10min": 10, "15min": 15, "30min": 30, "1h": 60, "2h": 120,
+                    "4h": 240, "8h": 480, "1D": 1440, "1W": 10080, "1ME": np.inf}
+
+
+class RunNotFound(Exception):
+    pass
+
+
+# ---------------------------------------------------------
+# Saving runs
+# ---------------------------------------------------------
+def run_parts(stats) -> tuple:
+    """Equity curve, trades and indicators from either engine's results"""
+    if "_equity" in stats:
+        equity = np.asarray(stats["_equity"], dtype=float)
+        indicators = [(name, np.asarray(values, dtype=float), None)
+                      for name, values in stats["_indicators"].items()]
+    else:
+        equity = stats["_equity_curve"]["Equity"].to_numpy(dtype=float)
+        indicators = []
+        for indicator in stats["_strategy"]._indicators:
+            values = np.atleast_2d(np.asarray(indicator, dtype=float))
+            names = indicator.name if isinstance(indicator.name, list) else [indicator.name] * len(values)
+            for name, row in zip(names, values):
+                indicators.append((name, row, indicator._opts.get("overlay")))
+    trades = stats["_trades"]
+    return equity, trades, indicators
+
+
+def save_run(df: pd.DataFrame, stats, meta: dict) -> str:
+    """Write one run's results; returns its run id"""
+    return save_parts(df, *run_parts(stats), meta)
+
+
+def save_parts(df: pd.DataFrame, equity: np.ndarray, trades: pd.DataFrame,
+               indicators: list, meta: dict) -> str:
+    """save_run for results already split up by run_parts (e.g. from results.py)"""
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}_{meta['strategy']}"
+    run_dir = RUNS_DIR / run_id
+    run_dir.mkdir()
+
+    arrays = {
+        "index": df.index.as_unit("ns").asi8,
+        "equity": equity,
+    }
+    for column in OHLCV_COLUMNS:
+        arrays[column.lower()] = df[column].to_numpy(dtype=float)
+    for column in TRADE_COLUMNS:
+        arrays[f"trade_{column}"] = trades[column].to_numpy()
+    for i, (_, values, _) in enumerate(indicators):
+        arrays[f"indicator_{i}"] = values
+    np.savez(run_dir / "run.npz", **arrays)
+
+    meta = {**meta, "run_id": run_id, "created": datetime.now().isoformat(),
+            "indicators": [{"name": name, "overlay": overlay} for name, _, overlay in indicators]}
+    with open(run_dir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=4, default=str)
+    if "summary" in meta:
+        with open(run_dir / SUMMARY_FILE, "w") as f:
+            json.dump(meta["summary"], f, indent=4)
+
+    _write_latest(run_id)
+    prune_runs()
+    return run_id
+
+
+def _write_latest(run_id: str):
+    tmp = RUNS_DIR / f".{LATEST_FILE}.{os.getpid()}"
+    tmp.write_text(run_id)
+    os.replace(tmp, RUNS_DIR / LATEST_FILE)
+
+
+def prune_runs(keep: int = KEEP_RUNS):
+    """Delete all but the newest ``keep`` runs"""
+    runs = sorted(path for path in RUNS_DIR.iterdir() if path.is_dir())
+    for path in runs[:-keep] if keep > 0 else []:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def resolve_run(run_id: str = "latest") -> Path:
+    if not run_id or run_id == "latest":
+        try:
+            run_id = (RUNS_DIR / LATEST_FILE).read_text().strip()
+        except FileNotFoundError:
+            raise RunNotFound("No saved runs") from None
+    run_dir = RUNS_DIR / Path(run_id).name
+    if not (run_dir / "meta.json").exists():
+        raise RunNotFound(f"Run {run_id} not found")
+    return run_dir
+
+
+# ---------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------
+def downsample(values: np.ndarray, budget: int = CHART_POINTS) -> np.ndarray:
+    """Indices of at most ~budget points of values, keeping each bucket's min and max"""
+    n = len(values)
+    if n <= budget or budget < 4:
+        return np.arange(n)
+    buckets = budget // 2
+    bucket = np.arange(n) * buckets // n
+    # Within each bucket, sorted by value: first is the min, last the max
+    order = np.lexsort((np.nan_to_num(values, nan=np.inf), bucket))
+    starts = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+    ends = np.r_[starts[1:], n] - 1
+    return np.unique(np.r_[order[starts], order[ends], 0, n - 1])
+
+
+def _is_overlay(values: np.ndarray, close: np.ndarray) -> bool:
+    # Same default as backtesting's Strategy.I
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = values / close
+        return bool(((x < 1.4) & (x > .6)).mean() > .6)
+
+
+def render(run_id: str = "latest", points: int = CHART_POINTS) -> Path:
+    """Render (or re-render) the chart for a saved run; returns the HTML path"""
+    run_dir = resolve_run(run_id)
+    with open(run_dir / "meta.json") as f:
+        meta = json.load(f)
+    data = np.load(run_dir / "run.npz")
+    path = run_dir / CHART_FILE
+    if "open" in data.files:
+        _plot_backtest(meta, data, points, path)
+    else:
+        _plot_lines(meta, data, points, path)
+    return path
+
+
+def _resample_rule(dates: pd.DatetimeIndex, points: int):
+    """Narrowest of Backtest.plot's candle widths that fits dates into points candles, or False"""
+    if len(dates) <= points:
+        return False
+    need = ((dates[-1] - dates[0]) / points).total_seconds() // 60
+    return next(rule for rule, minutes in RESAMPLE_MINUTES.items() if minutes >= need)
+
+
+def _plot_backtest(meta: dict, data, points: int, path: Path):
+    """Backtest.plot's chart, rebuilt from the saved arrays"""
+    from backtesting._plotting import plot
+    from backtesting._stats import compute_drawdown_duration_peaks
+    from backtesting._util import _Indicator
+
+    dates = pd.to_datetime(data["index"])
+    df = pd.DataFrame({column: data[column.lower()] for column in OHLCV_COLUMNS}, index=dates)
+
+    equity = data["equity"]
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    duration, _ = compute_drawdown_duration_peaks(pd.Series(drawdown, index=dates))
+    equity_curve = pd.DataFrame({"Equity": equity, "DrawdownPct": drawdown, "DrawdownDuration": duration},
+                                index=dates)
+
+    trades = pd.DataFrame({column: data[f"trade_{column}"] for column in TRADE_COLUMNS})
+    # Both engines trade without commission
+    trades["ReturnPct"] = np.sign(trades["Size"]) * (trades["ExitPrice"] / trades["EntryPrice"] - 1)
+    trades["EntryTime"] = dates[trades["EntryBar"].to_numpy()]
+    trades["ExitTime"] = dates[trades["ExitBar"].to_numpy()]
+    trades["Duration"] = trades["ExitTime"] - trades["EntryTime"]
+
+    close = df["Close"].to_numpy()
+    indicators = []
+    for i, info in enumerate(meta["indicators"]):
+        values = data[f"indicator_{i}"]
+        overlay = info["overlay"] if info["overlay"] is not None else _is_overlay(values, close)
+        indicators.append(_Indicator(values, name=info["name"], plot=True, overlay=overlay,
+                                     color=None, scatter=False, index=dates))
+
+    results = pd.Series({"_equity_curve": equity_curve, "_trades": trades, "_strategy": meta["strategy"]})
+    plot(results=results, df=df, indicators=indicators, filename=str(path), open_browser=False,
+         resample=_resample_rule(dates, points))
+
+
+def _plot_lines(meta: dict, data, points: int, path: Path):
+    """Close, indicators, trades and equity as lines downsampled to points, for runs saved without OHLCV"""
+    from bokeh.io import save
+    from bokeh.layouts import column
+    from bokeh.palettes import Category10
+    from bokeh.plotting import figure
+    from bokeh.resources import CDN
+
+    dates = pd.to_datetime(data["index"]).to_numpy()
+    close, equity = data["close"], data["equity"]
+
+    summary = meta.get("summary", {})
+    title = f"{meta['strategy']} {meta.get('params') or ''} | " + ", ".join(
+        f"{key} {value}" for key, value in summary.items() if key != "Strategy")
+    price = figure(x_axis_type="datetime", height=400, sizing_mode="stretch_width",
+                   title=title, tools="xpan,xwheel_zoom,box_zoom,reset,save")
+    keep = downsample(close, points)
+    price.line(dates[keep], close[keep], color="black", legend_label="Close")
+
+    panels = []
+    colors = iter(Category10[10] * 4)
+    for i, info in enumerate(meta["indicators"]):
+        values = data[f"indicator_{i}"]
+        overlay = info["overlay"] if info["overlay"] is not None else _is_overlay(values, close)
+        keep = downsample(values, points)
+        if overlay:
+            price.line(dates[keep], values[keep], color=next(colors), legend_label=info["name"])
+        else:
+            panel = figure(x_axis_type="datetime", height=150, sizing_mode="stretch_width",
+                           x_range=price.x_range, title=info["name"])
+            panel.line(dates[keep], values[keep], color=next(colors))
+            panels.append(panel)
+
+    trades = pd.DataFrame({column: data[f"trade_{column}"] for column in TRADE_COLUMNS})
+    if len(trades) > points // 2:
+        trades = trades.iloc[np.linspace(0, len(trades) - 1, points // 2).astype(int)]
+    for side, rows, marker, color in (("Long", trades[trades['Size'] > 0], "triangle", "green"),
+                                      ("Short", trades[trades['Size'] < 0], "inverted_triangle", "red")):
+        if len(rows):
+            price.scatter(dates[rows['EntryBar'].to_numpy()], rows['EntryPrice'].to_numpy(), size=8,
+                          marker=marker, color=color, legend_label=f"{side} entry")
+            price.scatter(dates[rows['ExitBar'].to_numpy()], rows['ExitPrice'].to_numpy(), size=6,
+                          marker="x", color=color, legend_label=f"{side} exit")
+    price.legend.location = "top_left"
+    price.legend.click_policy = "hide"
+
+    equity_fig = figure(x_axis_type="datetime", height=200, sizing_mode="stretch_width",
+                        x_range=price.x_range, title="Equity")
+    keep = downsample(equity, points)
+    equity_fig.line(dates[keep], equity[keep], color="navy")
+
+    save(column([price, equity_fig, *panels], sizing_mode="stretch_width"),
+         filename=str(path), resources=CDN, title=f"Backtest {meta['run_id']}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="backtest.py --chart", description="Render a saved run's chart")
+    parser.add_argument("run", nargs="?", default="latest", help="Run id (default: latest)")
+    parser.add_argument("--strategy", type=int, help="Replay this strategy first instead of using a saved run")
+    parser.add_argument("--params", default="{}", help="Strategy parameters for --strategy, as JSON")
+    parser.add_argument("--points", type=int, default=CHART_POINTS)
+    args = parser.parse_args(argv)
+
+    run_id = args.run
+    if args.strategy is not None:
+        import backtest
+        df = backtest.load_data(backtest.DATA_FILE)
+        name, strategy_class = backtest.strategies_map[backtest.parse_choice(args.strategy)]
+        params = json.loads(args.params)
+        stats = backtest.run_strategy(df, strategy_class, backtest.ENGINE, params)
+        run_id = save_run(df, stats, {"strategy": name, "choice": args.strategy, "engine": backtest.ENGINE,
+                                      "params": params, "summary": backtest.extract_metrics(name, stats)})
+        print(f"Run: {run_id}")
+
+    try:
+        path = render(run_id, args.points)
+    except RunNotFound as e:
+        print(f"ERROR: {e}")
+        raise SystemExit(1)
+    print(f"Chart: {path}")
+    return path
@@ -0,0 +1,165 @@
+"""TA-Lib indicators shared between strategies run on the same dataset.
+
+The built-in strategies call SMA/RSI/MACD from here instead of talib, so
+when several strategies run over one dataset (or one strategy over many
+parameter sets) each (function, input column, params) series is computed
+once. The cache is only consulted while it is bound to a dataset, and an
+array input is identified by the dataset column it belongs to, which the
+cache holds on to while bound. Arrays from anywhere else are not cached,
+since their memory can be freed and reused by a different array. bind()
+to another dataset drops the cache, and unbound calls go straight to TA-Lib.
+
+While bound, a call on a window of the dataset's columns (a row slice such
+as df.iloc[a:b], as the walk-forward folds use) gets that window of the
+full-series indicator: it is computed once for the whole dataset, and the
+window's first bars are warmed up by the bars before it.
+
+SMA_many fills the cache with the SMAs of every length in a parameter grid
+before sweep or walk-forward workers fork, so each length is computed once
+rather than once per run. Large grids take them from one pass of
+rolling_mean_many in Shared/Indicators/indicator_kernels.py (the kernels the
+AIService predictor uses), which agrees with TA-Lib to rounding, not bit for
+bit.
+
+RSI here is TA-Lib's, with Wilder's smoothing, as charting tools and the
+strategies' thresholds assume. The predictor's rsi feature is a plain 14-bar
+mean of gains over losses instead; its models were fitted on that definition,
+and it is pinned by the AIService tests, so the two are kept apart on purpose.
+"""
+import functools
+import sys
+from pathlib import Path
+
+import numpy as np
+import talib
+
+try:
+    import indicator_kernels as kernels
+except ImportError:
+    # Running from the source tree; the image copies the module next to this one
+    sys.path.append(str(Path(__file__).resolve().parents[3] / "Shared" / "Indicators"))
+    import indicator_kernels as kernels
+
+
+def _slice(value, offset, length):
+    if isinstance(value, tuple):
+        return tuple(part[offset:offset + length] for part in value)
+    return value[offset:offset + length]
+
+
+class IndicatorCache:
+    """Indicator values keyed by (function, inputs, params) for one dataset"""
+
+    def __init__(self):
+        self._dataset = None
+        self._columns = []
+        self._values = {}
+        self.computed = 0
+        self.reused = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def bind(self, dataset):
+        """Use the cache for runs on dataset (an object kept alive while bound)"""
+        if dataset is not self._dataset:
+            self._dataset = dataset
+            self._columns = [dataset[column].to_numpy() for column in getattr(dataset, "columns", ())]
+            self._values.clear()
+
+    def unbind(self):
+        self._dataset = None
+        self._columns = []
+        self._values.clear()
+
+    def _window(self, value):
+        """(column number, offset) if value is a row window of one of the dataset's columns"""
+        address = value.__array_interface__["data"][0]
+        for i, column in enumerate(self._columns):
+            offset, misaligned = divmod(address - column.__array_interface__["data"][0],
+                                        column.strides[0])
+            if (not misaligned and value.strides == column.strides and value.dtype == column.dtype
+                    and 0 <= offset and offset + len(value) <= len(column)):
+                return i, offset
+        return None
+
+    def _full_series(self, args):
+        """Arguments with dataset windows widened to whole columns, their cache key
+        parts, and the window (offset, length) to cut from the result, None for the
+        whole series. None instead if an array is not a window of the dataset."""
+        full, keys, window, rows = [], [], None, None
+        for arg in args:
+            if isinstance(arg, np.ndarray):
+                found = self._window(arg) if arg.ndim == 1 else None
+                # Arrays from elsewhere, or windows that do not line up, are not cached
+                if found is None or window not in (None, (found[1], len(arg))):
+                    return None
+                column = self._columns[found[0]]
+                full.append(column)
+                keys.append(("column", found[0]))
+                window, rows = (found[1], len(arg)), len(column)
+            else:
+                full.append(arg)
+                keys.append(arg)
+        return tuple(full), tuple(keys), None if window == (0, rows) else window
+
+    def shared(self, func):
+        """Wrap a TA-Lib function so its results are cached while bound"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            shared = self._full_series(args) if self._dataset is not None else None
+            if shared is None:
+                return func(*args, **kwargs)
+            full_args, arg_keys, window = shared
+            key = (func.__name__, arg_keys, tuple(sorted(kwargs.items())))
+            value = self._values.get(key)
+            if value is None:
+                value = self._values[key] = func(*full_args, **kwargs)
+                self.computed += 1
+            else:
+                self.reused += 1
+            return value if window is None else _slice(value, *window)
+        return wrapper
+
+    def fill_many(self, func, many, x, params):
+        """func(x, p) for every p, the uncached ones computed in one call of
+        many(x, params) and cached as func's results while bound"""
+        shared = self._full_series((x,)) if self._dataset is not None else None
+        if shared is None:
+            return list(many(x, params))
+        (full,), (arg_key,), window = shared
+        keys = [(func.__name__, (arg_key, p), ()) for p in params]
+        missing = [p for p, key in zip(params, keys) if key not in self._values]
+        if missing:
+            for p, value in zip(missing, many(full, missing)):
+                self._values[(func.__name__, (arg_key, p), ())] = value
+            self.computed += len(missing)
+        self.reused += len(params) - len(missing)
+        return [self._values[key] if window is None else _slice(self._values[key], *window) for key in keys]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._values), "computed": self.computed, "reused": self.reused}
+
+
+cache = IndicatorCache()
+
+SMA = cache.shared(talib.SMA)
+RSI = cache.shared(talib.RSI)
+MACD = cache.shared(talib.MACD)
+
+# rolling_mean_many beats one TA-Lib call per length from about 5M output
+# values on, up to series of about 500k candles, past which its cumulative sum
+# no longer stays in cache (measured on 5k-1M candles and 10-300 lengths)
+MANY_MIN_VALUES = 5_000_000
+MANY_MAX_CANDLES = 500_000
+
+
+def _sma_many(close, windows):
+    if len(windows) * len(close) >= MANY_MIN_VALUES and len(close) <= MANY_MAX_CANDLES:
+        return kernels.rolling_mean_many(close, windows)
+    return [talib.SMA(close, window) for window in windows]
+
+
+def SMA_many(close, windows) -> list:
+    """SMA(close, window) for each window; while bound, later SMA calls get them from the cache"""
+    return cache.fill_many(SMA, _sma_many, close, list(windows))
@@ -0,0 +1,206 @@
+"""Content-addressed store of finished backtest results.
+
+A result is keyed by a hash of the candles (dates and OHLCV values), the
+strategy class and its source code, the effective parameters and the engine
+with its version. plots/results/<key>/ holds result.npz (equity curve and
+indicators as float32, trades, compressed) and meta.json (summary row,
+strategy, parameters, engine). Running the same strategy on the same
+candles again answers from there without backtesting, and the saved run for
+its chart is written from the stored arrays.
+
+Entries are evicted least recently used first once the store grows past
+BACKTEST_RESULTS_MAX_MB. BACKTEST_RESULTS=off disables the store.
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import weakref
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+import charts
+
+RESULTS_DIR = Path("plots") / "results"
+RESULT_FILE = "result.npz"
+META_FILE = "meta.json"
+# Bump when the stored layout or the way results are computed changes
+STORE_FORMAT = 3
+ENABLED = os.getenv("BACKTEST_RESULTS", "on") != "off"
+MAX_BYTES = int(float(os.getenv("BACKTEST_RESULTS_MAX_MB", "256")) * 1024 * 1024)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+# ---------------------------------------------------------
+# Keys
+# ---------------------------------------------------------
+# id(df) -> (weak reference, digest); a dataset is hashed once per process
+_digests = {}
+
+
+def dataset_digest(df: pd.DataFrame) -> str:
+    """Hash of the candles' dates and OHLCV values"""
+    cached = _digests.get(id(df))
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df.index.as_unit("ns").asi8).data)
+    for column in OHLCV_COLUMNS:
+        h.update(np.ascontiguousarray(df[column].to_numpy(dtype=np.float64)).data)
+    digest = h.hexdigest()
+    _digests[id(df)] = (weakref.ref(df, lambda _, key=id(df): _digests.pop(key, None)), digest)
+    return digest
+
+
+@lru_cache(maxsize=None)
+def _source_digest(obj) -> str:
+    try:
+        source = inspect.getsource(obj)
+    except (OSError, TypeError):
+        source = getattr(obj, "__qualname__", repr(obj))
+    return hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+
+
+def engine_version(engine: str) -> str:
+    if engine == "vectorized":
+        import vectorized
+        return f"vectorized-{_source_digest(vectorized)}"
+    import backtesting
+    return f"backtesting-{backtesting.__version__}"
+
+
+def strategy_params(strategy_class, params: dict = None) -> dict:
+    """Class-level parameters with the overrides applied, as the run sees them"""
+    defaults = {key: value for key, value in vars(strategy_class).items()
+                if not key.startswith("_") and not callable(value)}
+    return {**defaults, **(params or {})}
+
+
+def result_key(df: pd.DataFrame, strategy_class, engine: str, params: dict = None) -> str:
+    identity = {
+        "format": STORE_FORMAT,
+        "data": dataset_digest(df),
+        "strategy": f"{strategy_class.__module__}.{strategy_class.__qualname__}",
+        "source": _source_digest(strategy_class),
+        "params": strategy_params(strategy_class, params),
+        "engine": engine_version(engine),
+    }
+    encoded = json.dumps(identity, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+# ---------------------------------------------------------
+# Store
+# ---------------------------------------------------------
+class StoredResult(NamedTuple):
+    key: str
+    summary: dict
+    equity: np.ndarray
+    trades: pd.DataFrame
+    indicators: list  # (name, values, overlay) as from charts.run_parts
+    meta: dict
+
+
+class ResultStore:
+    def __init__(self, directory: Path = RESULTS_DIR, max_bytes: int = MAX_BYTES,
+                 enabled: bool = ENABLED):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[StoredResult]:
+        if not self.enabled:
+            return None
+        entry = self.directory / key
+        try:
+            with open(entry / META_FILE) as f:
+                meta = json.load(f)
+            with np.load(entry / RESULT_FILE) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        # Least recently used is judged by the meta file's mtime
+        os.utime(entry / META_FILE)
+        self.hits += 1
+
+        trades = pd.DataFrame({column: arrays[f"trade_{column}"] for column in charts.TRADE_COLUMNS})
+        indicators = [(info["name"], arrays[f"indicator_{i}"].astype(float), info["overlay"])
+                      for i, info in enumerate(meta["indicators"])]
+        return StoredResult(key, meta["summary"], arrays["equity"].astype(float), trades,
+                            indicators, meta)
+
+    def put(self, key: str, stats, summary: dict, meta: dict):
+        """Store a finished run; failures to write are reported, not raised"""
+        if not self.enabled:
+            return
+        equity, trades, indicators = charts.run_parts(stats)
+        arrays = {"equity": np.asarray(equity, dtype=np.float32)}
+        for column in charts.TRADE_COLUMNS:
+            arrays[f"trade_{column}"] = trades[column].to_numpy()
+        for i, (_, values, _) in enumerate(indicators):
+            arrays[f"indicator_{i}"] = np.asarray(values, dtype=np.float32)
+        meta = {**meta, "key": key, "summary": summary, "created": datetime.now().isoformat(),
+                "indicators": [{"name": name, "overlay": overlay} for name, _, overlay in indicators]}
+
+        # Written aside and renamed, so readers never see half an entry
+        tmp = self.directory / f".{key}.{os.getpid()}.tmp"
+        try:
+            tmp.mkdir(parents=True)
+            np.savez_compressed(tmp / RESULT_FILE, **arrays)
+            with open(tmp / META_FILE, "w") as f:
+                json.dump(meta, f, indent=4, default=str)
+            os.replace(tmp, self.directory / key)
+        except OSError as e:
+            # Another process stored the same key first, or the disk is unwritable
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (self.directory / key / META_FILE).exists():
+                print(f"WARNING: Could not store result {key}: {e}")
+            return
+        self.evict()
+
+    def entries(self) -> list:
+        """(last used, size in bytes, path) of every entry"""
+        if not self.directory.exists():
+            return []
+        found = []
+        for entry in self.directory.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                files = list(entry.iterdir())
+                found.append(((entry / META_FILE).stat().st_mtime,
+                              sum(path.stat().st_size for path in files), entry))
+            except OSError:
+                continue
+        return found
+
+    def evict(self):
+        """Drop the least recently used entries until the store fits max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+store = ResultStore()
@@ -0,0 +1,216 @@
+"""Parameter sweeps for the built-in strategies.
+
+    python3 -u python/backtest.py --sweep <strategy 1..4> [--grid JSON] [--samples N]
+
+The grid maps strategy attributes to candidate values, either as a list or
+as an inclusive range, e.g.
+    {"ma_short": [5, 10, 20], "ma_long": {"start": 50, "stop": 200, "step": 10}}
+Without --grid a default grid for the strategy is used. --samples N draws N
+random combinations from the grid instead of running all of them.
+
+--engine vectorized runs each combination on the NumPy engine
+(vectorized.py), which is much faster for large grids.
+
+Runs are spread over a process pool. The OHLCV arrays are handed to the
+workers once (inherited through fork where available, otherwise sent once
+per worker), never per run. Results are ranked by --rank-by and written to
+plots/sweep_<strategy>_<timestamp>.csv. Sweeps draw no charts; to chart a
+row, replay it with --chart --strategy <n> --params '<row parameters>'.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from backtest import (DATA_FILE, ENGINE, ENGINES, ERROR_METRICS, PLOTS_DIR, MA30MA90,
+                      MA50MA200, MACD_Strategy, RSI_Strategy, extract_metrics,
+                      load_data, prime_sma, run_strategy, strategies_map)
+
+DEFAULT_GRIDS = {
+    MA30MA90: {"ma_short": {"start": 5, "stop": 50, "step": 5},
+               "ma_long": {"start": 20, "stop": 150, "step": 10}},
+    MA50MA200: {"ma_short": {"start": 20, "stop": 100, "step": 10},
+                "ma_long": {"start": 100, "stop": 300, "step": 20}},
+    RSI_Strategy: {"rsi_window": [7, 10, 14, 21, 28],
+                   "upper_bound": [65, 70, 75, 80],
+                   "lower_bound": [20, 25, 30, 35]},
+    MACD_Strategy: {"fastperiod": [8, 10, 12, 15],
+                    "slowperiod": [20, 26, 30, 35],
+                    "signalperiod": [5, 7, 9, 12]},
+}
+
+# Combinations that make no sense for a strategy are skipped
+CONSTRAINTS = {
+    MA30MA90: lambda p: p["ma_short"] < p["ma_long"],
+    MA50MA200: lambda p: p["ma_short"] < p["ma_long"],
+    RSI_Strategy: lambda p: p["lower_bound"] < p["upper_bound"],
+    MACD_Strategy: lambda p: p["fastperiod"] < p["slowperiod"],
+}
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Worker-side copy of the dataset, filled once per worker process
+_shared = {}
+
+
+def expand_grid(grid: dict) -> dict:
+    """Turn range specs into explicit value lists"""
+    values = {}
+    for param, spec in grid.items():
+        if isinstance(spec, dict):
+            start, stop, step = spec["start"], spec["stop"], spec.get("step", 1)
+            if all(isinstance(v, int) for v in (start, stop, step)):
+                values[param] = list(range(start, stop + 1, step))
+            else:
+                values[param] = np.arange(start, stop + step / 2, step).round(10).tolist()
+        elif isinstance(spec, list):
+            values[param] = spec
+        else:
+            values[param] = [spec]
+    return values
+
+
+def read_grid(spec: str, strategy_class) -> dict:
+    """Grid from JSON text or a JSON file; the strategy's default grid if spec is empty"""
+    if not spec:
+        return DEFAULT_GRIDS[strategy_class]
+    if os.path.exists(spec):
+        with open(spec) as f:
+            return json.load(f)
+    return json.loads(spec)
+
+
+def build_combinations(strategy_class, grid: dict, samples: int = 0, seed: int = 0) -> list:
+    values = expand_grid(grid)
+    unknown = [param for param in values if not hasattr(strategy_class, param)]
+    if unknown:
+        raise ValueError(f"{strategy_class.__name__} has no parameter(s) {', '.join(unknown)}")
+
+    defaults = {param: getattr(strategy_class, param) for param in vars(strategy_class)
+                if not param.startswith("_") and isinstance(getattr(strategy_class, param), (int, float))}
+    constraint = CONSTRAINTS.get(strategy_class, lambda p: True)
+
+    params = list(values)
+    combos = [dict(zip(params, combo)) for combo in itertools.product(*values.values())]
+    combos = [combo for combo in combos if constraint({**defaults, **combo})]
+
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+
+def share_data(df: pd.DataFrame):
+    """Publish the dataset as plain arrays for the worker processes"""
+    _shared.clear()
+    _shared["index"] = df.index.values
+    _shared["values"] = np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+
+
+def _init_worker(arrays=None):
+    if arrays is not None:
+        _shared.update(arrays)
+    if "df" in _shared:
+        # Built by the parent before forking
+        return
+    _shared["df"] = pd.DataFrame(_shared["values"], index=pd.DatetimeIndex(_shared["index"], name="Date"),
+                                 columns=OHLCV_COLUMNS, copy=False)
+
+
+def _run_combo(task):
+    choice, engine, params = task
+    name, strategy_class = strategies_map[choice]
+    try:
+        stats = run_strategy(_shared["df"], strategy_class, engine, params)
+        return {**params, **extract_metrics(name, stats)}
+    except Exception as e:
+        return {**params, "Strategy": name, **ERROR_METRICS, "Error": str(e)}
+
+
+def run_sweep(df: pd.DataFrame, choice: int, combos: list, workers: int = 0,
+              engine: str = ENGINE) -> list:
+    workers = workers or os.cpu_count() or 1
+    share_data(df)
+
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods:
+        # Children inherit _shared copy-on-write, the SMAs of every MA length
+        # in the grid with it; nothing is pickled
+        context, initargs = multiprocessing.get_context("fork"), (None,)
+        _init_worker()
+        indicators.cache.bind(_shared["df"])
+    else:
+        context = multiprocessing.get_context("spawn")
+        initargs = ({"index": _shared["index"], "values": _shared["values"]},)
+
+    tasks = [(choice, engine, combo) for combo in combos]
+    chunksize = max(1, len(tasks) // (workers * 8))
+    try:
+        if "fork" in methods:
+            prime_sma(_shared["df"], strategies_map[choice][1], combos)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=initargs) as pool:
+            return list(pool.map(_run_combo, tasks, chunksize=chunksize))
+    finally:
+        indicators.cache.unbind()
+
+
+def rank_results(results: list, rank_by: str) -> pd.DataFrame:
+    table = pd.DataFrame(results)
+    score = pd.to_numeric(table[rank_by], errors="coerce")
+    table = table.assign(_score=score).sort_values(
+        "_score", ascending=False, na_position="last", kind="stable")
+    table = table.drop(columns="_score").reset_index(drop=True)
+    table.index += 1
+    table.index.name = "Rank"
+    return table
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="backtest.py --sweep", description="Parameter sweep for one strategy")
+    parser.add_argument("strategy", type=int, choices=sorted(strategies_map))
+    parser.add_argument("--grid", help="JSON grid, or path to a JSON file")
+    parser.add_argument("--samples", type=int, default=0, help="Random-search budget (0 = full grid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=0, help="Processes (default: all cores)")
+    parser.add_argument("--rank-by", default="Sharpe Ratio",
+                        choices=[key for key in ERROR_METRICS if key != "Total Trades"])
+    parser.add_argument("--top", type=int, default=20, help="Rows to print")
+    parser.add_argument("--engine", default=ENGINE, choices=ENGINES)
+    parser.add_argument("--data", default=DATA_FILE)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    name, strategy_class = strategies_map[args.strategy]
+
+    combos = build_combinations(strategy_class, read_grid(args.grid, strategy_class),
+                                args.samples, args.seed)
+    print(f"Sweeping {name}: {len(combos)} combinations")
+    print("=" * 50)
+
+    df = load_data(args.data)
+    start = time.perf_counter()
+    results = run_sweep(df, args.strategy, combos, args.workers, args.engine)
+    elapsed = time.perf_counter() - start
+
+    table = rank_results(results, args.rank_by)
+    print(f"Ran {len(results)} backtests in {elapsed:.1f}s "
+          f"({len(results) / elapsed:.1f}/s), ranked by {args.rank_by}")
+    print(table.head(args.top).to_string())
+
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file = f"{PLOTS_DIR}/sweep_{name}_{timestamp}.csv"
+    table.to_csv(csv_file)
+    print(f"\nSweep results saved: {csv_file}")
+    return table
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+import talib
+
+import indicators
+from benchmarks.synthetic import make_ohlcv
+
+MACD_PARAMS = [(12, 26, 9), (8, 20, 5)]
+
+
+@pytest.fixture
+def df():
+    frame = make_ohlcv(3000, seed=4)
+    # A flat stretch: RSI without movement, constant SMA windows
+    frame.iloc[500:700, :4] = frame['Close'].iloc[499]
+    yield frame
+    indicators.cache.unbind()
+
+
+def cases(close):
+    """(name, shared function call, direct TA-Lib call, warm-up bars)"""
+    for window in (2, 14, 50, 200):
+        yield (f"SMA({window})", lambda w=window: indicators.SMA(close, w),
+               lambda w=window: talib.SMA(close, w), window - 1)
+        yield (f"RSI({window})", lambda w=window: indicators.RSI(close, w),
+               lambda w=window: talib.RSI(close, w), window)
+    for fast, slow, signal in MACD_PARAMS:
+        yield (f"MACD({fast},{slow},{signal})",
+               lambda p=(fast, slow, signal): indicators.MACD(close, *p),
+               lambda p=(fast, slow, signal): talib.MACD(close, *p), slow + signal - 2)
+
+
+def assert_series_equal(actual, expected, warmup):
+    """Equal to TA-Lib bit for bit, NaN exactly over the warm-up bars; MACD's three series each"""
+    if isinstance(expected, np.ndarray):
+        actual, expected = (actual,), (expected,)
+    assert len(actual) == len(expected)
+    for actual_part, expected_part in zip(actual, expected):
+        np.testing.assert_array_equal(actual_part, expected_part)
+        assert np.isnan(actual_part[:warmup]).all()
+        assert not np.isnan(actual_part[warmup:]).any()
+
+
+def test_unbound_calls_match_talib(df):
+    close = df['Close'].to_numpy()
+    for name, shared, direct, warmup in cases(close):
+        assert_series_equal(shared(), direct(), warmup)
+
+
+def test_bound_calls_match_talib_and_are_computed_once(df):
+    indicators.cache.bind(df)
+    close = df['Close'].to_numpy()
+    for name, shared, direct, warmup in cases(close):
+        assert_series_equal(shared(), direct(), warmup)
+    computed = indicators.cache.computed
+    for name, shared, direct, warmup in cases(close):
+        shared()
+    assert indicators.cache.computed == computed
+
+
+def test_row_windows_get_the_full_series_indicator(df):
+    indicators.cache.bind(df)
+    fold = df.iloc[1000:1600]
+    full = talib.SMA(df['Close'].to_numpy(), 50)
+    # Warmed up by the bars before the window, unlike talib on the window alone
+    np.testing.assert_array_equal(indicators.SMA(fold['Close'].to_numpy(), 50), full[1000:1600])
+    line, signal, hist = indicators.MACD(fold['Close'].to_numpy())
+    np.testing.assert_array_equal(hist, talib.MACD(df['Close'].to_numpy())[2][1000:1600])
+
+
+def test_rebinding_drops_the_cache(df):
+    indicators.cache.bind(df)
+    indicators.SMA(df['Close'].to_numpy(), 20)
+    other = make_ohlcv(3000, seed=5)
+    indicators.cache.bind(other)
+    assert len(indicators.cache) == 0
+    np.testing.assert_array_equal(indicators.SMA(other['Close'].to_numpy(), 20),
+                                  talib.SMA(other['Close'].to_numpy(), 20))
+
+
+def test_arrays_outside_the_dataset_are_not_cached(df):
+    indicators.cache.bind(df)
+    for seed in range(5):
+        # Freed after each call, so the next one may get the same memory
+        close = df['Close'].to_numpy() * (1 + seed)
+        np.testing.assert_array_equal(indicators.SMA(close, 20), talib.SMA(close, 20))
+    assert len(indicators.cache) == 0
+
+
+@pytest.mark.parametrize("min_values", [indicators.MANY_MIN_VALUES, 0], ids=["talib", "kernel"])
+def test_sma_many_fills_the_cache_for_later_sma_calls(df, monkeypatch, min_values):
+    monkeypatch.setattr(indicators, "MANY_MIN_VALUES", min_values)
+    close = df['Close'].to_numpy()
+    windows = [5, 10, 30, 200]
+    indicators.cache.bind(df)
+    computed, reused = indicators.cache.computed, indicators.cache.reused
+    many = indicators.SMA_many(close, windows)
+    assert len(indicators.cache) == 4 and indicators.cache.computed == computed + 4
+
+    for window, values in zip(windows, many):
+        np.testing.assert_allclose(values, talib.SMA(close, window), rtol=1e-12, equal_nan=True)
+        assert indicators.SMA(close, window) is values
+    window = df.iloc[500:1500]['Close'].to_numpy()
+    np.testing.assert_array_equal(indicators.SMA_many(window, [30])[0], many[2][500:1500])
+    assert indicators.cache.computed == computed + 4 and indicators.cache.reused == reused + 5
+
+
+def test_run_many_unbinds_the_cache_when_a_run_fails(df, monkeypatch):
+    import backtest
+
+    def failing_run(task):
+        indicators.SMA(backtest._shared["df"]['Close'].to_numpy(), 20)
+        raise RuntimeError("Worker died")
+
+    monkeypatch.setattr(backtest, "_run_captured", failing_run)
+    with pytest.raises(RuntimeError):
+        backtest.run_many(df, [1, 2])
+    assert len(indicators.cache) == 0 and backtest._shared == {}
+    # Still usable for the next dataset
+    indicators.cache.bind(df)
+    indicators.SMA(df['Close'].to_numpy(), 20)
+    assert len(indicators.cache) == 1
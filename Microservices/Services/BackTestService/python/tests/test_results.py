@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+import indicators
+import results
+from backtest import MA30MA90, extract_metrics, run_strategy
+from benchmarks.synthetic import make_ohlcv
+
+
+@pytest.fixture(scope="module")
+def runs():
+    """(key, stats, summary row) of three parameter sets on one dataset"""
+    df = make_ohlcv(1500, seed=3)
+    found = []
+    for ma_short in (5, 10, 15):
+        params = {"ma_short": ma_short, "ma_long": 40}
+        stats = run_strategy(df, MA30MA90, "event", params)
+        found.append((results.result_key(df, MA30MA90, "event", params), stats,
+                      extract_metrics("MA30-MA90", stats)))
+    indicators.cache.unbind()
+    return found
+
+
+def put(store, run):
+    key, stats, summary = run
+    store.put(key, stats, summary, {"strategy": "MA30-MA90"})
+
+
+def test_keys_follow_the_data_and_parameters():
+    df = make_ohlcv(500, seed=1)
+    key = results.result_key(df, MA30MA90, "event")
+    assert results.result_key(df.copy(), MA30MA90, "event") == key
+    assert results.result_key(df, MA30MA90, "event", {"ma_short": 10}) == key
+    assert results.result_key(df, MA30MA90, "event", {"ma_short": 12}) != key
+    assert results.result_key(df, MA30MA90, "vectorized") != key
+    other = df.copy()
+    other.iloc[-1, 3] += 1
+    assert results.result_key(other, MA30MA90, "event") != key
+
+
+def test_miss_then_hit(tmp_path, runs):
+    store = results.ResultStore(tmp_path, max_bytes=10 ** 9)
+    key, stats, summary = runs[0]
+    assert store.get(key) is None
+    put(store, runs[0])
+    stored = store.get(key)
+
+    assert (store.hits, store.misses) == (1, 1)
+    # NaN metrics included
+    np.testing.assert_equal(stored.summary, summary)
+    assert stored.meta["strategy"] == "MA30-MA90"
+    np.testing.assert_allclose(stored.equity, stats._equity_curve["Equity"], rtol=1e-6)
+    assert len(stored.trades) == len(stats._trades)
+
+
+def test_least_recently_used_entries_go_first(tmp_path, runs):
+    store = results.ResultStore(tmp_path, max_bytes=10 ** 9)
+    put(store, runs[0])
+    put(store, runs[1])
+    first, second = runs[0][0], runs[1][0]
+    # The first entry was stored earlier but read since, so the second is the oldest
+    os.utime(tmp_path / first / results.META_FILE, (1000, 1000))
+    os.utime(tmp_path / second / results.META_FILE, (2000, 2000))
+    store.get(first)
+
+    store.max_bytes = sum(size for _, size, _ in store.entries()) + 1
+    put(store, runs[2])
+    assert {path.name for _, _, path in store.entries()} == {first, runs[2][0]}
+    assert store.stats()["bytes"] <= store.max_bytes
+
+
+def test_a_disabled_store_keeps_nothing(tmp_path, runs):
+    store = results.ResultStore(tmp_path, enabled=False)
+    put(store, runs[0])
+    assert store.get(runs[0][0]) is None and store.entries() == []
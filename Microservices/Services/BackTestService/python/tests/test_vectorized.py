@@ -0,0 +1,57 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest
+
+import indicators
+import vectorized
+from backtest import extract_metrics, strategies_map
+from benchmarks.synthetic import make_ohlcv
+from charts import TRADE_COLUMNS
+from sweep import DEFAULT_GRIDS, build_combinations
+
+RTOL = 1e-9
+
+
+def frame(seed: int, freq: str) -> pd.DataFrame:
+    df = make_ohlcv(3000, seed=seed, freq=freq)
+    # A flat stretch: indicators touch without crossing
+    df.iloc[500:560, :4] = df['Close'].iloc[500]
+    return df
+
+
+def cases():
+    for seed, freq in [(0, "5min"), (1, "1min"), (2, "1h")]:
+        for choice, (name, strategy_class) in strategies_map.items():
+            combos = [{}] + build_combinations(strategy_class, DEFAULT_GRIDS[strategy_class], samples=3, seed=seed)
+            for params in combos:
+                yield pytest.param(seed, freq, choice, params, id=f"{name}-{seed}-{params}")
+
+
+@pytest.fixture(autouse=True)
+def unbound_indicators():
+    yield
+    indicators.cache.unbind()
+
+
+@pytest.mark.parametrize("seed, freq, choice, params", list(cases()))
+def test_vectorized_fills_match_backtesting(seed, freq, choice, params):
+    df = frame(seed, freq)
+    name, strategy_class = strategies_map[choice]
+    with warnings.catch_warnings():
+        # Orders the broker cancels for lack of margin
+        warnings.simplefilter("ignore")
+        expected = Backtest(df, strategy_class, cash=10000, finalize_trades=True).run(**params)
+    actual = vectorized.run(df, strategy_class, cash=10000, **params)
+
+    expected_trades = expected['_trades'][TRADE_COLUMNS].reset_index(drop=True)
+    actual_trades = actual['_trades'][TRADE_COLUMNS].reset_index(drop=True)
+    assert len(actual_trades) == len(expected_trades)
+    for column in ('Size', 'EntryBar', 'ExitBar'):
+        np.testing.assert_array_equal(actual_trades[column], expected_trades[column], err_msg=column)
+    for column in ('EntryPrice', 'ExitPrice', 'PnL'):
+        np.testing.assert_allclose(actual_trades[column], expected_trades[column], rtol=RTOL, err_msg=column)
+    np.testing.assert_allclose(actual['_equity'], expected['_equity_curve']['Equity'], rtol=RTOL)
+    assert extract_metrics(name, actual) == extract_metrics(name, expected)
@@ -0,0 +1,256 @@
+"""Vectorized engine for the built-in crossover strategies.
+
+backtesting.Backtest calls Strategy.next() once per bar. The built-in
+strategies only act on indicator crossovers, so here the indicators and the
+crossover signals are computed for the whole series at once and the broker
+is only stepped on the bars where an order fills. The equity curve is then
+rebuilt from the position held between fills.
+
+Fills follow backtesting.py with its defaults as used by backtest.py
+(market orders filled at the next bar's open, whole units sized from 100%
+of available margin, no commission, finalize_trades=True), so the returned
+statistics match Backtest.run() for the same strategy and parameters.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from indicators import MACD, RSI, SMA
+
+# Fraction of available margin a default buy()/sell() uses
+FULL_EQUITY = 1 - sys.float_info.epsilon
+
+
+def crossover(series1, series2) -> np.ndarray:
+    """Bars where series1 crosses above series2, as backtesting.lib.crossover sees them"""
+    series1, series2 = np.broadcast_arrays(np.asarray(series1, dtype=float),
+                                           np.asarray(series2, dtype=float))
+    crossed = np.zeros(len(series1), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        crossed[1:] = (series1[:-1] < series2[:-1]) & (series1[1:] > series2[1:])
+    return crossed
+
+
+# ---------------------------------------------------------
+# Signals: +1 = close shorts and buy, -1 = close longs and sell,
+# returned with the indicators they were derived from, by name
+# ---------------------------------------------------------
+def ma_cross(close: np.ndarray, ma_short, ma_long):
+    short_ma = SMA(close, ma_short)
+    long_ma = SMA(close, ma_long)
+    up, down = crossover(short_ma, long_ma), crossover(long_ma, short_ma)
+    indicators = {f"SMA(C,{ma_short})": short_ma, f"SMA(C,{ma_long})": long_ma}
+    return indicators, np.where(up, 1, np.where(down, -1, 0))
+
+
+def rsi_threshold(close: np.ndarray, rsi_window, upper_bound, lower_bound):
+    rsi = RSI(close, rsi_window)
+    overbought = crossover(rsi, upper_bound)
+    oversold = crossover(lower_bound, rsi)
+    return {f"RSI(C,{rsi_window})": rsi}, np.where(overbought, -1, np.where(oversold, 1, 0))
+
+
+def macd_cross(close: np.ndarray, fastperiod, slowperiod, signalperiod):
+    macd, signal, _ = MACD(close, fastperiod=fastperiod,
+                           slowperiod=slowperiod, signalperiod=signalperiod)
+    up, down = crossover(macd, signal), crossover(signal, macd)
+    return {"MACD": macd, "Signal": signal}, np.where(up, 1, np.where(down, -1, 0))
+
+
+# Strategy class name -> (signal function, parameters it takes)
+SIGNALS = {
+    "MA30MA90": (ma_cross, ("ma_short", "ma_long")),
+    "MA50MA200": (ma_cross, ("ma_short", "ma_long")),
+    "RSI_Strategy": (rsi_threshold, ("rsi_window", "upper_bound", "lower_bound")),
+    "MACD_Strategy": (macd_cross, ("fastperiod", "slowperiod", "signalperiod")),
+}
+
+
+def supports(strategy_class) -> bool:
+    return strategy_class.__name__ in SIGNALS
+
+
+def warmup_bars(indicators) -> int:
+    """Bars before the first bar every indicator is defined (as backtesting.py counts them)"""
+    return max((int(np.isnan(ind).argmin()) for ind in indicators), default=0)
+
+
+# ---------------------------------------------------------
+# Broker
+# ---------------------------------------------------------
+class Broker:
+    """Cash and open trades, stepped only on bars where orders fill.
+
+    Trades are (size, entry_price, entry_bar) tuples; units and basis are
+    summed over them in trade order, as backtesting.py does.
+    """
+
+    def __init__(self, cash: float):
+        self.cash = cash
+        self.trades = []
+        self.closed = []  # (size, entry_bar, exit_bar, entry_price, exit_price)
+        self.units = 0
+        self.basis = 0
+
+    def equity(self, price: float) -> float:
+        return self.cash + (price * self.units - self.basis)
+
+    def _positions_changed(self):
+        if not self.trades:
+            self.units, self.basis = 0, 0
+        elif len(self.trades) == 1:
+            # Usual case, and what sum() gives for one trade
+            size, entry_price, _ = self.trades[0]
+            self.units, self.basis = size, size * entry_price
+        else:
+            self.units = sum(size for size, _, _ in self.trades)
+            self.basis = sum(size * entry_price for size, entry_price, _ in self.trades)
+
+    def close_all(self, price: float, bar: int, trades=None):
+        for trade in trades if trades is not None else list(self.trades):
+            size, entry_price, entry_bar = trade
+            self.trades.remove(trade)
+            self.cash += size * (price - entry_price)
+            self.closed.append((size, entry_bar, bar, entry_price, price))
+        self._positions_changed()
+
+    def order(self, direction: int, price: float, last_price: float, bar: int):
+        """Full-equity market order filled at price, margin valued at last_price"""
+        if self.units * direction < 0:
+            # position.close() queues its orders at the front, newest trade first
+            self.close_all(price, bar, self.trades[::-1])
+        margin_used = sum(abs(size) * last_price for size, _, _ in self.trades) if self.trades else 0
+        margin_available = max(0, self.equity(last_price) - margin_used)
+        size = int((margin_available * 1.0 * FULL_EQUITY) // price)
+        if size:
+            self.trades.append((direction * size, price, bar))
+            self._positions_changed()
+
+
+def simulate(open_: np.ndarray, close: np.ndarray, actions: np.ndarray, start: int,
+             cash: float, stop: int = None):
+    """Replay the signals; returns the broker and its state after every fill.
+
+    The signal on bar i fills at the open of bar i + 1. With ``stop`` set the
+    replay ends after the fills on that bar and the end-of-data close-out is
+    skipped.
+    """
+    n = len(close)
+    broker = Broker(cash)
+
+    last = n - 1 if stop is None else stop
+    signal_bars = np.flatnonzero(actions[start:last]) + start
+    fill_bars = (signal_bars + 1).tolist()
+    # Plain floats: the loop runs once per fill, so per-element NumPy overhead adds up
+    fills = zip(actions[signal_bars].tolist(), open_[signal_bars + 1].tolist(),
+                close[signal_bars + 1].tolist(), fill_bars)
+
+    states = [(cash, 0, 0.0)]
+    for direction, price, last_price, bar in fills:
+        broker.order(direction, price, last_price, bar)
+        states.append((broker.cash, broker.units, broker.basis))
+    fill_bars.insert(0, start)
+
+    if stop is None and start < n:
+        # finalize_trades: close everything at the last open, then fill the last signal
+        last = n - 1
+        broker.close_all(float(open_[last]), last, list(broker.trades))
+        if actions[last]:
+            broker.order(int(actions[last]), float(open_[last]), float(close[last]), last)
+        fill_bars.append(last)
+        states.append((broker.cash, broker.units, broker.basis))
+
+    return broker, np.array(fill_bars), states
+
+
+def equity_curve(close: np.ndarray, start: int, fill_bars: np.ndarray, states) -> np.ndarray:
+    cash, units, basis = (np.array(column, dtype=float) for column in zip(*states))
+    # Latest fill at or before each bar; a later fill on the same bar wins
+    state = np.searchsorted(fill_bars, np.arange(len(close)), side="right") - 1
+    state = np.maximum(state, 0)
+    equity = cash[state] + (close * units[state] - basis[state])
+    equity[:start] = equity[start] if start < len(close) else cash[0]
+    return equity
+
+
+# ---------------------------------------------------------
+# Statistics (same formulas as backtesting._stats.compute_stats)
+# ---------------------------------------------------------
+def geometric_mean(returns: pd.Series) -> float:
+    returns = returns.fillna(0) + 1
+    if np.any(returns <= 0):
+        return 0
+    return np.exp(np.log(returns).sum() / (len(returns) or np.nan)) - 1
+
+
+def sharpe_ratio(equity: np.ndarray, index: pd.Index) -> float:
+    if not isinstance(index, pd.DatetimeIndex):
+        return np.nan
+    freq_days = pd.Series(index[-100:]).diff().dropna().median().days
+    have_weekends = index.dayofweek.to_series().between(5, 6).mean() > 2 / 7 * .6
+    annual_trading_days = (52 if freq_days == 7 else 12 if freq_days == 31 else
+                           1 if freq_days == 365 else (365 if have_weekends else 252))
+    freq = {7: 'W', 31: 'ME', 365: 'YE'}.get(freq_days, 'D')
+    day_returns = pd.Series(equity, index=index).resample(freq).last().dropna().pct_change().dropna()
+    gmean_day_return = geometric_mean(day_returns)
+
+    annualized_return = (1 + gmean_day_return) ** annual_trading_days - 1
+    volatility = np.sqrt((day_returns.var(ddof=1) + (1 + gmean_day_return) ** 2) ** annual_trading_days
+                         - (1 + gmean_day_return) ** (2 * annual_trading_days)) * 100
+    return annualized_return * 100 / (volatility or np.nan)
+
+
+def run(df: pd.DataFrame, strategy_class, cash: float = 10000, **params) -> dict:
+    """Backtest a built-in strategy; returns Backtest.run()'s summary statistics"""
+    if not supports(strategy_class):
+        raise ValueError(f"{strategy_class.__name__} has no vectorized implementation")
+    signal, names = SIGNALS[strategy_class.__name__]
+    unknown = set(params) - set(names)
+    if unknown:
+        raise AttributeError(f"Strategy '{strategy_class.__name__}' is missing parameter(s) "
+                             f"{', '.join(sorted(unknown))}")
+
+    open_ = df['Open'].to_numpy(dtype=float)
+    close = df['Close'].to_numpy(dtype=float)
+    n = len(close)
+    indicators, actions = signal(close, *(params.get(name, getattr(strategy_class, name))
+                                          for name in names))
+    start = 1 + warmup_bars(indicators.values())
+    actions[:start] = 0
+
+    broker, fill_bars, states = simulate(open_, close, actions, start, cash)
+    equity = equity_curve(close, start, fill_bars, states)
+
+    # Out of money: everything is closed at that bar's close and trading stops
+    broke = np.flatnonzero(equity[start:] <= 0)
+    if len(broke):
+        bar = start + int(broke[0])
+        broker, fill_bars, states = simulate(open_, close, actions, start, cash, stop=bar)
+        broker.close_all(float(close[bar]), bar)
+        equity = equity_curve(close, start, fill_bars, states)
+        equity[bar:] = 0
+
+    size, entry_bar, exit_bar, entry_price, exit_price = (
+        np.array(column) for column in zip(*broker.closed)) if broker.closed else ([],) * 5
+    trades = pd.DataFrame({
+        'Size': np.asarray(size, dtype=np.int64),
+        'EntryBar': np.asarray(entry_bar, dtype=np.int64),
+        'ExitBar': np.asarray(exit_bar, dtype=np.int64),
+        'EntryPrice': np.asarray(entry_price, dtype=float),
+        'ExitPrice': np.asarray(exit_price, dtype=float),
+    })
+    trades['PnL'] = trades['Size'] * (trades['ExitPrice'] - trades['EntryPrice'])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = 1 - equity / np.maximum.accumulate(equity)
+    return {
+        "Return [%]": (equity[-1] - equity[0]) / equity[0] * 100 if n else np.nan,
+        "Sharpe Ratio": sharpe_ratio(equity, df.index) if n else np.nan,
+        "Max. Drawdown [%]": -np.nan_to_num(drawdown.max() if n else np.nan) * 100,
+        "Win Rate [%]": (trades['PnL'] > 0).mean() * 100 if len(trades) else np.nan,
+        "# Trades": len(trades),
+        "_equity": equity,
+        "_trades": trades,
+        "_indicators": indicators,
+    }
@@ -0,0 +1,209 @@
+"""Walk-forward evaluation of one strategy over rolling train/test windows.
+
+    python3 -u python/backtest.py --walk-forward <strategy 1..4> [--folds 5] [--optimize]
+
+The candles are cut into folds of a train window followed by a test window
+(--train and --test bars; by default --folds test windows of n / (folds + 2)
+bars after a train window twice that long), each fold starting --step bars
+after the previous one. --anchored keeps every train window starting at the
+first bar instead of rolling it.
+
+With --optimize each fold picks the parameter set from the sweep grid
+(--grid, --samples as in sweep.py) that scores best by --rank-by on its
+train window, then runs it on its test window; without it the strategy's
+own parameters are used for every fold. The per-fold rows and the
+aggregated test metrics are printed and saved to
+plots/walkforward_<strategy>_<timestamp>.json.
+
+Folds run in parallel worker processes where fork is available. Every
+indicator is computed once on the full series before the workers start
+(indicators.py hands each fold its window of it), so a test window's first
+bars are warmed up by the bars before it rather than lost to NaNs.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import indicators
+from backtest import (DATA_FILE, ENGINE, ENGINES, ERROR_METRICS, PLOTS_DIR, extract_metrics,
+                      load_data, prime_indicators, prime_sma, run_strategy, strategies_map)
+from sweep import build_combinations, read_grid
+
+METRIC_COLUMNS = list(ERROR_METRICS)
+
+# Dataset for forked workers, set before the pool starts
+_shared = {}
+
+
+def make_folds(n: int, train: int, test: int, step: int = 0, anchored: bool = False) -> list:
+    """(train_start, train_end, test_start, test_end) bar ranges, ends exclusive"""
+    if train < 1 or test < 1:
+        raise ValueError("Train and test windows need at least one bar each")
+    step = step or test
+    folds = []
+    start = 0
+    while start + train + test <= n:
+        folds.append((0 if anchored else start, start + train, start + train, start + train + test))
+        start += step
+    return folds
+
+
+def _score(row: dict, rank_by: str) -> float:
+    try:
+        score = float(row[rank_by])
+    except (TypeError, ValueError):
+        return -math.inf
+    return -math.inf if math.isnan(score) else score
+
+
+def _evaluate(df: pd.DataFrame, choice: int, engine: str, params: dict) -> dict:
+    name, strategy_class = strategies_map[choice]
+    try:
+        return extract_metrics(name, run_strategy(df, strategy_class, engine, params))
+    except Exception as e:
+        return {"Strategy": name, **ERROR_METRICS, "Error": str(e)}
+
+
+def _run_fold(task):
+    choice, engine, number, (train_start, train_end, test_start, test_end), combos, rank_by = task
+    df = _shared["df"]
+    train, test = df.iloc[train_start:train_end], df.iloc[test_start:test_end]
+    before = indicators.cache.stats()
+
+    # The first candidate wins ties, so without a grid the defaults are used
+    candidates = [(params, _evaluate(train, choice, engine, params)) for params in combos or [{}]]
+    params, train_row = max(candidates, key=lambda candidate: _score(candidate[1], rank_by))
+    test_row = _evaluate(test, choice, engine, params)
+
+    after = indicators.cache.stats()
+    usage = {key: after[key] - before[key] for key in ("computed", "reused")}
+    row = {
+        "Fold": number,
+        "Train": f"{df.index[train_start]} - {df.index[train_end - 1]}",
+        "Test": f"{df.index[test_start]} - {df.index[test_end - 1]}",
+        **params,
+        f"Train {rank_by}": train_row[rank_by],
+        **{key: value for key, value in test_row.items() if key != "Strategy"},
+    }
+    return row, usage
+
+
+def run_walk_forward(df: pd.DataFrame, choice: int, folds: list, combos: list = None,
+                     rank_by: str = "Sharpe Ratio", workers: int = 0, engine: str = ENGINE) -> list:
+    """One result row per fold, in fold order"""
+    strategy_class = strategies_map[choice][1]
+    indicators.cache.bind(df)
+    _shared["df"] = df
+    tasks = [(choice, engine, number, bounds, combos, rank_by)
+             for number, bounds in enumerate(folds, start=1)]
+
+    computed, reused = 0, 0
+    workers = min(len(tasks), workers or os.cpu_count() or 1)
+    try:
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            # Full-series indicators for every parameter set, inherited by the workers
+            before = indicators.cache.computed
+            prime_sma(df, strategy_class, combos)
+            for params in combos or [{}]:
+                prime_indicators(df, strategy_class, params)
+            computed = indicators.cache.computed - before
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("fork")) as pool:
+                runs = list(pool.map(_run_fold, tasks))
+        else:
+            runs = [_run_fold(task) for task in tasks]
+    finally:
+        # Drop the cached indicators and the dataset they hold on to
+        indicators.cache.unbind()
+        _shared.clear()
+
+    rows = []
+    for row, usage in runs:
+        rows.append(row)
+        computed += usage["computed"]
+        reused += usage["reused"]
+    print(f"Indicator cache: {computed} computed, {reused} reused")
+    return rows
+
+
+def aggregate(name: str, rows: list) -> dict:
+    """Test-window metrics over all folds"""
+    table = pd.DataFrame(rows)
+    metrics = {column: pd.to_numeric(table[column], errors="coerce") for column in METRIC_COLUMNS}
+    returns = metrics["Return [%]"]
+    return {
+        "Strategy": name,
+        "Folds": len(rows),
+        "Compounded Return [%]": round(float(((1 + returns / 100).prod() - 1) * 100), 2),
+        "Mean Return [%]": round(float(returns.mean()), 2),
+        "Profitable Folds": int((returns > 0).sum()),
+        "Mean Sharpe Ratio": round(float(metrics["Sharpe Ratio"].mean()), 3),
+        "Worst Drawdown [%]": round(float(metrics["Max Drawdown [%]"].min()), 2),
+        "Mean Win Rate [%]": round(float(metrics["Win Rate [%]"].mean()), 2),
+        "Total Trades": int(metrics["Total Trades"].sum()),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="backtest.py --walk-forward",
+                                     description="Walk-forward evaluation of one strategy")
+    parser.add_argument("strategy", type=int, choices=sorted(strategies_map))
+    parser.add_argument("--folds", type=int, default=5, help="Folds when --train/--test are not given")
+    parser.add_argument("--train", type=int, default=0, help="Bars per train window")
+    parser.add_argument("--test", type=int, default=0, help="Bars per test window")
+    parser.add_argument("--step", type=int, default=0, help="Bars between folds (default: --test)")
+    parser.add_argument("--anchored", action="store_true", help="Train windows all start at the first bar")
+    parser.add_argument("--optimize", action="store_true", help="Pick parameters on each train window")
+    parser.add_argument("--grid", help="JSON grid, or path to a JSON file (with --optimize)")
+    parser.add_argument("--samples", type=int, default=0, help="Random-search budget (0 = full grid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rank-by", default="Sharpe Ratio",
+                        choices=[key for key in ERROR_METRICS if key != "Total Trades"])
+    parser.add_argument("--workers", type=int, default=0, help="Processes (default: all cores)")
+    parser.add_argument("--engine", default=ENGINE, choices=ENGINES)
+    parser.add_argument("--data", default=DATA_FILE)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    name, strategy_class = strategies_map[args.strategy]
+    combos = None
+    if args.optimize:
+        combos = build_combinations(strategy_class, read_grid(args.grid, strategy_class),
+                                    args.samples, args.seed)
+
+    df = load_data(args.data)
+    test = args.test or len(df) // (args.folds + 2)
+    train = args.train or 2 * test
+    folds = make_folds(len(df), train, test, args.step, args.anchored)
+    if not folds:
+        raise SystemExit(f"ERROR: {len(df)} bars are too few for a {train}-bar train "
+                         f"and {test}-bar test window")
+    print(f"Walk-forward {name}: {len(folds)} folds, {train} train / {test} test bars"
+          + (f", {len(combos)} parameter sets per fold" if combos else ""))
+    print("=" * 50)
+
+    start = time.perf_counter()
+    rows = run_walk_forward(df, args.strategy, folds, combos, args.rank_by, args.workers, args.engine)
+    elapsed = time.perf_counter() - start
+    summary = aggregate(name, rows)
+
+    print(f"Ran {len(folds)} folds in {elapsed:.1f}s")
+    print(pd.DataFrame(rows).set_index("Fold").to_string())
+    print("\n" + pd.DataFrame([summary]).to_string(index=False))
+
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_file = f"{PLOTS_DIR}/walkforward_{name}_{timestamp}.json"
+    with open(json_file, "w") as f:
+        json.dump({"summary": summary, "folds": rows}, f, indent=4, default=str)
+    print(f"\nWalk-forward results saved: {json_file}")
+    return summary
@@ -1,12 +1,25 @@
 using System.Diagnostics;
 using System.Net.Http;
 using System.Text.Json;
+using System.Text.RegularExpressions;
 
 namespace BacktestService.Services
 {
     public class BacktestRunner
     {
-        public async Task<string> Run(int strategyChoice)
+        // Run ids as charts.save_run names them: <timestamp>_<pid>_<strategy>
+        private static readonly Regex RunIdPattern = new(@"^[0-9]{8}_[0-9]{6}_[0-9]{6}_[0-9]+_[A-Za-z0-9_-]+$");
+
+        private readonly BacktestWorkerPool _workerPool;
+        private readonly bool _useWorkerPool;
+
+        public BacktestRunner(BacktestWorkerPool workerPool, IConfiguration configuration)
+        {
+            _workerPool = workerPool;
+            _useWorkerPool = configuration.GetValue("Backtest:UseWorkerPool", true);
+        }
+
+        public async Task<BacktestRunResult> Run(int strategyChoice)
         {
             // Read the candles.json data to verify it exists
             string dataFolder = "data";
@@ -15,7 +28,8 @@ namespace BacktestService.Services
 
             if (!File.Exists(candlesFilePath))
             {
-                return "Error: candles.json file not found. Please download data first.";
+                return new BacktestRunResult("Error: candles.json file not found. Please download data first.",
+                    null, Array.Empty<string>());
             }
 
             // Read and log the request data
@@ -27,25 +41,66 @@ namespace BacktestService.Services
                 Console.WriteLine("==============================");
             }
 
-            // Read and log some info about the candles data
-            string candlesJson = await File.ReadAllTextAsync(candlesFilePath);
-            Console.WriteLine($"Candles data size: {candlesJson.Length} characters");
+            // Log the size of the candles data without reading it
+            var candlesFile = new FileInfo(candlesFilePath);
+            Console.WriteLine($"Candles data size: {candlesFile.Length} bytes");
             Console.WriteLine($"Running Python backtest with strategy {strategyChoice}...");
 
+            var result = _useWorkerPool
+                ? await _workerPool.RunAsync(strategyChoice)
+                : await _workerPool.RunOnceAsync(strategyChoice);
+
+            Console.WriteLine($"Backtest completed with strategy {strategyChoice} (run {result.RunId}).");
+            Console.WriteLine("=== PYTHON OUTPUT ===");
+            Console.WriteLine(result.Output);
+            Console.WriteLine("====================");
+            
+            return result;
+        }
+
+        public static bool IsValidRunId(string runId)
+        {
+            return RunIdPattern.IsMatch(runId) && Path.GetFileName(runId) == runId;
+        }
+
+        // Charts are drawn from a saved run only when someone asks for one
+        public async Task<bool> RenderChart(string runId)
+        {
+            if (!IsValidRunId(runId))
+            {
+                Console.WriteLine($"Refusing to render chart for invalid run id {runId}");
+                return false;
+            }
+
+            Console.WriteLine($"Rendering chart for run {runId}...");
+            if (_useWorkerPool)
+                return await _workerPool.RenderChartAsync(runId) != null;
+
+            var (exitCode, output) = await RunPython("--chart", runId);
+            Console.WriteLine(output);
+            return exitCode == 0;
+        }
+
+        // Arguments are passed one by one, never through a command line string
+        private static async Task<(int ExitCode, string Output)> RunPython(params string[] arguments)
+        {
             var processInfo = new ProcessStartInfo
             {
                 FileName = "python3",
-                Arguments = $"-u python/backtest.py {strategyChoice}",  // <- -u = unbuffered stdout/stderr
                 UseShellExecute = false,
                 RedirectStandardOutput = true,
                 RedirectStandardError = true,
                 CreateNoWindow = true,
                 WorkingDirectory = "/app"
             };
+            processInfo.ArgumentList.Add("-u");  // <- -u = unbuffered stdout/stderr
+            processInfo.ArgumentList.Add("python/backtest.py");
+            foreach (var argument in arguments)
+                processInfo.ArgumentList.Add(argument);
 
             using var process = Process.Start(processInfo);
             if (process == null)
-                return "Failed to start Python process.";
+                return (-1, "Failed to start Python process.");
 
             string output = await process.StandardOutput.ReadToEndAsync();
             string error = await process.StandardError.ReadToEndAsync();
@@ -53,13 +108,8 @@ namespace BacktestService.Services
 
             if (!string.IsNullOrEmpty(error))
                 output += "\nERRORS:\n" + error;
-            
-            Console.WriteLine($"Backtest completed with strategy {strategyChoice}.");
-            Console.WriteLine("=== PYTHON OUTPUT ===");
-            Console.WriteLine(output);
-            Console.WriteLine("====================");
-            
-            return output;
+
+            return (process.ExitCode, output);
         }
     }
 }
\ No newline at end of file
@@ -0,0 +1,245 @@
+using System.Collections.Concurrent;
+using System.Diagnostics;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+
+namespace BacktestService.Services
+{
+    // Pool of long-running "python3 -u python/backtest.py --serve" processes.
+    // Each worker keeps pandas/backtesting/talib imported and the parsed
+    // candles in memory, so a run only pays for the backtest itself.
+    public class BacktestWorkerPool : IDisposable
+    {
+        private readonly int _workerCount;
+        private readonly TimeSpan _requestTimeout;
+        private readonly SemaphoreSlim _slots;
+        private readonly ConcurrentBag<BacktestWorker> _idle = new();
+        private Task _warming = Task.CompletedTask;
+
+        public BacktestWorkerPool(IConfiguration configuration)
+        {
+            _workerCount = Math.Max(1, configuration.GetValue("Backtest:WorkerCount", 2));
+            _requestTimeout = TimeSpan.FromSeconds(configuration.GetValue("Backtest:RequestTimeoutSeconds", 300));
+            _slots = new SemaphoreSlim(_workerCount, _workerCount);
+        }
+
+        // Start the workers in the background, ahead of the first request, so
+        // imports are already done; requests arriving meanwhile wait for it
+        public void StartWarming() => _warming = Task.Run(Warm);
+
+        private void Warm()
+        {
+            for (int i = _idle.Count; i < _workerCount; i++)
+            {
+                try
+                {
+                    _idle.Add(BacktestWorker.Start());
+                }
+                catch (Exception ex)
+                {
+                    Console.WriteLine($"Could not start backtest worker: {ex.Message}");
+                    return;
+                }
+            }
+        }
+
+        public async Task<BacktestRunResult> RunAsync(int strategyChoice)
+        {
+            var response = await SendAsync(new JsonObject { ["strategy"] = strategyChoice });
+            return BacktestRunResult.FromResponse(response);
+        }
+
+        // One run in a worker of its own, stopped afterwards (no pool)
+        public async Task<BacktestRunResult> RunOnceAsync(int strategyChoice)
+        {
+            using var worker = await Task.Run(BacktestWorker.Start);
+            using var timeout = new CancellationTokenSource(_requestTimeout);
+            var response = await worker.SendAsync(new JsonObject { ["strategy"] = strategyChoice }, timeout.Token);
+            return BacktestRunResult.FromResponse(response);
+        }
+
+        // Render the chart of a saved run; returns its path, or null if the run is unknown
+        public async Task<string?> RenderChartAsync(string runId)
+        {
+            var response = await SendAsync(new JsonObject { ["chart"] = runId });
+            if (response["ok"]?.GetValue<bool>() != true)
+            {
+                Console.WriteLine($"Chart for run {runId} failed: {response["error"]?.GetValue<string>()}");
+                return null;
+            }
+            return response["chart"]?.GetValue<string>();
+        }
+
+        private async Task<JsonNode> SendAsync(JsonObject request)
+        {
+            // Rather than starting a cold worker next to the ones warming up
+            await _warming;
+            await _slots.WaitAsync();
+            BacktestWorker? worker = null;
+            try
+            {
+                while (_idle.TryTake(out var candidate))
+                {
+                    if (candidate.IsAlive)
+                    {
+                        worker = candidate;
+                        break;
+                    }
+                    candidate.Dispose();
+                }
+                worker ??= BacktestWorker.Start();
+
+                using var timeout = new CancellationTokenSource(_requestTimeout);
+                return await worker.SendAsync(request, timeout.Token);
+            }
+            catch
+            {
+                // A worker that timed out or broke the protocol is not reused
+                worker?.Dispose();
+                worker = null;
+                throw;
+            }
+            finally
+            {
+                if (worker != null)
+                    _idle.Add(worker);
+                _slots.Release();
+            }
+        }
+
+        public void Dispose()
+        {
+            while (_idle.TryTake(out var worker))
+                worker.Dispose();
+            _slots.Dispose();
+        }
+    }
+
+    // What a run returns: the printed output, the summary row(s) and the ids
+    // of the saved runs (plots/runs/<id>/), which identify this run's files
+    // however many other runs finished since
+    public record BacktestRunResult(string Output, JsonNode? Summary, IReadOnlyList<string> RunIds)
+    {
+        public string? RunId => RunIds.Count > 0 ? RunIds[^1] : null;
+
+        public static BacktestRunResult FromResponse(JsonNode response)
+        {
+            string output = response["output"]?.GetValue<string>() ?? "";
+            string errors = response["errors"]?.GetValue<string>() ?? "";
+            if (response["ok"]?.GetValue<bool>() != true)
+                errors += $"\n{response["error"]?.GetValue<string>()}";
+            if (!string.IsNullOrWhiteSpace(errors))
+                output += "\nERRORS:\n" + errors;
+
+            var runIds = response["runs"]?.AsArray()
+                .Select(id => id?.GetValue<string>())
+                .OfType<string>()
+                .ToList() ?? new List<string>();
+            return new BacktestRunResult(output, response["summary"]?.DeepClone(), runIds);
+        }
+    }
+
+    // Warms the pool once the host starts, without holding up startup
+    public class BacktestWorkerPoolWarmup : IHostedService
+    {
+        private readonly BacktestWorkerPool _pool;
+
+        public BacktestWorkerPoolWarmup(BacktestWorkerPool pool)
+        {
+            _pool = pool;
+        }
+
+        public Task StartAsync(CancellationToken cancellationToken)
+        {
+            _pool.StartWarming();
+            return Task.CompletedTask;
+        }
+
+        public Task StopAsync(CancellationToken cancellationToken) => Task.CompletedTask;
+    }
+
+    internal sealed class BacktestWorker : IDisposable
+    {
+        private readonly Process _process;
+        private long _nextId;
+
+        private BacktestWorker(Process process)
+        {
+            _process = process;
+        }
+
+        public bool IsAlive => !_process.HasExited;
+
+        public static BacktestWorker Start()
+        {
+            var processInfo = new ProcessStartInfo
+            {
+                FileName = "python3",
+                Arguments = "-u python/backtest.py --serve",
+                UseShellExecute = false,
+                RedirectStandardInput = true,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                CreateNoWindow = true,
+                WorkingDirectory = "/app"
+            };
+
+            var process = Process.Start(processInfo)
+                ?? throw new InvalidOperationException("Failed to start Python process.");
+
+            // Anything the worker writes outside a request ends up here
+            process.ErrorDataReceived += (_, e) =>
+            {
+                if (!string.IsNullOrEmpty(e.Data))
+                    Console.WriteLine($"[backtest worker {process.Id}] {e.Data}");
+            };
+            process.BeginErrorReadLine();
+
+            var worker = new BacktestWorker(process);
+            string? ready = process.StandardOutput.ReadLine();
+            if (ready == null || JsonNode.Parse(ready)?["ready"]?.GetValue<bool>() != true)
+            {
+                worker.Dispose();
+                throw new InvalidOperationException($"Backtest worker did not start: {ready}");
+            }
+
+            Console.WriteLine($"Backtest worker {process.Id} ready.");
+            return worker;
+        }
+
+        public async Task<JsonNode> SendAsync(JsonObject request, CancellationToken cancellationToken)
+        {
+            string id = Interlocked.Increment(ref _nextId).ToString();
+            request["id"] = id;
+            string line = request.ToJsonString();
+
+            await _process.StandardInput.WriteLineAsync(line.AsMemory(), cancellationToken);
+            await _process.StandardInput.FlushAsync();
+
+            while (true)
+            {
+                string? reply = await _process.StandardOutput.ReadLineAsync(cancellationToken);
+                if (reply == null)
+                    throw new InvalidOperationException("Backtest worker exited unexpectedly.");
+
+                var response = JsonNode.Parse(reply);
+                if (response?["id"]?.GetValue<string>() == id)
+                    return response;
+            }
+        }
+
+        public void Dispose()
+        {
+            try
+            {
+                if (!_process.HasExited)
+                    _process.Kill(entireProcessTree: true);
+            }
+            catch (InvalidOperationException)
+            {
+                // Already gone
+            }
+            _process.Dispose();
+        }
+    }
+}
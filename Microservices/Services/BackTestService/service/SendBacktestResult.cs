@@ -21,6 +21,31 @@ namespace BacktestService.Services
             return Path.Combine(_dataFolder, fileName);
         }
 
+        // Saved runs live in plots/runs/<run id>/, plots/runs/latest names the newest
+        public string? GetLatestRunId()
+        {
+            string latestFile = Path.Combine(_dataFolder, "runs", "latest");
+            if (!File.Exists(latestFile))
+                return null;
+            return File.ReadAllText(latestFile).Trim();
+        }
+
+        public bool RunExists(string runId)
+        {
+            return File.Exists(Path.Combine(_dataFolder, "runs", Path.GetFileName(runId), "meta.json"));
+        }
+
+        public string GetRunChartFilePath(string runId)
+        {
+            return Path.Combine(_dataFolder, "runs", Path.GetFileName(runId), "chart.html");
+        }
+
+        public string GetRunSummaryFilePath(string runId)
+        {
+            return Path.Combine(_dataFolder, "runs", Path.GetFileName(runId), "summary.json");
+        }
+
+        // Summary from before runs were saved
         public string GetSummaryFilePath(string fileName = "summary.json")
         {
             return Path.Combine(_dataFolder, fileName);
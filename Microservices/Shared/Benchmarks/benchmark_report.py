@@ -0,0 +1,101 @@
+"""Timing and JSON reports shared by the benchmark suites.
+
+Used by the AIService and BackTestService suites through their
+benchmarks/report.py; the images copy this module next to the code.
+
+A report is {"suite", "meta": {commit, versions, machine, arguments},
+"results": {name: {"best_s", "median_s", "repeat", ...}}}. compare() reads
+an earlier report and flags every result whose best time grew by more than
+the threshold ratio.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def measure(fn, repeat: int = 5, warmup: int = 1, **extra) -> dict:
+    """Best and median wall time of fn() over repeat calls, after warmup calls"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "median_s": statistics.median(times), "repeat": repeat, **extra}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment(args, packages=("numpy", "pandas")) -> dict:
+    versions = {}
+    for name in packages:
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return {
+        "commit": _commit(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "packages": versions,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+class Report:
+    def __init__(self, suite: str, meta: dict):
+        self.suite = suite
+        self.meta = meta
+        self.results = {}
+
+    def add(self, name: str, result: dict):
+        self.results[name] = result
+        detail = f"best {result['best_s'] * 1e3:9.2f} ms  median {result['median_s'] * 1e3:9.2f} ms"
+        extra = {key: value for key, value in result.items()
+                 if key not in ("best_s", "median_s", "repeat")}
+        print(f"  {name:<48} {detail}  {extra if extra else ''}", file=sys.stderr)
+
+    def to_dict(self) -> dict:
+        return {"suite": self.suite, "meta": self.meta, "results": self.results}
+
+    def write(self, path: str = None):
+        """JSON to path, or to stdout so the progress on stderr stays separate"""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+            print(f"Results saved: {path}", file=sys.stderr)
+        else:
+            print(text)
+
+
+def compare(report: dict, baseline_file: str, threshold: float = 1.25) -> bool:
+    """Print best-time ratios against an earlier report; False if any got slower than threshold"""
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {baseline_file} (commit {baseline['meta'].get('commit')}):", file=sys.stderr)
+    ok = True
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"  {name:<48} new", file=sys.stderr)
+            continue
+        ratio = result["best_s"] / before["best_s"] if before["best_s"] else float("inf")
+        flag = "REGRESSION" if ratio > threshold else ""
+        ok &= ratio <= threshold
+        print(f"  {name:<48} {ratio:6.2f}x {flag}", file=sys.stderr)
+    return ok
@@ -0,0 +1,99 @@
+"""Rolling-window kernels on contiguous NumPy arrays.
+
+Used by the AIService predictor for the features where a plain NumPy pass
+beats pandas: moving averages for several windows at once and rolling
+highs/lows. The BackTestService takes the moving averages of large sweep
+grids from rolling_mean_many too (python/indicators.py). Single-series
+indicators with a TA-Lib or pandas implementation (SMA, EMA, RSI, MACD,
+rolling mean/std of one window) are faster there and stay there. Every kernel takes 1-D float64 input and an optional
+preallocated ``out`` array, which it fills and returns; bars before the
+first full window are NaN, as are windows holding a NaN.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def _input(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _output(out: Optional[np.ndarray], shape) -> np.ndarray:
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if out.shape != tuple(np.atleast_1d(shape)) or out.dtype != np.float64:
+        raise ValueError(f"out must be a float64 array of shape {shape}")
+    return out
+
+
+def _check_window(window: int):
+    if int(window) != window or window < 1:
+        raise ValueError(f"Window must be a positive integer, got {window}")
+
+
+def rolling_mean_many(x, windows: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mean of each full window for every window length, one row per window.
+
+    Agrees with pandas rolling(window).mean() to rounding. All windows come
+    from one cumulative sum, taken relative to the first value so that it
+    stays small next to the prices.
+    """
+    for window in windows:
+        _check_window(window)
+    x = _input(x)
+    n = len(x)
+    out = _output(out, (len(windows), n))
+
+    missing = np.isnan(x)
+    has_missing = missing.any()
+    shift = x[~missing][0] if n and not missing.all() else 0.0
+    totals = np.zeros(n + 1)
+    np.cumsum(np.where(missing, 0.0, x - shift), out=totals[1:])
+    if has_missing:
+        holes = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(missing, out=holes[1:])
+
+    for row, window in zip(out, windows):
+        row[:min(window - 1, n)] = np.nan
+        if n < window:
+            continue
+        full = row[window - 1:]
+        np.subtract(totals[window:], totals[:n - window + 1], out=full)
+        full /= window
+        full += shift
+        if has_missing:
+            full[holes[window:] - holes[:n - window + 1] > 0] = np.nan
+    return out
+
+
+def _rolling_extreme(x, window: int, out: Optional[np.ndarray], pick) -> np.ndarray:
+    """Extreme of each full window from overlapping power-of-two spans.
+
+    After k passes span[i] is the extreme of x[i:i + 2**k]; a window is
+    covered by the two spans of the largest power of two that fits in it.
+    """
+    _check_window(window)
+    x = _input(x)
+    n = len(x)
+    out = _output(out, n)
+    out[:min(window - 1, n)] = np.nan
+    if n < window:
+        return out
+    spans = x.copy()
+    width = 1
+    while 2 * width <= window:
+        pick(spans[:n - width], spans[width:], out=spans[:n - width])
+        width *= 2
+    starts = n - window + 1
+    pick(spans[:starts], spans[window - width:window - width + starts], out=out[window - 1:])
+    return out
+
+
+def rolling_max(x, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Like pandas rolling(window).max()"""
+    return _rolling_extreme(x, window, out, np.maximum)
+
+
+def rolling_min(x, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Like pandas rolling(window).min()"""
+    return _rolling_extreme(x, window, out, np.minimum)